@@ -0,0 +1,386 @@
+# benchmarks/fakes.py
+"""
+이벤트 재생 벤치마크용 가짜 게이트웨이/REST/DB 객체입니다.
+- FakeGateway: 서버(채널/역할/멤버) 상태를 payload 형태로 들고 있다가 ConnectionState 파서에 그대로 넣어 이벤트를 만듭니다.
+  봇이 REST로 바꾼 내용(역할, 닉네임, 음성 이동, 채널 생성/삭제, 메시지 전송)은 실제 Discord처럼 게이트웨이 이벤트로 되돌려 보냅니다.
+  역할/닉네임/채널 변경은 감사 로그 항목도 남기고 GUILD_AUDIT_LOG_ENTRY_CREATE로 함께 보냅니다. (/audit-logs 조회도 같은 목록을 돌려줌)
+- FakeGateway.request: HTTPClient.request 대신 쓰는 스텁으로, 경로별 호출 수를 세고 그럴듯한 응답을 돌려줍니다.
+- CountingBackend: utils/storage의 저장소를 감싸 테이블/작업별 DB 호출 수를 셉니다.
+"""
+import re
+import json
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Pattern
+
+import discord
+
+from utils.perf import perf
+from utils.storage import StorageBackend
+
+# 모든 payload가 같은 시각을 쓰게 해서 실행마다 결과가 달라지지 않도록 합니다.
+FIXED_TIMESTAMP = "2024-01-01T00:00:00+00:00"
+SNOWFLAKE_BASE = 1_100_000_000_000_000_000
+AUDIT_LOG_EMPTY = {
+    "audit_log_entries": [], "users": [], "integrations": [], "webhooks": [],
+    "threads": [], "guild_scheduled_events": [], "application_commands": [], "auto_moderation_rules": [],
+}
+# /audit-logs가 한 번에 돌려주는 최대 항목 수 (Discord 기본값)
+AUDIT_LOG_PAGE_LIMIT = 100
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# 1. DB 호출 계수기
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+class CountingBackend(StorageBackend):
+    """감싼 저장소에 작업을 넘기면서 (작업, 테이블)별 호출 수를 셉니다. latency를 주면 호출마다 그만큼 기다립니다."""
+    name = "counting"
+
+    def __init__(self, inner: StorageBackend, latency: float = 0.0):
+        self.inner = inner
+        self.latency = latency
+        self.calls: Counter = Counter()
+
+    async def _record(self, op: str, table: str):
+        self.calls[f"{op} {table}"] += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+    async def select(self, table, *, columns="*", filters=(), order=(), limit=None):
+        await self._record("select", table)
+        return await self.inner.select(table, columns=columns, filters=filters, order=order, limit=limit)
+
+    async def insert(self, table, rows):
+        await self._record("insert", table)
+        return await self.inner.insert(table, rows)
+
+    async def upsert(self, table, rows, on_conflict=None, ignore_duplicates=False):
+        await self._record("upsert", table)
+        return await self.inner.upsert(table, rows, on_conflict=on_conflict, ignore_duplicates=ignore_duplicates)
+
+    async def update(self, table, values, filters):
+        await self._record("update", table)
+        return await self.inner.update(table, values, filters)
+
+    async def delete(self, table, filters):
+        await self._record("delete", table)
+        return await self.inner.delete(table, filters)
+
+    async def count(self, table, filters=()):
+        await self._record("count", table)
+        return await self.inner.count(table, filters)
+
+    async def rpc(self, name, params):
+        await self._record("rpc", name)
+        return await self.inner.rpc(name, params)
+
+    async def close(self):
+        await self.inner.close()
+
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+    def reset(self):
+        self.calls.clear()
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# 2. 가짜 게이트웨이 + REST 스텁
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+class FakeGateway:
+    def __init__(self, bot: discord.Client, guild_id: int, rest_latency: float = 0.0):
+        self.bot = bot
+        self.state = bot._connection
+        self.guild_id = guild_id
+        self.rest_latency = rest_latency
+        self._next_snowflake = SNOWFLAKE_BASE
+        self._route_patterns: Dict[str, Pattern] = {}
+        # 서버 상태 (Discord가 들고 있을 원본 payload)
+        self.channels: Dict[int, dict] = {}
+        self.roles: Dict[int, dict] = {}
+        self.members: Dict[int, dict] = {}
+        self.voice_channel_of: Dict[int, Optional[int]] = {}
+        self.audit_entries: List[dict] = []
+        self._audit_sequence = 0
+        self.rest_calls: Counter = Counter()
+        # 벤치마크가 직접 넣은 이벤트와, 봇의 REST 호출 때문에 되돌아온 이벤트를 따로 셉니다.
+        self.events: Counter = Counter()
+        self.echoes: Counter = Counter()
+
+    # --- ID / payload 생성 ---
+    def snowflake(self) -> int:
+        self._next_snowflake += 1
+        return self._next_snowflake
+
+    @staticmethod
+    def user_payload(user_id: int, name: str, bot: bool = False) -> dict:
+        return {"id": str(user_id), "username": name, "global_name": name, "discriminator": "0", "avatar": None, "bot": bot}
+
+    def add_role(self, name: str, position: int, role_id: Optional[int] = None) -> int:
+        role_id = role_id or self.snowflake()
+        self.roles[role_id] = {
+            "id": str(role_id), "name": name, "color": 0, "hoist": False, "position": position,
+            "permissions": "0", "managed": False, "mentionable": False, "flags": 0,
+        }
+        return role_id
+
+    def add_channel(self, name: str, channel_type: discord.ChannelType, parent_id: Optional[int] = None, **extra) -> int:
+        channel_id = self.snowflake()
+        self.channels[channel_id] = self._channel_payload(channel_id, name, channel_type.value, parent_id, extra)
+        return channel_id
+
+    def _channel_payload(self, channel_id: int, name: str, channel_type: int, parent_id: Optional[int], extra: dict) -> dict:
+        payload = {
+            "id": str(channel_id), "guild_id": str(self.guild_id), "type": channel_type, "name": name,
+            "position": extra.pop("position", len(self.channels)), "permission_overwrites": extra.pop("permission_overwrites", []),
+            "parent_id": str(parent_id) if parent_id else None, "nsfw": False, "rate_limit_per_user": 0,
+        }
+        if channel_type in (discord.ChannelType.voice.value, discord.ChannelType.stage_voice.value):
+            payload.update({"bitrate": 64000, "user_limit": 0, "rtc_region": None})
+        payload.update({k: v for k, v in extra.items() if v is not None})
+        return payload
+
+    def add_member(self, name: str, role_ids: Iterable[int] = (), bot: bool = False, user_id: Optional[int] = None) -> int:
+        user_id = user_id or self.snowflake()
+        self.members[user_id] = {
+            "user": self.user_payload(user_id, name, bot), "roles": [str(r) for r in role_ids], "nick": None,
+            "joined_at": FIXED_TIMESTAMP, "premium_since": None, "deaf": False, "mute": False, "flags": 0, "pending": False,
+        }
+        return user_id
+
+    def guild_payload(self, name: str) -> dict:
+        return {
+            "id": str(self.guild_id), "name": name, "icon": None, "owner_id": str(self.bot.user.id),
+            "unavailable": False, "member_count": len(self.members), "large": False,
+            "features": [], "emojis": [], "stickers": [], "premium_tier": 0, "premium_subscription_count": 0,
+            "verification_level": 0, "default_message_notifications": 0, "explicit_content_filter": 0,
+            "mfa_level": 0, "nsfw_level": 0, "preferred_locale": "ko", "afk_timeout": 300,
+            "system_channel_flags": 0, "threads": [], "voice_states": [], "presences": [], "stage_instances": [],
+            "guild_scheduled_events": [], "joined_at": FIXED_TIMESTAMP,
+            "roles": list(self.roles.values()), "channels": list(self.channels.values()), "members": list(self.members.values()),
+        }
+
+    def message_payload(self, channel_id: int, author: dict, content: str = "", embeds: Optional[List[dict]] = None,
+                        message_id: Optional[int] = None, member: Optional[dict] = None) -> dict:
+        payload = {
+            "id": str(message_id or self.snowflake()), "channel_id": str(channel_id), "author": author,
+            "content": content, "timestamp": FIXED_TIMESTAMP, "edited_timestamp": None, "tts": False,
+            "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [], "embeds": embeds or [],
+            "pinned": False, "type": 0, "flags": 0, "components": [],
+        }
+        if channel_id in self.channels:
+            payload["guild_id"] = str(self.guild_id)
+            if member is not None:
+                payload["member"] = {k: v for k, v in member.items() if k != "user"}
+        return payload
+
+    # --- 이벤트 주입 ---
+    def feed(self, event: str, data: dict):
+        """게이트웨이가 이벤트를 받은 것처럼 ConnectionState 파서를 호출합니다. (리스너는 태스크로 예약됨)"""
+        self.events[event] += 1
+        self._deliver(event, data)
+
+    def _deliver(self, event: str, data: dict):
+        self.state.parsers[event](data)
+
+    def _echo(self, event: str, data: dict):
+        # 실제 게이트웨이처럼 REST 응답이 돌아간 뒤에 이벤트가 도착하도록 다음 루프 턴으로 미룹니다.
+        self.echoes[event] += 1
+        asyncio.get_running_loop().call_soon(self._deliver, event, data)
+
+    def _member_event(self, user_id: int) -> dict:
+        return {"guild_id": str(self.guild_id), **self.members[user_id]}
+
+    def member_join(self, name: str) -> int:
+        user_id = self.add_member(name)
+        self.feed("GUILD_MEMBER_ADD", self._member_event(user_id))
+        return user_id
+
+    def member_update(self, user_id: int, moderator_id: Optional[int] = None, **changes) -> None:
+        """멤버 상태를 바꾸고 GUILD_MEMBER_UPDATE를 넣습니다. moderator_id를 주면 그 사람이 한 것으로 감사 로그도 남깁니다."""
+        member = self.members[user_id]
+        old_roles = list(member["roles"])
+        if "roles" in changes:
+            changes["roles"] = [str(r) for r in changes["roles"]]
+        member.update(changes)
+        self.feed("GUILD_MEMBER_UPDATE", self._member_event(user_id))
+        if moderator_id is not None and "roles" in changes:
+            self._record_role_update(moderator_id, user_id, old_roles, member["roles"])
+
+    def voice_move(self, user_id: int, channel_id: Optional[int], echo: bool = False):
+        self.voice_channel_of[user_id] = channel_id
+        data = {
+            "guild_id": str(self.guild_id), "channel_id": str(channel_id) if channel_id else None, "user_id": str(user_id),
+            "member": self.members[user_id], "session_id": f"bench-{user_id}", "deaf": False, "mute": False,
+            "self_deaf": False, "self_mute": False, "self_video": False, "suppress": False, "request_to_speak_timestamp": None,
+        }
+        (self._echo if echo else self.feed)("VOICE_STATE_UPDATE", data)
+
+    def message(self, channel_id: int, user_id: int, content: str = "", embeds: Optional[List[dict]] = None):
+        self.feed("MESSAGE_CREATE", self.message_payload(channel_id, self.members[user_id]["user"], content, embeds, member=self.members[user_id]))
+
+    def bot_message(self, channel_id: int, author: dict, content: str = "", embeds: Optional[List[dict]] = None):
+        """멤버 정보가 없는 외부 봇(Disboard 등)의 메시지를 넣습니다."""
+        self.feed("MESSAGE_CREATE", self.message_payload(channel_id, author, content, embeds))
+
+    # --- 감사 로그 ---
+    def _audit_snowflake(self) -> int:
+        # 상관기는 항목 ID의 생성 시각으로 오래된 항목을 거르므로, 실제처럼 현재 시각 기반 ID를 씁니다.
+        self._audit_sequence += 1
+        return discord.utils.time_snowflake(datetime.now(timezone.utc)) + self._audit_sequence % 4096
+
+    def record_audit(self, action: discord.AuditLogAction, user_id: int, target_id: Optional[int], changes: Optional[List[dict]] = None):
+        """감사 로그 항목을 남기고, 실제 게이트웨이처럼 GUILD_AUDIT_LOG_ENTRY_CREATE로 보냅니다."""
+        entry = {
+            "id": str(self._audit_snowflake()), "user_id": str(user_id), "target_id": str(target_id) if target_id else None,
+            "action_type": action.value, "changes": changes or [], "reason": None,
+        }
+        self.audit_entries.append(entry)
+        self._echo("GUILD_AUDIT_LOG_ENTRY_CREATE", {"guild_id": str(self.guild_id), **entry})
+
+    def _record_role_update(self, user_id: int, target_id: int, old_roles: Iterable[str], new_roles: Iterable[str]):
+        old_roles, new_roles = set(old_roles), set(new_roles)
+        partial = lambda role_ids: [{"id": r, "name": self.roles[int(r)]["name"]} for r in sorted(role_ids) if int(r) in self.roles]
+        changes = []
+        if (added := partial(new_roles - old_roles)): changes.append({"key": "$add", "new_value": added})
+        if (removed := partial(old_roles - new_roles)): changes.append({"key": "$remove", "new_value": removed})
+        if changes:
+            self.record_audit(discord.AuditLogAction.member_role_update, user_id, target_id, changes)
+
+    def _audit_log_page(self, params: dict) -> dict:
+        action_type, before = params.get("action_type"), params.get("before")
+        limit = min(int(params.get("limit") or AUDIT_LOG_PAGE_LIMIT), AUDIT_LOG_PAGE_LIMIT)
+        # Discord처럼 최신 항목부터 돌려줍니다.
+        entries = [
+            entry for entry in reversed(self.audit_entries)
+            if (action_type is None or entry["action_type"] == int(action_type)) and (before is None or int(entry["id"]) < int(before))
+        ][:limit]
+        user_ids = {int(entry["user_id"]) for entry in entries}
+        users = [self.members[user_id]["user"] for user_id in user_ids if user_id in self.members]
+        return {**AUDIT_LOG_EMPTY, "audit_log_entries": entries, "users": users}
+
+    # --- REST 스텁 ---
+    def _match(self, route: discord.http.Route) -> Dict[str, int]:
+        pattern = self._route_patterns.get(route.path)
+        if pattern is None:
+            regex = re.sub(r"\\\{(\w+)\\\}", r"(?P<\1>[^/]+)", re.escape(route.path))
+            pattern = self._route_patterns[route.path] = re.compile(regex + r"(?:\?.*)?\Z")
+        match = pattern.match(route.url[len(route.BASE):])
+        if not match: return {}
+        return {k: int(v) for k, v in match.groupdict().items() if v.isdigit()}
+
+    async def request(self, route: discord.http.Route, *, files=None, form=None, **kwargs) -> Any:
+        """HTTPClient.request 대체. 호출 수를 세고, 서버 상태를 바꾼 뒤 Discord와 같은 모양의 응답을 돌려줍니다."""
+        self.rest_calls[f"{route.method} {route.path}"] += 1
+        started_at = time.perf_counter()
+        if self.rest_latency > 0:
+            await asyncio.sleep(self.rest_latency)
+        else:
+            await asyncio.sleep(0)
+        try:
+            body = kwargs.get("json")
+            if body is None and form:
+                body = next((json.loads(f["value"]) for f in form if f.get("name") == "payload_json"), None)
+            return self._respond(route.method, route.path, self._match(route), body or {}, kwargs.get("params") or {})
+        finally:
+            perf.add_rest_time(time.perf_counter() - started_at)
+
+    def _respond(self, method: str, path: str, ids: Dict[str, int], body: Any, params: dict) -> Any:
+        channel_id, user_id = ids.get("channel_id"), ids.get("user_id")
+
+        if path == "/channels/{channel_id}/messages" and method == "POST":
+            payload = self.message_payload(channel_id, self.bot_user, body.get("content") or "", body.get("embeds"))
+            if channel_id in self.channels:
+                self._echo("MESSAGE_CREATE", payload)
+            return payload
+        if path == "/channels/{channel_id}/messages/{message_id}":
+            if method == "DELETE":
+                self._echo("MESSAGE_DELETE", {"id": str(ids["message_id"]), "channel_id": str(channel_id), "guild_id": str(self.guild_id)})
+                return None
+            return self.message_payload(channel_id, self.bot_user, body.get("content") or "", body.get("embeds"), message_id=ids["message_id"])
+        if path == "/users/@me/channels" and method == "POST":
+            recipient = int(body["recipient_id"])
+            user = self.members[recipient]["user"] if recipient in self.members else self.user_payload(recipient, "unknown")
+            return {"id": str(self.snowflake()), "type": discord.ChannelType.private.value, "recipients": [user], "last_message_id": None}
+
+        if path == "/guilds/{guild_id}/members/{user_id}":
+            if user_id not in self.members: return None
+            if method == "PATCH":
+                self._apply_member_patch(user_id, body)
+            return self._member_event(user_id)
+        if path == "/guilds/{guild_id}/members/{user_id}/roles/{role_id}" and user_id in self.members:
+            old_roles = self.members[user_id]["roles"]
+            roles = [r for r in old_roles if r != str(ids["role_id"])]
+            if method == "PUT": roles.append(str(ids["role_id"]))
+            self.members[user_id]["roles"] = roles
+            self._echo("GUILD_MEMBER_UPDATE", self._member_event(user_id))
+            self._record_role_update(self.bot.user.id, user_id, old_roles, roles)
+            return None
+
+        if path == "/guilds/{guild_id}/channels":
+            if method == "POST":
+                new_id = self.snowflake()
+                parent_id = int(body["parent_id"]) if body.get("parent_id") else None
+                extra = {k: v for k, v in body.items() if k in ("position", "permission_overwrites", "user_limit", "bitrate", "topic")}
+                payload = self.channels[new_id] = self._channel_payload(new_id, body.get("name", "channel"), body.get("type", 0), parent_id, extra)
+                self._echo("CHANNEL_CREATE", payload)
+                self.record_audit(discord.AuditLogAction.channel_create, self.bot.user.id, new_id)
+                return payload
+            if method == "PATCH":
+                for entry in body if isinstance(body, list) else []:
+                    if (payload := self.channels.get(int(entry["id"]))) is not None:
+                        payload.update({k: v for k, v in entry.items() if k != "id"})
+                        self._echo("CHANNEL_UPDATE", dict(payload))
+                        self.record_audit(discord.AuditLogAction.channel_update, self.bot.user.id, int(entry["id"]))
+                return None
+            return list(self.channels.values())
+        if path == "/channels/{channel_id}":
+            payload = self.channels.get(channel_id)
+            if method == "DELETE":
+                if payload is not None:
+                    del self.channels[channel_id]
+                    self._echo("CHANNEL_DELETE", payload)
+                    self.record_audit(discord.AuditLogAction.channel_delete, self.bot.user.id, channel_id)
+                return payload
+            if method == "PATCH" and payload is not None:
+                payload.update({k: v for k, v in body.items() if k in payload or k in ("name", "user_limit", "parent_id")})
+                self._echo("CHANNEL_UPDATE", dict(payload))
+                self.record_audit(discord.AuditLogAction.channel_update, self.bot.user.id, channel_id)
+            return payload
+
+        if path == "/guilds/{guild_id}/invites":
+            return []
+        if path == "/guilds/{guild_id}/audit-logs":
+            return self._audit_log_page(params)
+        return None
+
+    def _apply_member_patch(self, user_id: int, body: dict):
+        member = self.members[user_id]
+        old_roles = list(member["roles"])
+        changed = False
+        if "roles" in body:
+            member["roles"] = [str(r) for r in body["roles"]]; changed = True
+        if "nick" in body:
+            member["nick"] = body["nick"]; changed = True
+        if "communication_disabled_until" in body:
+            member["communication_disabled_until"] = body["communication_disabled_until"]; changed = True
+        if changed:
+            self._echo("GUILD_MEMBER_UPDATE", self._member_event(user_id))
+        if "roles" in body:
+            self._record_role_update(self.bot.user.id, user_id, old_roles, member["roles"])
+        if "nick" in body or "communication_disabled_until" in body:
+            self.record_audit(discord.AuditLogAction.member_update, self.bot.user.id, user_id)
+        if "channel_id" in body:
+            channel_id = int(body["channel_id"]) if body["channel_id"] else None
+            self.voice_move(user_id, channel_id, echo=True)
+
+    @property
+    def bot_user(self) -> dict:
+        return self.user_payload(self.bot.user.id, self.bot.user.name, bot=True)
+
+    def reset_counts(self):
+        self.rest_calls.clear()
+        self.events.clear()
+        self.echoes.clear()
@@ -0,0 +1,315 @@
+# benchmarks/replay.py
+"""
+이벤트 재생 벤치마크입니다. 실제 Cog를 모두 로드한 MyBot에 가짜 게이트웨이 이벤트를 흘려 보내고,
+시나리오마다 처리량, 리스너 지연(p50/p99), 이벤트당 REST/DB 호출 수, 이벤트당 CPU 시간을 기록합니다.
+리스너 지연은 감사 로그 항목을 기다린 시간을 뺀 처리 시간이며, 대기 시간은 audit_wait_*로 따로 기록합니다.
+Discord와 Supabase에는 연결하지 않습니다. (REST는 FakeGateway, DB는 MemoryBackend)
+
+    python -m benchmarks.replay                                  # 모든 시나리오 실행 후 data/benchmarks/replay_latest.json 저장
+    python -m benchmarks.replay --scenarios role_storm,voice_hops --scale 0.2
+    python -m benchmarks.replay --compare baseline.json          # 기준 결과보다 나빠지면 종료 코드 1
+
+호출 수는 시드가 같으면 실행마다 같고, 시간 지표는 --tolerance 범위 안의 흔들림을 허용합니다.
+"""
+import os
+import sys
+
+# main/utils 모듈이 import 시점에 환경 변수를 읽으므로 가장 먼저 설정합니다.
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("STATE_SNAPSHOT", "0")
+os.environ.setdefault("METRICS", "0")
+os.environ.setdefault("LOOP_MONITOR", "0")
+os.environ.setdefault("PERF_INSTRUMENTATION", "1")
+
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import platform
+import subprocess
+from typing import Any, Dict, List, Optional, Set
+
+import discord
+from discord.ext import tasks
+
+import utils.perf as perf_module
+from utils.perf import perf
+from utils.storage import MemoryBackend
+from utils.log_dispatcher import log_dispatcher
+from utils.database import set_storage_backend, write_behind, LOCAL_STORE_TABLES
+from main import MyBot, intents
+
+from .fakes import CountingBackend, FakeGateway
+from .scenarios import SCENARIOS, World
+
+logger = logging.getLogger("benchmarks.replay")
+
+BOT_USER_ID = 1_000_000_000_000_000_001
+GUILD_ID = 1_000_000_000_000_000_002
+DEFAULT_OUTPUT = "data/benchmarks/replay_latest.json"
+# 처리가 끝났는지 판단할 때 기다리지 않는 상시 실행 작업
+LONG_RUNNING_COROUTINES = {"Reminder._run_scheduler", "WriteBehindQueue._run", "Loop._loop", "Event.wait"}
+# 기준 결과와 비교할 지표: (키, 높을수록 나쁜지, 호출 수 지표인지)
+COMPARED_METRICS = [
+    ("rest_per_event", True, True),
+    ("db_per_event", True, True),
+    ("handler_p99_ms", True, False),
+    ("cpu_ms_per_event", True, False),
+    ("throughput_eps", False, False),
+]
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# 1. 봇 준비
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+class Harness:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.bot: Optional[MyBot] = None
+        self.gateway: Optional[FakeGateway] = None
+        self.backend: Optional[CountingBackend] = None
+        self.world: Optional[World] = None
+
+    async def start(self):
+        args = self.args
+        # 시나리오의 모든 측정값으로 백분위를 계산합니다. (운영 기본값은 핸들러당 최근 1,000개)
+        perf_module.MAX_SAMPLES_PER_HANDLER = 10_000_000
+
+        bot = self.bot = MyBot(command_prefix="/", intents=intents, chunk_guilds_at_startup=False)
+        await bot._async_setup_hook()
+        bot._connection.user = discord.ClientUser(state=bot._connection, data=FakeGateway.user_payload(BOT_USER_ID, "bench-bot", bot=True))
+
+        gateway = self.gateway = FakeGateway(bot, GUILD_ID, rest_latency=args.rest_latency_ms / 1000)
+        bot.http.request = gateway.request
+        world = self.world = World(gateway, random.Random(f"{args.seed}:world"), args.members)
+        gateway.add_member("bench-bot", bot=True, user_id=BOT_USER_ID)
+
+        # 시드 데이터는 계수기를 거치지 않고 넣습니다.
+        storage = MemoryBackend()
+        await storage.upsert("channel_configs", world.channel_config_rows())
+        await storage.upsert("sticky_messages", world.sticky_rows())
+        self.backend = CountingBackend(storage, latency=args.db_latency_ms / 1000)
+        set_storage_backend(self.backend)
+        if LOCAL_STORE_TABLES:
+            set_storage_backend(self.backend, tables=LOCAL_STORE_TABLES)
+
+        await bot.setup_hook()
+        gateway.feed("GUILD_CREATE", gateway.guild_payload("벤치마크 서버"))
+        bot._ready.set()
+
+        # main.on_ready와 같은 방법으로 Cog 설정을 불러옵니다.
+        await bot.load_cog_configs()
+
+        await self.drain(set(), timeout=args.drain_timeout)
+        stopped = self._stop_task_loops()
+        logger.info(f"🧪 벤치마크 준비 완료 (Cog {len(bot.cogs)}개, 멤버 {len(gateway.members)}명, 멈춘 작업 루프 {stopped}개)")
+
+    def _stop_task_loops(self) -> int:
+        """주기 작업은 실행 시간에 따라 호출 수가 달라지므로 멈추고, 리스너 비용만 잽니다."""
+        count = 0
+        for owner in [self.bot, *self.bot.cogs.values()]:
+            for attr_name in dir(type(owner)):
+                if isinstance(getattr(type(owner), attr_name, None), tasks.Loop):
+                    getattr(owner, attr_name).cancel()
+                    count += 1
+        return count
+
+    async def drain(self, baseline: Set[asyncio.Task], timeout: float) -> bool:
+        """이벤트가 만든 작업(리스너, 디바운스, 묶음 처리)이 모두 끝날 때까지 기다립니다. 시간 초과면 False."""
+        deadline = time.monotonic() + timeout
+        idle_checks = 0
+        current = asyncio.current_task()
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+            busy = any(
+                task not in baseline and task is not current and not task.done()
+                and getattr(task.get_coro(), "__qualname__", "") not in LONG_RUNNING_COROUTINES
+                for task in asyncio.all_tasks()
+            )
+            idle_checks = 0 if busy else idle_checks + 1
+            if idle_checks >= 3:
+                return True
+        return False
+
+    async def close(self):
+        await write_behind.stop()
+        await log_dispatcher.flush_all()
+        for task in asyncio.all_tasks():
+            if task is not asyncio.current_task(): task.cancel()
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# 2. 시나리오 실행 및 집계
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def run_scenario(harness: Harness, name: str) -> Dict[str, Any]:
+    args, gateway, backend = harness.args, harness.gateway, harness.backend
+    correlator = harness.bot.get_cog("AuditLogCorrelator")
+    audit_stats_before = dict(correlator.stats) if correlator else {}
+    perf.reset(); gateway.reset_counts(); backend.reset()
+    baseline = set(asyncio.all_tasks())
+    settle = lambda: harness.drain(baseline, args.drain_timeout)
+
+    cpu_started, started_at = time.process_time(), time.perf_counter()
+    await SCENARIOS[name](harness.world, random.Random(f"{args.seed}:{name}"), args.scale, settle)
+    feed_seconds = time.perf_counter() - started_at
+    drained = await settle()
+    wall_seconds = time.perf_counter() - started_at
+    # 지연 쓰기/로그 묶음도 이 시나리오의 비용으로 셉니다.
+    await log_dispatcher.flush_all()
+    await write_behind.flush()
+    cpu_seconds = time.process_time() - cpu_started
+
+    listeners = {handler: stats for handler, stats in perf.handlers.items() if handler.startswith("listener:")}
+    samples = sorted(sample for stats in listeners.values() for sample in stats.busy_samples)
+    wall_samples = sorted(sample for stats in listeners.values() for sample in stats.samples)
+    audit_wait_seconds = sum(stats.wait_time for stats in perf.handlers.values())
+    events = sum(gateway.events.values())
+    rest_calls, db_calls = sum(gateway.rest_calls.values()), backend.total()
+    per_event = lambda value: round(value / events, 4) if events else 0.0
+    handlers = sorted(((handler, stats.summary()) for handler, stats in perf.handlers.items()), key=lambda row: row[1]["busy_p99"], reverse=True)
+
+    return {
+        "events": events,
+        "echoed_events": sum(gateway.echoes.values()),
+        "wall_seconds": round(wall_seconds, 3),
+        "feed_seconds": round(feed_seconds, 3),
+        "cpu_seconds": round(cpu_seconds, 3),
+        "throughput_eps": round(events / wall_seconds, 1) if wall_seconds else 0.0,
+        "cpu_ms_per_event": round(cpu_seconds * 1000 / events, 4) if events else 0.0,
+        "handler_p50_ms": round(_percentile(samples, 0.50) * 1000, 3),
+        "handler_p99_ms": round(_percentile(samples, 0.99) * 1000, 3),
+        "handler_max_ms": round(samples[-1] * 1000, 3) if samples else 0.0,
+        "handler_p99_with_wait_ms": round(_percentile(wall_samples, 0.99) * 1000, 3),
+        "audit_wait_seconds": round(audit_wait_seconds, 3),
+        "audit_log": {key: value - audit_stats_before.get(key, 0) for key, value in (correlator.stats if correlator else {}).items()},
+        "handler_errors": sum(stats.errors for stats in perf.handlers.values()),
+        "rest_calls": rest_calls,
+        "rest_per_event": per_event(rest_calls),
+        "db_calls": db_calls,
+        "db_per_event": per_event(db_calls),
+        "rest_by_route": dict(gateway.rest_calls.most_common()),
+        "db_by_table": dict(backend.calls.most_common()),
+        "top_handlers": {
+            handler: {
+                "calls": s["calls"], "p99_ms": round(s["busy_p99"] * 1000, 3), "p99_with_wait_ms": round(s["p99"] * 1000, 3),
+                "avg_ms": round(s["avg"] * 1000, 3), "audit_wait_avg_ms": round(s["wait_avg"] * 1000, 3),
+            }
+            for handler, s in handlers[:10]
+        },
+        "drain_timed_out": not drained,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()] if args.scenarios else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"❌ 알 수 없는 시나리오: {', '.join(unknown)} (가능: {', '.join(SCENARIOS)})")
+
+    harness = Harness(args)
+    await harness.start()
+    results: Dict[str, Any] = {}
+    try:
+        for name in names:
+            logger.warning(f"▶️ 시나리오 실행: {name}")
+            results[name] = await run_scenario(harness, name)
+            _print_result(name, results[name])
+    finally:
+        await harness.close()
+    return {
+        "meta": {
+            "revision": _git_revision(), "python": platform.python_version(), "discord_py": discord.__version__,
+            "seed": args.seed, "scale": args.scale, "members": args.members,
+            "rest_latency_ms": args.rest_latency_ms, "db_latency_ms": args.db_latency_ms,
+            "write_behind": os.environ.get("DB_WRITE_BEHIND", "1") != "0",
+        },
+        "scenarios": results,
+    }
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# 3. 출력 및 기준 결과 비교
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+def _print_result(name: str, result: Dict[str, Any]):
+    warning = " ⚠️ 처리 대기 시간 초과" if result["drain_timed_out"] else ""
+    print(
+        f"[{name}] 이벤트 {result['events']:,}개 | {result['throughput_eps']:,.1f} ev/s | "
+        f"p50 {result['handler_p50_ms']:.2f}ms · p99 {result['handler_p99_ms']:.2f}ms | "
+        f"REST {result['rest_per_event']:.3f}/ev · DB {result['db_per_event']:.3f}/ev | "
+        f"CPU {result['cpu_ms_per_event']:.3f}ms/ev | 감사 로그 대기 {result['audit_wait_seconds']:.1f}s | 오류 {result['handler_errors']}{warning}"
+    )
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float, count_tolerance: float) -> List[str]:
+    """기준 결과보다 허용 범위 이상 나빠진 지표를 설명하는 문자열 목록을 돌려줍니다."""
+    regressions = []
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base: continue
+        for key, higher_is_worse, is_count in COMPARED_METRICS:
+            old, new = base.get(key), result.get(key)
+            if old is None or new is None: continue
+            limit = count_tolerance if is_count else tolerance
+            worse = new > old * (1 + limit) + 1e-9 if higher_is_worse else new < old * (1 - limit) - 1e-9
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "신규"
+            print(f"  {name:<16} {key:<18} {old:>12} → {new:<12} ({change}){' ❌' if worse else ''}")
+            if worse:
+                regressions.append(f"{name}.{key}: {old} → {new} ({change})")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="가짜 게이트웨이 이벤트를 재생해 Cog 리스너 비용을 측정합니다.")
+    parser.add_argument("--scenarios", default="", help=f"쉼표로 구분한 시나리오 (기본: 전체 = {','.join(SCENARIOS)})")
+    parser.add_argument("--scale", type=float, default=1.0, help="시나리오 이벤트 수 배율")
+    parser.add_argument("--seed", type=int, default=20240101)
+    parser.add_argument("--members", type=int, default=500, help="벤치마크 서버의 기존 멤버 수")
+    parser.add_argument("--rest-latency-ms", type=float, default=0.0, help="가짜 REST 호출마다 기다릴 시간")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="DB 호출마다 기다릴 시간")
+    parser.add_argument("--drain-timeout", type=float, default=60.0, help="이벤트 처리가 끝나길 기다리는 최대 시간(초)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="결과 JSON 경로")
+    parser.add_argument("--compare", default=None, help="비교할 기준 결과 JSON 경로")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="시간 지표 허용 악화 비율")
+    parser.add_argument("--count-tolerance", type=float, default=0.05, help="REST/DB 호출 수 허용 증가 비율")
+    parser.add_argument("--verbose", action="store_true", help="봇 INFO 로그도 출력")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    # main.py가 설정한 루트 로거를 그대로 쓰되, 수만 건의 INFO 로그는 측정을 방해하므로 기본으로 숨깁니다.
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    report = asyncio.run(run(args))
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"💾 결과를 저장했습니다: {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"📊 기준 결과와 비교: {args.compare} (리비전 {baseline.get('meta', {}).get('revision')})")
+        regressions = compare(baseline, report, args.tolerance, args.count_tolerance)
+        if regressions:
+            print(f"❌ 성능 회귀 {len(regressions)}건:\n  " + "\n  ".join(regressions))
+            return 1
+        print("✅ 허용 범위를 넘는 성능 회귀가 없습니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
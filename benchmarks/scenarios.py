@@ -0,0 +1,162 @@
+# benchmarks/scenarios.py
+"""
+벤치마크 서버 구성과 재생할 합성 이벤트 시나리오입니다.
+모든 무작위 선택은 시드를 받은 random.Random으로만 하므로, 같은 시드/배율이면 매번 같은 이벤트 순서가 만들어집니다.
+"""
+import random
+import asyncio
+from typing import Awaitable, Callable, Dict, List
+
+import discord
+
+from utils.ui_defaults import UI_ROLE_KEY_MAP, ADMIN_ROLE_KEYS
+from cogs.features.reminder import REMINDER_CONFIG
+
+from .fakes import FakeGateway
+
+Settle = Callable[[], Awaitable[None]]
+
+# 채널 설정 키 -> 벤치마크 서버의 채널 이름
+TEXT_CHANNEL_KEYS = {
+    "new_welcome_channel_id": "welcome", "farewell_channel_id": "farewell", "boost_log_channel_id": "boost-log",
+    "main_chat_channel_id": "main-chat", "bump_reminder_channel_id": "bump", "dicoall_reminder_channel_id": "bump",
+    **{f"log_channel_{name}": f"log-{name}" for name in (
+        "ban", "channel", "invite", "join", "kick", "leave", "message", "nickname", "role", "server", "timeout", "voice"
+    )},
+}
+VOICE_CREATOR_KEYS = ["vc_creator_mixer", "vc_creator_line", "vc_creator_sample", "vc_creator_game"]
+EXTRA_ROLE_KEYS = [
+    "role_notify_welcome", "role_notify_dding", "role_guest", "role_admin_total",
+    "bump_reminder_role_id", "dicoall_reminder_role_id",
+    *[f"role_boost_ticket_{i}" for i in range(1, 11)],
+]
+LOBBY_VOICE_CHANNELS = 3
+
+
+class World:
+    """벤치마크 서버의 채널/역할/멤버 ID와 DB에 미리 넣을 설정을 담습니다."""
+    def __init__(self, gateway: FakeGateway, rng: random.Random, member_count: int):
+        self.gateway = gateway
+        self.ids: Dict[str, int] = {}
+
+        role_keys = list(dict.fromkeys([*UI_ROLE_KEY_MAP, *ADMIN_ROLE_KEYS, *EXTRA_ROLE_KEYS]))
+        gateway.add_role("@everyone", 0, role_id=gateway.guild_id)
+        for position, key in enumerate(role_keys, start=1):
+            name = UI_ROLE_KEY_MAP.get(key, {}).get("name", key)
+            if key.startswith("role_boost_ticket_"):
+                name = f"역할선택권 {key.rsplit('_', 1)[1]}"
+            self.ids[key] = gateway.add_role(name, position)
+
+        by_name: Dict[str, int] = {}
+        for key, name in TEXT_CHANNEL_KEYS.items():
+            if name not in by_name:
+                by_name[name] = gateway.add_channel(name, discord.ChannelType.text)
+            self.ids[key] = by_name[name]
+        self.sticky_channel_id = gateway.add_channel("sticky", discord.ChannelType.text)
+        self.bump_channel_id = self.ids["bump_reminder_channel_id"]
+
+        self.ids["temp_vc_category_id"] = gateway.add_channel("voice", discord.ChannelType.category)
+        for key in VOICE_CREATOR_KEYS:
+            self.ids[key] = gateway.add_channel(key.replace("vc_creator_", "create-"), discord.ChannelType.voice, self.ids["temp_vc_category_id"])
+        self.lobby_voice_ids = [
+            gateway.add_channel(f"lobby-{i}", discord.ChannelType.voice, self.ids["temp_vc_category_id"]) for i in range(LOBBY_VOICE_CHANNELS)
+        ]
+
+        # 역할 폭주 시나리오에서 켜고 끌 역할 (관리자 역할은 제외해 접두사 계산이 실제로 일어나게 함)
+        admin_ids = {self.ids[key] for key in ADMIN_ROLE_KEYS if key in self.ids}
+        self.toggle_role_ids: List[int] = [self.ids[key] for key in UI_ROLE_KEY_MAP if self.ids[key] not in admin_ids]
+        resident_id = self.ids.get("role_resident_rookie")
+
+        # 역할 폭주 시나리오에서 역할을 바꾸는 관리자 (감사 로그의 실행자)
+        self.moderator_id = gateway.add_member("moderator", [self.ids[key] for key in ADMIN_ROLE_KEYS if key in self.ids])
+        self.member_ids: List[int] = []
+        for i in range(member_count):
+            roles = rng.sample(self.toggle_role_ids, k=min(3, len(self.toggle_role_ids)))
+            if resident_id and resident_id not in roles: roles.append(resident_id)
+            self.member_ids.append(gateway.add_member(f"member{i:05d}", roles))
+
+    def channel_config_rows(self) -> List[dict]:
+        return [{"channel_key": key, "channel_id": str(value)} for key, value in self.ids.items()]
+
+    def sticky_rows(self) -> List[dict]:
+        return [{
+            "channel_id": self.sticky_channel_id, "message_id": self.gateway.snowflake(), "guild_id": self.gateway.guild_id,
+            "embed_data": {"title": "📌 고정 안내", "description": "벤치마크용 고정 임베드입니다.", "color": 0x5865F2},
+        }]
+
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# 시나리오
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+async def _yield():
+    # 게이트웨이는 메시지를 하나씩 읽으므로, 이벤트 사이에 한 번씩 루프에 제어권을 넘깁니다.
+    await asyncio.sleep(0)
+
+
+async def sticky_messages(world: World, rng: random.Random, scale: float, settle: Settle):
+    """고정 임베드가 있는 채널에 메시지 10,000개"""
+    for i in range(int(10_000 * scale)):
+        world.gateway.message(world.sticky_channel_id, rng.choice(world.member_ids), f"메시지 {i}")
+        await _yield()
+
+
+async def join_waves(world: World, rng: random.Random, scale: float, settle: Settle):
+    """100명씩 5번 몰려오는 입장"""
+    for wave in range(5):
+        for i in range(max(1, int(100 * scale))):
+            world.gateway.member_join(f"joiner{wave}-{i:04d}")
+            await _yield()
+        await asyncio.sleep(0.25)
+
+
+async def role_storm(world: World, rng: random.Random, scale: float, settle: Settle):
+    """기존 멤버 200명에게 역할 추가/제거 2,000번 (외부 봇/관리자가 일괄 수정하는 상황)"""
+    targets = rng.sample(world.member_ids, k=min(200, len(world.member_ids)))
+    for _ in range(int(2_000 * scale)):
+        user_id = rng.choice(targets)
+        roles = [int(r) for r in world.gateway.members[user_id]["roles"]]
+        role_id = rng.choice(world.toggle_role_ids)
+        roles = [r for r in roles if r != role_id] if role_id in roles else [*roles, role_id]
+        world.gateway.member_update(user_id, moderator_id=world.moderator_id, roles=roles)
+        await _yield()
+
+
+async def voice_hops(world: World, rng: random.Random, scale: float, settle: Settle):
+    """200명이 생성 채널 입장 -> 로비로 이동을 3번 반복 (두 번째부터는 생성 쿨타임에 걸림)"""
+    hoppers = rng.sample(world.member_ids, k=min(max(1, int(200 * scale)), len(world.member_ids)))
+    creators = [world.ids[key] for key in VOICE_CREATOR_KEYS]
+    for _ in range(3):
+        for user_id in hoppers:
+            world.gateway.voice_move(user_id, rng.choice(creators))
+            await _yield()
+        # 봇이 만든 채널로 옮겨진 뒤에 떠나도록, 라운드마다 처리가 끝나길 기다립니다.
+        await settle()
+        for user_id in hoppers:
+            world.gateway.voice_move(user_id, rng.choice(world.lobby_voice_ids))
+            await _yield()
+        await settle()
+
+
+async def reminder_bursts(world: World, rng: random.Random, scale: float, settle: Settle):
+    """갱신 봇의 완료 메시지 200개가 일반 대화 800개 사이에 섞여 들어옴"""
+    bump_bots = {key: FakeGateway.user_payload(config["bot_id"], config["name"], bot=True) for key, config in REMINDER_CONFIG.items()}
+    stream = [("bump", key) for key in REMINDER_CONFIG for _ in range(int(100 * scale))]
+    stream += [("chat", None)] * int(800 * scale)
+    rng.shuffle(stream)
+    for kind, key in stream:
+        if kind == "bump":
+            user_id = rng.choice(world.member_ids)
+            embed = {"type": "rich", "description": f"<@{user_id}> {REMINDER_CONFIG[key]['keyword']}"}
+            world.gateway.bot_message(world.bump_channel_id, bump_bots[key], embeds=[embed])
+        else:
+            world.gateway.message(world.bump_channel_id, rng.choice(world.member_ids), "ㅎㅇ")
+        await _yield()
+
+
+SCENARIOS: Dict[str, Callable[[World, random.Random, float, Settle], Awaitable[None]]] = {
+    "sticky_messages": sticky_messages,
+    "join_waves": join_waves,
+    "role_storm": role_storm,
+    "voice_hops": voice_hops,
+    "reminder_bursts": reminder_bursts,
+}
@@ -4,22 +4,28 @@ from discord import ui
 from discord.ext import commands
 import logging
 import asyncio
+from collections import deque
 from datetime import datetime, timezone, timedelta
 # ▼▼▼ [핵심 수정] 누락되었던 Optional을 import 합니다. ▼▼▼
-from typing import Optional
+from typing import Deque, Dict, List, Optional, Tuple
 
 from utils.database import (
-    get_id, add_anonymous_message, get_embed_from_db,
+    get_id, add_anonymous_message, get_embed,
     get_panel_id, save_panel_id, get_panel_components_from_db,
     has_posted_anonymously_today
 )
 from utils.helpers import format_embed_from_db, format_seconds_to_hms
+from utils.view_registry import panel_views
 
 logger = logging.getLogger(__name__)
 
 # 한국 시간대(KST)를 나타내는 timezone 객체
 KST = timezone(timedelta(hours=9))
 
+# 한 메시지에 묶어 보낼 수 있는 임베드 수와 전체 글자 수 제한
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
 class AnonymousModal(ui.Modal, title="익명 메시지 작성"):
     content = ui.TextInput(
         label="내용",
@@ -36,10 +42,15 @@ class AnonymousModal(ui.Modal, title="익명 메시지 작성"):
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
 
+        # 버튼을 여러 번 눌러 모달을 두 개 연 경우를 막습니다.
+        if await has_posted_anonymously_today(interaction.user.id):
+            await interaction.followup.send("❌ 오늘은 이미 글을 작성했습니다.", ephemeral=True)
+            return
+
         try:
             await add_anonymous_message(interaction.guild_id, interaction.user.id, self.content.value)
 
-            embed_data = await get_embed_from_db("anonymous_message")
+            embed_data = get_embed("anonymous_message")
             anonymous_embed = None
             if embed_data:
                 anonymous_embed = format_embed_from_db(embed_data)
@@ -48,7 +59,8 @@ class AnonymousModal(ui.Modal, title="익명 메시지 작성"):
             
             # [수정] 익명 메시지를 보낼 채널을 interaction.channel 대신 self.cog.panel_channel로 명시합니다.
             target_channel = self.cog.panel_channel or interaction.channel
-            await self.cog.regenerate_panel(target_channel, last_anonymous_embed=anonymous_embed)
+            if anonymous_embed is None or not await self.cog.enqueue_post(target_channel, anonymous_embed):
+                raise RuntimeError("익명 메시지를 게시판에 올리지 못했습니다.")
             
             message = await interaction.followup.send("✅ 당신의 익명 메시지가 성공적으로 전달되었습니다.", ephemeral=True, wait=True)
             await asyncio.sleep(5)
@@ -79,6 +91,7 @@ class AnonymousPanelView(ui.View):
         self.add_item(button)
 
     async def on_button_click(self, interaction: discord.Interaction):
+        # 오늘 작성자 목록은 메모리에 있으므로 DB를 기다리지 않고 바로 응답합니다.
         already_posted = await has_posted_anonymously_today(interaction.user.id)
         
         if already_posted:
@@ -96,20 +109,32 @@ class AnonymousBoard(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.panel_channel_id: Optional[int] = None
+        self.panel_message_id: Optional[int] = None
         self.view_instance: Optional[AnonymousPanelView] = None
+        # 채널별 게시 대기열과 이를 순서대로 처리하는 작업
+        self.post_queues: Dict[int, Deque[Tuple[discord.Embed, asyncio.Future]]] = {}
+        self.post_workers: Dict[int, asyncio.Task] = {}
+        # 게시 작업과 패널 재설치가 같은 채널의 패널을 동시에 건드리지 않도록 막는 잠금
+        self.channel_locks: Dict[int, asyncio.Lock] = {}
         logger.info("AnonymousBoard Cog가 성공적으로 초기화되었습니다.")
 
     async def cog_load(self):
         await self.load_configs()
+
+    def cog_unload(self):
+        for task in self.post_workers.values():
+            task.cancel()
         
     async def register_persistent_views(self):
         self.view_instance = AnonymousPanelView(self)
-        await self.view_instance.setup_buttons()
+        await panel_views.ensure_built("anonymous_board", self.view_instance)
         self.bot.add_view(self.view_instance)
         logger.info("✅ 익명 게시판의 영구 View가 성공적으로 등록되었습니다.")
         
     async def load_configs(self):
         self.panel_channel_id = get_id("anonymous_board_channel_id")
+        if (panel_info := get_panel_id("anonymous_board")):
+            self.panel_message_id = panel_info.get('message_id')
         logger.info("[AnonymousBoard Cog] 데이터베이스로부터 설정을 성공적으로 로드했습니다.")
         
     @property
@@ -120,12 +145,81 @@ class AnonymousBoard(commands.Cog):
                 return channel
         return None
         
+    # --- 게시 파이프라인 ---
+    async def enqueue_post(self, channel: discord.TextChannel, embed: discord.Embed) -> bool:
+        """익명 글을 채널 대기열에 넣고, 게시가 끝나면 성공 여부를 반환합니다."""
+        future = asyncio.get_running_loop().create_future()
+        self.post_queues.setdefault(channel.id, deque()).append((embed, future))
+        worker = self.post_workers.get(channel.id)
+        if worker is None or worker.done():
+            self.post_workers[channel.id] = asyncio.create_task(self._post_worker(channel))
+        return await future
+
+    async def _post_worker(self, channel: discord.TextChannel):
+        """채널마다 하나씩 돌며, 동시에 들어온 글은 한 메시지로 묶어 순서대로 게시합니다."""
+        queue = self.post_queues[channel.id]
+        while queue:
+            batch: List[Tuple[discord.Embed, asyncio.Future]] = [queue.popleft()]
+            total_chars = len(batch[0][0])
+            while len(batch) < MAX_EMBEDS_PER_MESSAGE and queue:
+                embed, _ = queue[0]
+                if total_chars + len(embed) > MAX_EMBED_CHARS_PER_MESSAGE: break
+                batch.append(queue.popleft())
+                total_chars += len(embed)
+
+            try:
+                async with self._channel_lock(channel.id):
+                    success = await self._publish(channel, [embed for embed, _ in batch])
+            except Exception as e:
+                logger.error(f"❌ 익명 글 게시 중 오류 발생: {e}", exc_info=True)
+                success = False
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(success)
+
+    def _channel_lock(self, channel_id: int) -> asyncio.Lock:
+        return self.channel_locks.setdefault(channel_id, asyncio.Lock())
+
+    async def _publish(self, channel: discord.TextChannel, embeds: List[discord.Embed]) -> bool:
+        embed_data = get_embed("panel_anonymous_board")
+        if not embed_data:
+            logger.error("DB에서 'panel_anonymous_board' 임베드를 찾을 수 없어 패널을 생성할 수 없습니다.")
+            return False
+        if self.view_instance is None:
+            await self.register_persistent_views()
+
+        posted = False
+        old_panel_id = self.panel_message_id if channel.id == self.panel_channel_id or self.panel_channel_id is None else None
+        # 패널이 채널의 마지막 메시지라면, 패널 메시지를 글로 바꾸고 새 패널만 보냅니다.
+        if old_panel_id and channel.last_message_id == old_panel_id:
+            try:
+                await channel.get_partial_message(old_panel_id).edit(content=None, embeds=embeds, view=None)
+                posted = True
+            except (discord.NotFound, discord.Forbidden):
+                pass
+        if not posted:
+            await channel.send(embeds=embeds)
+            if old_panel_id:
+                try:
+                    await channel.get_partial_message(old_panel_id).delete()
+                except (discord.NotFound, discord.Forbidden): pass
+
+        new_panel_message = await channel.send(embed=discord.Embed.from_dict(embed_data), view=self.view_instance)
+        self.panel_message_id = new_panel_message.id
+        await save_panel_id("anonymous_board", new_panel_message.id, channel.id, deferred=True)
+        return True
+
     async def regenerate_panel(self, channel: Optional[discord.TextChannel] = None, panel_key: str = "panel_anonymous_board", last_anonymous_embed: Optional[discord.Embed] = None) -> bool:
         target_channel = channel or self.panel_channel
         if not target_channel:
             logger.warning("익명 게시판 패널을 재생성할 대상 채널을 찾을 수 없습니다.")
             return False
 
+        # 게시 작업이 패널을 교체하는 도중에 재설치가 끼어들면 패널이 두 개 남을 수 있습니다.
+        async with self._channel_lock(target_channel.id):
+            return await self._regenerate_panel_locked(target_channel, panel_key, last_anonymous_embed)
+
+    async def _regenerate_panel_locked(self, target_channel: discord.TextChannel, panel_key: str, last_anonymous_embed: Optional[discord.Embed]) -> bool:
         base_panel_key = panel_key.replace("panel_", "")
         embed_key = panel_key
 
@@ -133,11 +227,10 @@ class AnonymousBoard(commands.Cog):
             panel_info = get_panel_id(base_panel_key)
             if panel_info and (old_id := panel_info.get('message_id')):
                 try:
-                    old_message = await target_channel.fetch_message(old_id)
-                    await old_message.delete()
+                    await target_channel.get_partial_message(old_id).delete()
                 except (discord.NotFound, discord.Forbidden): pass
             
-            embed_data = await get_embed_from_db(embed_key)
+            embed_data = get_embed(embed_key)
             if not embed_data:
                 logger.error(f"DB에서 '{embed_key}' 임베드를 찾을 수 없어 패널을 생성할 수 없습니다.")
                 return False
@@ -145,7 +238,7 @@ class AnonymousBoard(commands.Cog):
 
             if self.view_instance is None:
                 await self.register_persistent_views()
-            await self.view_instance.setup_buttons()
+            await panel_views.ensure_built("anonymous_board", self.view_instance)
 
             if last_anonymous_embed:
                 await target_channel.send(embed=last_anonymous_embed)
@@ -153,6 +246,7 @@ class AnonymousBoard(commands.Cog):
             new_panel_message = await target_channel.send(embed=embed, view=self.view_instance)
             
             await save_panel_id(base_panel_key, new_panel_message.id, target_channel.id)
+            self.panel_message_id = new_panel_message.id
             logger.info(f"✅ 익명 게시판 패널을 성공적으로 새로 생성/갱신했습니다. (채널: #{target_channel.name})")
             return True
             
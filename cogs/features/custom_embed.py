@@ -6,8 +6,9 @@ from discord import app_commands
 import logging
 from typing import Optional, List, Set
 
-from utils.database import get_id, get_embed_from_db, get_panel_id, save_panel_id, get_panel_components_from_db
+from utils.database import get_id, get_embed, get_panel_id, save_panel_id, get_panel_components_from_db
 from utils.ui_defaults import CUSTOM_EMBED_SENDER_ROLES
+from utils.view_registry import panel_views
 
 logger = logging.getLogger(__name__)
 
@@ -161,7 +162,7 @@ class CustomEmbed(commands.Cog):
         
     async def register_persistent_views(self):
         self.view_instance = CustomEmbedPanelView(self)
-        await self.view_instance.setup_buttons()
+        await panel_views.ensure_built("custom_embed", self.view_instance)
         self.bot.add_view(self.view_instance)
         logger.info("✅ 커스텀 임베드 시스템의 영구 View가 성공적으로 등록되었습니다.")
         
@@ -225,7 +226,7 @@ class CustomEmbed(commands.Cog):
                     await old_message.delete()
                 except (discord.NotFound, discord.Forbidden): pass
             
-            embed_data = await get_embed_from_db(embed_key)
+            embed_data = get_embed(embed_key)
             if not embed_data:
                 logger.error(f"DB에서 '{embed_key}' 임베드를 찾을 수 없어 패널을 생성할 수 없습니다.")
                 return False
@@ -234,7 +235,7 @@ class CustomEmbed(commands.Cog):
             if self.view_instance is None:
                 await self.register_persistent_views()
             
-            await self.view_instance.setup_buttons()
+            await panel_views.ensure_built("custom_embed", self.view_instance)
             new_message = await channel.send(embed=embed, view=self.view_instance)
             await save_panel_id(current_panel_key, new_message.id, channel.id)
             logger.info(f"✅ 커스텀 임베드 패널을 성공적으로 새로 생성했습니다. (채널: #{channel.name})")
@@ -11,11 +11,12 @@ from typing import Optional, Dict
 
 # ▼▼▼ [수정] save_config_to_db 추가 ▼▼▼
 from utils.database import (
-    get_panel_id, save_panel_id, get_cooldown, set_cooldown, 
-    get_id, get_embed_from_db, get_panel_components_from_db,
+    get_panel_id, save_panel_id, get_cooldown_remaining, start_cooldown, 
+    get_id, get_embed, get_panel_components_from_db,
     get_config, save_config_to_db
 )
 from utils.helpers import format_embed_from_db, format_seconds_to_hms, has_required_roles
+from utils.view_registry import panel_views
 from .prefix_manager import PrefixManager
 
 logger = logging.getLogger(__name__)
@@ -107,7 +108,7 @@ class NicknameChangeModal(ui.Modal, title="이름 변경 신청"):
         if not re.match(r"^[가-힣\s]+$", name) or len(name) > 8:
             return await i.followup.send("❌ 이름은 8자 이내의 한글과 공백으로만 구성되어야 합니다.", ephemeral=True)
         
-        await set_cooldown(str(i.user.id), "nickname_change")
+        start_cooldown(i.user.id, "nickname_change", int(get_config("NICKNAME_CHANGE_COOLDOWN_SECONDS", 21600)))
         embed = discord.Embed(title="📝 이름 변경 신청", color=discord.Color.blue())
         embed.add_field(name="신청자", value=i.user.mention, inline=False).add_field(name="현재 이름", value=i.user.display_name, inline=False).add_field(name="희망 이름", value=name, inline=False)
         
@@ -140,9 +141,9 @@ class NicknameChangerPanelView(ui.View):
         if lock.locked(): return await i.response.send_message("이전 요청 처리 중입니다.", ephemeral=True)
         async with lock:
             cooldown = int(get_config("NICKNAME_CHANGE_COOLDOWN_SECONDS", 21600))
-            last_time = await get_cooldown(str(i.user.id), "nickname_change")
-            if last_time and (datetime.now(timezone.utc).timestamp() - last_time) < cooldown:
-                remaining = cooldown - (datetime.now(timezone.utc).timestamp() - last_time)
+            # 메모리의 쿨다운 기록만 확인하므로 모달을 열기 전에 기다리는 일이 없습니다.
+            remaining = get_cooldown_remaining(i.user.id, "nickname_change", cooldown)
+            if remaining > 0:
                 return await i.response.send_message(f"❌ 다음 신청까지 **{format_seconds_to_hms(remaining)}** 남았습니다.", ephemeral=True)
             await i.response.send_modal(NicknameChangeModal(self.parent_cog))
 
@@ -157,7 +158,7 @@ class NicknameChanger(commands.Cog, name="Nicknames"):
     
     async def register_persistent_views(self):
         self.view_instance = NicknameChangerPanelView(self)
-        await self.view_instance.setup_buttons()
+        await panel_views.ensure_built("nicknames", self.view_instance)
         self.bot.add_view(self.view_instance)
         logger.info("✅ 닉네임 변경 패널의 영구 View가 성공적으로 등록되었습니다.")
 
@@ -177,13 +178,13 @@ class NicknameChanger(commands.Cog, name="Nicknames"):
                     try: await (await channel.fetch_message(old_id)).delete()
                     except (discord.NotFound, discord.Forbidden): pass
                 
-                embed_data = await get_embed_from_db(embed_key)
+                embed_data = get_embed(embed_key)
                 if not embed_data:
                     logger.warning(f"DB에서 '{embed_key}' 임베드를 찾을 수 없어 패널 생성을 건너뜁니다.")
                     return False
                 
                 if self.view_instance is None: await self.register_persistent_views()
-                await self.view_instance.setup_buttons()
+                await panel_views.ensure_built("nicknames", self.view_instance)
                 new_msg = await channel.send(embed=discord.Embed.from_dict(embed_data), view=self.view_instance)
                 await save_panel_id(base_key, new_msg.id, channel.id)
                 logger.info(f"✅ 닉네임 변경 패널을 #{channel.name}에 새로 생성했습니다.")
@@ -3,47 +3,111 @@
 import discord
 from discord.ext import commands
 import logging
-from typing import Set
-import asyncio 
+import re
+from typing import Dict, FrozenSet, Optional, Pattern, Set, Tuple
 
-from utils.database import get_config, get_id
+from utils.database import get_config, get_id, get_cache_generation
 from utils.ui_defaults import ADMIN_ROLE_KEYS
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PREFIX_FORMAT = "「{symbol}」"
+
+class NicknameDecorationIndex:
+    """
+    설정(UI_ROLE_KEY_MAP)과 역할 ID로부터 한 번만 만들어 두는 닉네임 장식 인덱스입니다.
+    닉네임 계산 시 설정 전체를 훑지 않고, 멤버가 가진 역할만 확인하면 됩니다.
+    """
+    def __init__(self):
+        role_configs = get_config("UI_ROLE_KEY_MAP", {})
+        # { role_id: (priority, 설정 순서, prefix, suffix) } - 같은 역할 ID면 우선순위가 높은(같으면 먼저 나온) 설정을 씁니다.
+        self.prefix_roles: Dict[int, Tuple[int, int, Optional[str], str]] = {}
+        prefixes, suffixes = set(), set()
+        for index, (key, config) in enumerate(role_configs.items()):
+            if not config.get("is_prefix"):
+                continue
+            # 기호가 없는 접두사 역할도 우선순위 경쟁에는 참여합니다. (가장 높으면 접두사를 붙이지 않음)
+            full_prefix, suffix = None, ""
+            if (symbol := config.get("prefix_symbol")):
+                full_prefix = config.get("prefix_format", DEFAULT_PREFIX_FORMAT).format(symbol=symbol)
+                suffix = config.get("suffix", "")
+                if full_prefix.strip(): prefixes.add(full_prefix.strip())
+                if suffix.strip(): suffixes.add(suffix.strip())
+
+            role_id = get_id(key)
+            if not role_id: continue
+            entry = (config.get("priority", 0), -index, full_prefix, suffix)
+            if role_id not in self.prefix_roles or entry[:2] > self.prefix_roles[role_id][:2]:
+                self.prefix_roles[role_id] = entry
+
+        # 긴 것부터 시도해야 하므로 길이 역순으로 정렬해 정규식 하나로 묶습니다.
+        self.prefix_pattern = self._compile(prefixes, r"\A(?:{})")
+        self.suffix_pattern = self._compile(suffixes, r"(?:{})\Z")
+        self.no_prefix_role_ids: FrozenSet[int] = frozenset(role_id for key in ADMIN_ROLE_KEYS if (role_id := get_id(key)))
+        self.guest_role_id = get_id("role_guest")
+        self.resident_role_ids: FrozenSet[int] = frozenset(role_id for key in ("role_resident_rookie", "role_resident_regular") if (role_id := get_id(key)))
+
+    @staticmethod
+    def _compile(parts: Set[str], template: str) -> Optional[Pattern]:
+        if not parts: return None
+        return re.compile(template.format("|".join(re.escape(p) for p in sorted(parts, key=len, reverse=True))))
+
+    def highest_prefix(self, member: discord.Member) -> Optional[Tuple[str, str]]:
+        """멤버가 가진 역할 중 우선순위가 가장 높은 (prefix, suffix)를 돌려줍니다."""
+        best = None
+        for role in member.roles:
+            entry = self.prefix_roles.get(role.id)
+            if entry and (best is None or entry[:2] > best[:2]):
+                best = entry
+        return (best[2], best[3]) if best and best[2] is not None else None
+
+    def strip_decorations(self, name: str) -> str:
+        temp_name = name.strip()
+        if self.suffix_pattern and (match := self.suffix_pattern.search(temp_name)):
+            temp_name = temp_name[:match.start()].strip()
+        if self.prefix_pattern and (match := self.prefix_pattern.match(temp_name)):
+            temp_name = temp_name[match.end():].strip()
+        return temp_name
+
 class PrefixManager(commands.Cog):
     """
     사용자의 역할에 따라 닉네임의 접두사를 자동으로 관리하는 Cog입니다.
     """
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self._index: Optional[NicknameDecorationIndex] = None
+        self._index_generation: int = -1
         logger.info("PrefixManager Cog가 성공적으로 초기화되었습니다.")
 
+    def _expect_nick_edit(self, member: discord.Member, nick: str):
+        # 봇이 바꾼 닉네임으로 인한 업데이트가 다시 로거/핸들러로 퍼지지 않도록 미리 알려 둡니다.
+        if (dispatcher := self.bot.get_cog("MemberUpdateDispatcher")):
+            dispatcher.expect_self_edit(member, nick=nick)
+
     @commands.Cog.listener()
-    async def on_member_update(self, before: discord.Member, after: discord.Member):
-        """역할 변경 감지 시, 닉네임 자동 업데이트"""
-        if after.bot or before.roles == after.roles:
+    async def on_member_diff(self, diff):
+        """역할 변경 감지 시, 닉네임 자동 업데이트 (봇이 부여한 역할 변경도 포함)"""
+        after = diff.after
+        if after.bot or "roles" not in diff.all_changes:
             return
         
         # ▼▼▼ [수정] 안내를 받지 않은(주민이 아닌) 유저는 닉네임 변경 건너뛰기 ▼▼▼
-        guest_role_id = get_id("role_guest")
-        rookie_role_id = get_id("role_resident_rookie")
-        regular_role_id = get_id("role_resident_regular")
+        index = self.get_index()
 
         # 손님 역할은 있지만, 정식 주민 역할(연안, 해몽 등)이 없는 경우 -> 아직 안내 전이므로 변경 금지
-        has_guest = any(r.id == guest_role_id for r in after.roles)
-        has_resident = any(r.id in [rookie_role_id, regular_role_id] for r in after.roles if r.id)
+        has_guest = any(r.id == index.guest_role_id for r in after.roles)
+        has_resident = any(r.id in index.resident_role_ids for r in after.roles)
 
         if has_guest and not has_resident:
             return
         # ▲▲▲ [수정 완료] ▲▲▲
 
-        await asyncio.sleep(1) 
-        
+        # 연속된 역할 변경은 디스패처가 이미 하나로 합쳐서 보내므로 따로 기다리지 않습니다.
         try:
             new_nick = await self.get_final_nickname(after)
             # 닉네임이 실제로 다를 때만 API 요청
             if after.display_name != new_nick: 
+                self._expect_nick_edit(after, new_nick)
                 await after.edit(nick=new_nick, reason="역할 변경으로 인한 칭호 자동 업데이트")
         except discord.Forbidden:
             pass
@@ -58,6 +122,7 @@ class PrefixManager(commands.Cog):
         final_name = await self.get_final_nickname(member, base_name=base_name)
         try:
             if member.display_name != final_name:
+                self._expect_nick_edit(member, final_name)
                 await member.edit(nick=final_name, reason="닉네임 승인 또는 역할 업데이트")
         except discord.Forbidden:
             logger.warning(f"접두사 적용 실패: {member.display_name}의 닉네임을 변경할 권한이 없습니다.")
@@ -65,90 +130,45 @@ class PrefixManager(commands.Cog):
             logger.error(f"{member.display_name}에게 접두사 적용 중 오류: {e}", exc_info=True)
         return final_name
             
+    def get_index(self) -> NicknameDecorationIndex:
+        """설정 캐시가 바뀌었을 때만 닉네임 장식 인덱스를 다시 만듭니다."""
+        generation = get_cache_generation()
+        if self._index is None or self._index_generation != generation:
+            self._index = NicknameDecorationIndex()
+            self._index_generation = generation
+        return self._index
+
     async def get_final_nickname(self, member: discord.Member, base_name: str = "") -> str:
         """
         멤버의 역할에 따라 최종 닉네임을 계산하여 반환하는 핵심 로직.
         """
-        role_configs = get_config("UI_ROLE_KEY_MAP", {})
-        member_role_ids = {role.id for role in member.roles}
+        index = self.get_index()
 
-        # 1. 현재 멤버가 가져야 할 접두사 역할 찾기 (가장 높은 우선순위)
-        user_prefix_roles = [
-            config for key, config in role_configs.items()
-            if get_id(key) in member_role_ids and config.get("is_prefix")
-        ]
-        highest_priority_role_config = max(user_prefix_roles, key=lambda r: r.get("priority", 0)) if user_prefix_roles else None
+        # 1. 현재 멤버가 가져야 할 접두사 찾기 (가장 높은 우선순위, 접두사 예외 역할이 있으면 없음)
+        decoration = index.highest_prefix(member)
+        if decoration and any(role.id in index.no_prefix_role_ids for role in member.roles):
+            decoration = None
 
         # 2. 기본 이름(base_name) 추출하기
-        # base_name이 주어지지 않았다면, 현재 닉네임에서 기존 접두사를 떼어내야 합니다.
+        # base_name이 주어지지 않았다면, 현재 닉네임에서 기존 접두사/접미사를 떼어내야 합니다.
         if not base_name.strip():
             # ▼▼▼ [핵심 수정] 아이디(name) 대신 별명(global_name)을 우선 사용 ▼▼▼
-            current_nick = member.nick or member.global_name or member.name
-            temp_name = current_nick.strip()
-
-            # DB에 등록된 모든 가능한 접두사와 접미사 수집
-            all_prefixes = []
-            all_suffixes = []
-            
-            for config in role_configs.values():
-                if config.get("is_prefix") and (symbol := config.get("prefix_symbol")):
-                    p_format = config.get("prefix_format", "「{symbol}」")
-                    raw_prefix = p_format.format(symbol=symbol).strip()
-                    if raw_prefix:
-                        all_prefixes.append(raw_prefix)
-                    
-                    s_format = config.get("suffix", "").strip()
-                    if s_format:
-                        all_suffixes.append(s_format)
-            
-            all_prefixes.sort(key=len, reverse=True)
-            all_suffixes.sort(key=len, reverse=True)
-
-            # 접미사 제거
-            for s in all_suffixes:
-                if temp_name.endswith(s):
-                    temp_name = temp_name[:-len(s)].strip()
-                    break 
-            
-            # 접두사 제거
-            for p in all_prefixes:
-                if temp_name.startswith(p):
-                    temp_name = temp_name[len(p):].strip()
-                    break 
-            
-            base = temp_name
+            base = index.strip_decorations(member.nick or member.global_name or member.name)
         else:
             base = base_name.strip()
 
-        # 3. 접두사 예외 역할 처리 (관리자 역할 등)
-        no_prefix_role_keys = set(ADMIN_ROLE_KEYS)
-        no_prefix_role_ids = {get_id(key) for key in no_prefix_role_keys if get_id(key)}
-        user_has_no_prefix_role = bool(no_prefix_role_ids.intersection(member_role_ids))
-
-        final_nick = base
-
-        # 4. 새로운 접두사/접미사 결합
-        if highest_priority_role_config and not user_has_no_prefix_role:
-            if symbol := highest_priority_role_config.get("prefix_symbol"):
-                prefix_format = highest_priority_role_config.get("prefix_format", "「{symbol}」")
-                suffix = highest_priority_role_config.get("suffix", "")
-                
-                full_prefix = prefix_format.format(symbol=symbol)
-                final_nick = f"{full_prefix} {base}{suffix}"
-        
-        # 5. 길이 제한 처리 (디스코드 닉네임 최대 32자)
+        # 3. 새로운 접두사/접미사 결합
+        if not decoration:
+            return base[:32]
+        full_prefix, suffix = decoration
+        final_nick = f"{full_prefix} {base}{suffix}"
+
+        # 4. 길이 제한 처리 (디스코드 닉네임 최대 32자)
         if len(final_nick) > 32:
-            prefix_str, suffix_str = "", ""
-            if highest_priority_role_config and not user_has_no_prefix_role and (symbol := highest_priority_role_config.get("prefix_symbol")):
-                p_format = highest_priority_role_config.get("prefix_format", "「{symbol}」")
-                s_format = highest_priority_role_config.get("suffix", "")
-                prefix_str = f"{p_format.format(symbol=symbol)} "
-                suffix_str = s_format
-            
-            allowed_base_len = 32 - (len(prefix_str) + len(suffix_str))
+            prefix_str = f"{full_prefix} "
+            allowed_base_len = 32 - (len(prefix_str) + len(suffix))
             if allowed_base_len > 0:
-                base = base[:allowed_base_len]
-                final_nick = f"{prefix_str}{base}{suffix_str}"
+                final_nick = f"{prefix_str}{base[:allowed_base_len]}{suffix}"
             else:
                 final_nick = final_nick[:32]
             
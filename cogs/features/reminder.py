@@ -3,16 +3,20 @@
 import discord
 from discord.ext import commands, tasks
 import asyncio
+import heapq
 import logging
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Set, Tuple
 from datetime import datetime, timedelta, timezone
 import re
 
-from utils.database import get_id, schedule_reminder, get_due_reminders, deactivate_reminder, get_embed_from_db, supabase, set_reminder_message_id
+from utils.database import get_id, schedule_reminder, get_active_reminders, deactivate_reminder, get_embed, set_reminder_message_id, get_last_reminder_message_id
 from utils.helpers import format_embed_from_db
 
 logger = logging.getLogger(__name__)
 
+# DB와 예약 목록을 다시 맞추는 주기 (분)
+RECONCILE_INTERVAL_MINUTES = 10
+
 REMINDER_CONFIG = {
     'disboard': {
         'bot_id': 302050872383242240, 'cooltime': 7200, 'keyword': "서버 갱신 완료!",
@@ -28,15 +32,27 @@ class Reminder(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.configs: Dict[str, Dict] = {}
+        # 예약된 알림: (발송 시각 timestamp, 알림 ID) 힙과 ID -> 레코드 맵
+        self._heap: List[Tuple[float, int]] = []
+        self._reminders: Dict[int, Dict] = {}
+        # 발송 중(아직 DB에서 비활성화되지 않은) 알림 ID - 재동기화가 이 알림을 다시 예약하지 않도록 합니다.
+        self._in_flight: Set[int] = set()
+        # 재동기화가 DB를 조회하는 동안 새로 예약된 알림을 덮어쓰지 않도록, (서버, 종류)별 마지막 예약 세대를 기록합니다.
+        self._generation = 0
+        self._scheduled_at_generation: Dict[Tuple[int, str], int] = {}
+        self._wakeup = asyncio.Event()
+        self._scheduler_task: Optional[asyncio.Task] = None
         logger.info("Reminder Cog가 성공적으로 초기화되었습니다.")
-        self.check_reminders.start()
+        self.reconcile_reminders.start()
 
     async def cog_load(self):
         # on_ready에서 load_configs를 호출하므로 여기서 호출할 필요가 없습니다.
         pass
     
     def cog_unload(self):
-        self.check_reminders.cancel()
+        self.reconcile_reminders.cancel()
+        if self._scheduler_task:
+            self._scheduler_task.cancel()
 
     async def load_configs(self):
         # ▼▼▼ [핵심 수정] 키 이름을 system.py의 설정 명령어와 일치시켰습니다. ▼▼▼
@@ -62,17 +78,9 @@ class Reminder(commands.Cog):
             if message.author.id == config['bot_id'] and config['keyword'] in embed_description:
                 
                 try:
-                    response = await supabase.table('reminders').select('reminder_message_id') \
-                        .eq('guild_id', message.guild.id) \
-                        .eq('reminder_type', key) \
-                        .not_.is_('reminder_message_id', 'null') \
-                        .order('created_at', desc=True).limit(1).execute()
-                    
-                    if response and response.data:
-                        record = response.data[0]
-                        if msg_id := record.get('reminder_message_id'):
-                            original_reminder_msg = await message.channel.fetch_message(msg_id)
-                            await original_reminder_msg.delete()
+                    if msg_id := await get_last_reminder_message_id(message.guild.id, key):
+                        original_reminder_msg = await message.channel.fetch_message(msg_id)
+                        await original_reminder_msg.delete()
                 except discord.NotFound:
                     pass 
                 except Exception as e:
@@ -90,7 +98,7 @@ class Reminder(commands.Cog):
 
     async def send_confirmation_message(self, reminder_type: str, embed_key: str, channel: discord.TextChannel, user_mention: str) -> Optional[discord.Message]:
         if not embed_key: return None
-        embed_data = await get_embed_from_db(embed_key)
+        embed_data = get_embed(embed_key)
         if not embed_data: return None
         reminder_name = REMINDER_CONFIG.get(reminder_type, {}).get("name", "알 수 없는 작업")
         embed = format_embed_from_db(embed_data, user_mention=user_mention, reminder_name=reminder_name)
@@ -103,76 +111,153 @@ class Reminder(commands.Cog):
     async def schedule_new_reminder(self, reminder_type: str, guild: discord.Guild, confirmation_message_id: Optional[int] = None):
         config = REMINDER_CONFIG[reminder_type]
         remind_at_time = datetime.now(timezone.utc) + timedelta(seconds=config['cooltime'])
-        await schedule_reminder(guild.id, reminder_type, remind_at_time, confirmation_message_id)
+        record = await schedule_reminder(guild.id, reminder_type, remind_at_time, confirmation_message_id)
+        if record:
+            self._generation += 1
+            self._scheduled_at_generation[(record['guild_id'], record['reminder_type'])] = self._generation
+            self._add_reminder(record)
         logger.info(f"✅ [{guild.name}] 서버의 {config['name']} 알림을 DB에 예약했습니다. (예약 시간: {remind_at_time.strftime('%Y-%m-%d %H:%M:%S')})")
 
-    @tasks.loop(seconds=10.0)
-    async def check_reminders(self):
+    # --- 스케줄러 ---
+    @staticmethod
+    def _parse_remind_at(value) -> Optional[float]:
+        if isinstance(value, datetime):
+            return value.timestamp()
         try:
-            due_reminders = await get_due_reminders()
-            if not due_reminders: return
-
-            for reminder in due_reminders:
-                guild = self.bot.get_guild(reminder['guild_id'])
-                if not guild:
-                    await deactivate_reminder(reminder['id']); continue
-
-                reminder_type = reminder['reminder_type']
-                config = REMINDER_CONFIG.get(reminder_type)
-                reminder_settings = self.configs.get(reminder_type)
-
-                # 설정값 검증 강화 및 로그 추가
-                if not config:
-                    logger.warning(f"알림 타입 '{reminder_type}'에 대한 내부 설정(REMINDER_CONFIG)이 없습니다.")
-                    await deactivate_reminder(reminder['id']); continue
-                
-                if not reminder_settings:
-                    logger.warning(f"알림 타입 '{reminder_type}'에 대한 서버 설정(self.configs)이 로드되지 않았습니다.")
-                    await deactivate_reminder(reminder['id']); continue
+            if value.endswith('Z'): value = value[:-1] + '+00:00'
+            parsed = datetime.fromisoformat(value)
+            if parsed.tzinfo is None: parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed.timestamp()
+        except (AttributeError, ValueError, TypeError):
+            return None
 
-                channel_id = reminder_settings.get('channel_id')
-                role_id = reminder_settings.get('role_id')
+    def _add_reminder(self, reminder: Dict):
+        remind_at = self._parse_remind_at(reminder.get('remind_at'))
+        if remind_at is None:
+            logger.warning(f"알림(ID: {reminder.get('id')})의 예약 시간을 해석할 수 없어 건너뜁니다: {reminder.get('remind_at')}")
+            return
+        # schedule_reminder는 같은 서버/종류의 기존 알림을 비활성화하므로, 메모리에서도 제거합니다.
+        for other_id, other in list(self._reminders.items()):
+            if other_id != reminder['id'] and other['guild_id'] == reminder['guild_id'] and other['reminder_type'] == reminder['reminder_type']:
+                self._reminders.pop(other_id, None)
+        self._reminders[reminder['id']] = reminder
+        heapq.heappush(self._heap, (remind_at, reminder['id']))
+        self._wakeup.set()
 
-                if not channel_id or not role_id:
-                    logger.warning(f"'{reminder_type}' 알림을 위한 채널 ID 또는 역할 ID가 설정되지 않았습니다. (Ch: {channel_id}, Role: {role_id})")
-                    await deactivate_reminder(reminder['id']); continue
-                
-                channel = guild.get_channel(channel_id)
-                role = guild.get_role(role_id)
-                
-                if not channel:
-                    logger.warning(f"설정된 알림 채널(ID: {channel_id})을 찾을 수 없습니다.")
-                    await deactivate_reminder(reminder['id']); continue
-                if not role:
-                    logger.warning(f"설정된 알림 역할(ID: {role_id})을 찾을 수 없습니다.")
-                    await deactivate_reminder(reminder['id']); continue
-
-                if confirmation_msg_id := reminder.get('confirmation_message_id'):
-                    try:
-                        old_confirmation_msg = await channel.fetch_message(confirmation_msg_id)
-                        await old_confirmation_msg.delete()
-                    except discord.NotFound: pass
-                    except Exception as e: logger.error(f"이전 확인 메시지(ID: {confirmation_msg_id}) 삭제 중 오류 발생: {e}", exc_info=True)
+    def _ensure_scheduler(self):
+        if self._scheduler_task is None or self._scheduler_task.done():
+            self._scheduler_task = asyncio.create_task(self._run_scheduler())
 
+    async def _run_scheduler(self):
+        """가장 빠른 알림 시각까지 정확히 잠들었다가 발송합니다."""
+        while True:
+            # 취소되었거나 다시 예약된 알림은 힙에서 지연 삭제합니다.
+            while self._heap and (self._heap[0][1] not in self._reminders or self._parse_remind_at(self._reminders[self._heap[0][1]].get('remind_at')) != self._heap[0][0]):
+                heapq.heappop(self._heap)
+
+            timeout = max(0.0, self._heap[0][0] - datetime.now(timezone.utc).timestamp()) if self._heap else None
+            if timeout is None or timeout > 0:
+                self._wakeup.clear()
                 try:
-                    embed_key = f"embed_reminder_{reminder_type}"
-                    embed_data = await get_embed_from_db(embed_key)
-                    if embed_data:
-                        embed = format_embed_from_db(embed_data)
-                        reminder_msg = await channel.send(content=role.mention, embed=embed, allowed_mentions=discord.AllowedMentions(roles=True))
-                        await set_reminder_message_id(reminder['id'], reminder_msg.id)
-                        logger.info(f"✅ [{guild.name}] 서버에 {config['name']} 알림을 보냈습니다. (ID: {reminder['id']}, MsgID: {reminder_msg.id})")
-                except Exception as e:
-                    logger.error(f"알림 메시지 전송 중 오류 발생: {e}", exc_info=True)
-                finally:
-                    await deactivate_reminder(reminder['id'])
-        
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, reminder_id = heapq.heappop(self._heap)
+            reminder = self._reminders.pop(reminder_id, None)
+            if not reminder: continue
+            self._in_flight.add(reminder_id)
+            try:
+                await self._fire_reminder(reminder)
+            except Exception as e:
+                logger.error(f"알림(ID: {reminder_id}) 발송 중 오류 발생: {e}", exc_info=True)
+            finally:
+                self._in_flight.discard(reminder_id)
+
+    @tasks.loop(minutes=RECONCILE_INTERVAL_MINUTES)
+    async def reconcile_reminders(self):
+        """시작 시 한 번, 이후에는 느린 주기로 DB의 활성 알림과 예약 목록을 맞춥니다."""
+        try:
+            started_generation = self._generation
+            active_reminders = await get_active_reminders()
+            if active_reminders is None:
+                logger.warning("[Reminder] DB에서 활성 알림을 불러오지 못해 기존 예약을 유지합니다.")
+            else:
+                # 조회하는 동안 새로 예약된 (서버, 종류)는 조회 결과보다 메모리가 최신이므로 그대로 둡니다.
+                fresh_keys = {key for key, generation in self._scheduled_at_generation.items() if generation > started_generation}
+                self._scheduled_at_generation = {key: self._scheduled_at_generation[key] for key in fresh_keys}
+                kept = {reminder_id: reminder for reminder_id, reminder in self._reminders.items() if (reminder['guild_id'], reminder['reminder_type']) in fresh_keys}
+                self._reminders = kept
+                self._heap = [(remind_at, reminder_id) for reminder_id, reminder in kept.items() if (remind_at := self._parse_remind_at(reminder.get('remind_at'))) is not None]
+                heapq.heapify(self._heap)
+                # DB에 없는 알림(봇 밖에서 비활성화된 알림)은 여기서 빠집니다.
+                for reminder in active_reminders:
+                    if reminder['id'] in self._in_flight or (reminder['guild_id'], reminder['reminder_type']) in fresh_keys: continue
+                    self._add_reminder(reminder)
+                logger.info(f"🔄 [Reminder] DB와 동기화하여 {len(self._reminders)}개의 활성 알림을 예약했습니다.")
+            self._wakeup.set()
+            self._ensure_scheduler()
         except Exception as e:
-            logger.error(f"알림 확인 루프 중 오류 발생: {e}", exc_info=True)
+            logger.error(f"알림 재동기화 중 오류 발생: {e}", exc_info=True)
 
-    @check_reminders.before_loop
-    async def before_check_reminders(self):
+    @reconcile_reminders.before_loop
+    async def before_reconcile_reminders(self):
         await self.bot.wait_until_ready()
 
+    async def _fire_reminder(self, reminder: Dict):
+        guild = self.bot.get_guild(reminder['guild_id'])
+        if not guild:
+            await deactivate_reminder(reminder['id']); return
+
+        reminder_type = reminder['reminder_type']
+        config = REMINDER_CONFIG.get(reminder_type)
+        reminder_settings = self.configs.get(reminder_type)
+
+        # 설정값 검증 강화 및 로그 추가
+        if not config:
+            logger.warning(f"알림 타입 '{reminder_type}'에 대한 내부 설정(REMINDER_CONFIG)이 없습니다.")
+            await deactivate_reminder(reminder['id']); return
+        
+        if not reminder_settings:
+            logger.warning(f"알림 타입 '{reminder_type}'에 대한 서버 설정(self.configs)이 로드되지 않았습니다.")
+            await deactivate_reminder(reminder['id']); return
+
+        channel_id = reminder_settings.get('channel_id')
+        role_id = reminder_settings.get('role_id')
+
+        if not channel_id or not role_id:
+            logger.warning(f"'{reminder_type}' 알림을 위한 채널 ID 또는 역할 ID가 설정되지 않았습니다. (Ch: {channel_id}, Role: {role_id})")
+            await deactivate_reminder(reminder['id']); return
+        
+        channel = guild.get_channel(channel_id)
+        role = guild.get_role(role_id)
+        
+        if not channel:
+            logger.warning(f"설정된 알림 채널(ID: {channel_id})을 찾을 수 없습니다.")
+            await deactivate_reminder(reminder['id']); return
+        if not role:
+            logger.warning(f"설정된 알림 역할(ID: {role_id})을 찾을 수 없습니다.")
+            await deactivate_reminder(reminder['id']); return
+
+        if confirmation_msg_id := reminder.get('confirmation_message_id'):
+            try:
+                await channel.get_partial_message(confirmation_msg_id).delete()
+            except discord.NotFound: pass
+            except Exception as e: logger.error(f"이전 확인 메시지(ID: {confirmation_msg_id}) 삭제 중 오류 발생: {e}", exc_info=True)
+
+        try:
+            embed_key = f"embed_reminder_{reminder_type}"
+            embed_data = get_embed(embed_key)
+            if embed_data:
+                embed = format_embed_from_db(embed_data)
+                reminder_msg = await channel.send(content=role.mention, embed=embed, allowed_mentions=discord.AllowedMentions(roles=True))
+                await set_reminder_message_id(reminder['id'], reminder_msg.id)
+                logger.info(f"✅ [{guild.name}] 서버에 {config['name']} 알림을 보냈습니다. (ID: {reminder['id']}, MsgID: {reminder_msg.id})")
+        except Exception as e:
+            logger.error(f"알림 메시지 전송 중 오류 발생: {e}", exc_info=True)
+        finally:
+            await deactivate_reminder(reminder['id'])
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(Reminder(bot))
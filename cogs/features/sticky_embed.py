@@ -4,13 +4,21 @@ from discord import app_commands
 from discord.ext import commands
 import logging
 import asyncio
+import time
 from typing import Dict, Optional, Set
 
-from utils.database import set_sticky_message, remove_sticky_message, _sticky_messages_cache, get_id
+from utils.database import set_sticky_message, remove_sticky_message, _sticky_messages_cache, get_id, get_config
 from utils.ui_defaults import CUSTOM_EMBED_SENDER_ROLES
 
 logger = logging.getLogger(__name__)
 
+# bot_configs의 'STICKY_EMBED_SETTINGS' 값으로 덮어쓸 수 있습니다.
+# debounce_seconds가 0이면 메시지마다 즉시 다시 보냅니다.
+DEFAULT_STICKY_SETTINGS = {
+    "debounce_seconds": 3.0,   # 마지막 메시지 이후 이만큼 조용하면 다시 보냄
+    "max_wait_seconds": 15.0,  # 대화가 계속 이어져도 이 시간 안에는 반드시 다시 보냄
+}
+
 class StickyEmbed(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
@@ -18,6 +26,10 @@ class StickyEmbed(commands.Cog):
         self.sticky_channels: Dict[int, Dict] = {}
         # 채널별 동시 처리를 방지하기 위한 Lock
         self.channel_locks: Dict[int, asyncio.Lock] = {}
+        # 디바운스 상태: 예약된 재전송 작업, 연속 입력이 시작된 시각, 마지막 메시지 시각
+        self.pending_reposts: Dict[int, asyncio.Task] = {}
+        self.burst_started_at: Dict[int, float] = {}
+        self.last_activity_at: Dict[int, float] = {}
         
         # 관리자 역할 ID를 저장할 Set
         self.admin_role_ids: Set[int] = set()
@@ -45,6 +57,9 @@ class StickyEmbed(commands.Cog):
         }
 
     async def cog_unload(self):
+        for task in self.pending_reposts.values():
+            task.cancel()
+        self.pending_reposts.clear()
         # Cog가 언로드될 때 Context Menu를 제거합니다.
         self.bot.tree.remove_command(self.set_sticky_menu.name, type=self.set_sticky_menu.type)
         self.bot.tree.remove_command(self.unset_sticky_menu.name, type=self.unset_sticky_menu.type)
@@ -87,18 +102,55 @@ class StickyEmbed(commands.Cog):
 
         await remove_sticky_message(channel_id)
         self.sticky_channels.pop(channel_id, None)
+        if (task := self.pending_reposts.pop(channel_id, None)):
+            task.cancel()
 
         await interaction.response.send_message(f"✅ <#{channel_id}> 채널의 고정 임베드 설정을 해제했습니다.", ephemeral=True)
 
+    def _get_settings(self) -> Dict[str, float]:
+        return {**DEFAULT_STICKY_SETTINGS, **(get_config("STICKY_EMBED_SETTINGS", {}) or {})}
+
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        """새 메시지가 올라오면 고정 임베드를 다시 보냅니다."""
+        """새 메시지가 올라오면 고정 임베드를 다시 보냅니다. (연속된 메시지는 한 번으로 묶음)"""
         # 봇 메시지, DM, 또는 고정 임베드가 없는 채널은 무시
         if message.author.bot or not message.guild or message.channel.id not in self.sticky_channels:
             return
 
-        channel = message.channel
-        
+        channel_id = message.channel.id
+        now = time.monotonic()
+        self.last_activity_at[channel_id] = now
+
+        pending = self.pending_reposts.get(channel_id)
+        if pending and not pending.done():
+            return  # 이미 예약된 재전송이 마지막 메시지 시각을 보고 대기 시간을 늘립니다.
+
+        self.burst_started_at[channel_id] = now
+        self.pending_reposts[channel_id] = asyncio.create_task(self._debounced_repost(message.channel))
+
+    async def _debounced_repost(self, channel: discord.TextChannel):
+        settings = self._get_settings()
+        delay = float(settings["debounce_seconds"])
+        max_wait = float(settings["max_wait_seconds"])
+        try:
+            while delay > 0:
+                deadline = min(
+                    self.last_activity_at.get(channel.id, 0.0) + delay,
+                    self.burst_started_at.get(channel.id, 0.0) + max(max_wait, delay)
+                )
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(remaining)
+        except asyncio.CancelledError:
+            return
+        finally:
+            # 재전송 중에 들어온 메시지는 새로운 예약을 만들 수 있도록 먼저 비웁니다.
+            if self.pending_reposts.get(channel.id) is asyncio.current_task():
+                self.pending_reposts.pop(channel.id, None)
+        await self._repost(channel)
+
+    async def _repost(self, channel: discord.TextChannel):
         # 특정 채널에 대한 동시 실행 방지
         lock = self.channel_locks.setdefault(channel.id, asyncio.Lock())
         
@@ -108,10 +160,9 @@ class StickyEmbed(commands.Cog):
             if not sticky_data:
                 return
 
-            # 이전 고정 메시지 삭제
+            # 이전 고정 메시지 삭제 (캐시된 ID로 바로 삭제하여 fetch를 생략)
             try:
-                old_message = await channel.fetch_message(sticky_data['message_id'])
-                await old_message.delete()
+                await channel.get_partial_message(sticky_data['message_id']).delete()
             except discord.NotFound:
                 # 이미 수동으로 삭제된 경우, 그냥 넘어감
                 pass
@@ -125,11 +176,11 @@ class StickyEmbed(commands.Cog):
             try:
                 new_embed = discord.Embed.from_dict(sticky_data['embed_data'])
                 new_message = await channel.send(embed=new_embed)
-
-                # DB와 캐시에 새 메시지 ID 업데이트
-                await set_sticky_message(channel.id, new_message.id, message.guild.id, sticky_data['embed_data'])
                 self.sticky_channels[channel.id]['message_id'] = new_message.id
 
+                # 새 메시지 ID는 쓰기 지연 큐를 통해 DB에 반영됩니다.
+                await set_sticky_message(channel.id, new_message.id, channel.guild.id, sticky_data['embed_data'])
+
             except discord.Forbidden:
                 logger.warning(f"고정 임베드: 채널 '{channel.name}'에 임베드를 보낼 권한이 없습니다.")
             except Exception as e:
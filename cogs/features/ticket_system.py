@@ -6,7 +6,7 @@ import logging
 from typing import Dict, Any, List, Optional, Set, Union
 import asyncio
 
-from utils.database import get_id, add_ticket, remove_ticket, get_all_tickets, remove_multiple_tickets, update_ticket_lock_status, get_embed_from_db, save_panel_id, get_panel_id, get_config
+from utils.database import get_id, add_ticket, remove_ticket, get_cached_tickets, remove_multiple_tickets, update_ticket_lock_status, get_embed, save_panel_id, get_panel_id, get_config
 from utils.ui_defaults import TICKET_MASTER_ROLES, TICKET_REPORT_ROLES, TICKET_LEADER_ROLES, TICKET_DEPARTMENT_MANAGERS
 from utils.helpers import format_embed_from_db
 
@@ -284,7 +284,7 @@ class TicketSystem(commands.Cog):
     async def sync_tickets_from_db(self):
         await self.bot.wait_until_ready()
         await self.load_configs() # DB 동기화 전에 설정부터 로드
-        db_tickets = await get_all_tickets()
+        db_tickets = get_cached_tickets()
         if not db_tickets: return
         zombie_ids = [td['thread_id'] for td in db_tickets if not (self.guild and self.guild.get_thread(td['thread_id']))]
         for td in db_tickets:
@@ -303,7 +303,7 @@ class TicketSystem(commands.Cog):
             embed_to_send = None; final_roles_to_mention = set(self.master_roles)
             if ticket_type == "application" and isinstance(content, dict) and department_key:
                 departments = get_config("TICKET_APPLICATION_DEPARTMENTS", {}); dept_info = departments.get(department_key)
-                embed_data = await get_embed_from_db(embed_key)
+                embed_data = get_embed(embed_key)
                 if embed_data and dept_info:
                     embed_to_send = format_embed_from_db(embed_data, member_mention=interaction.user.mention)
                     embed_to_send.set_author(name=f"{interaction.user.display_name} ({interaction.user.id})", icon_url=interaction.user.display_avatar.url); embed_to_send.timestamp = discord.utils.utcnow()
@@ -334,7 +334,7 @@ class TicketSystem(commands.Cog):
             if panel_info and (old_id := panel_info.get('message_id')):
                 try: await (await channel.fetch_message(old_id)).delete()
                 except (discord.NotFound, discord.Forbidden): pass
-            embed_data = await get_embed_from_db(embed_key)
+            embed_data = get_embed(embed_key)
             if not embed_data: logger.error(f"DB에서 '{embed_key}' 임베드를 찾을 수 없어 패널 생성을 중단합니다."); return False
             new_message = await channel.send(embed=discord.Embed.from_dict(embed_data), view=self.view_instance)
             await save_panel_id(base_panel_key, new_message.id, channel.id)
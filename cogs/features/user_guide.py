@@ -9,8 +9,9 @@ import asyncio
 from datetime import datetime
 import re
 
-from utils.database import get_id, save_panel_id, get_panel_id, get_embed_from_db, get_panel_components_from_db
+from utils.database import get_id, save_panel_id, get_panel_id, get_embed, get_panel_components_from_db
 from utils.helpers import format_embed_from_db, has_required_roles
+from utils.view_registry import panel_views
 from utils.ui_defaults import AGE_ROLE_MAPPING_BY_YEAR
 
 logger = logging.getLogger(__name__)
@@ -190,7 +191,7 @@ class UserGuide(commands.Cog):
                 self.cog.user_threads[i.user.id] = thread.id
                 
                 # 1단계 메시지 전송
-                embed_data = await get_embed_from_db("guide_step_1_join_path")
+                embed_data = get_embed("guide_step_1_join_path")
                 if embed_data:
                     embed = format_embed_from_db(embed_data)
                     await thread.send(content=i.user.mention, embed=embed)
@@ -220,7 +221,7 @@ class UserGuide(commands.Cog):
         await self.register_persistent_views()
 
     async def register_persistent_views(self):
-        await self.panel_view.setup_buttons()
+        await panel_views.ensure_built("user_guide", self.panel_view)
         self.bot.add_view(self.panel_view)
         self.bot.add_view(IntroductionButtonView(self))
         self.bot.add_view(self.GuideApprovalView(self))
@@ -253,7 +254,7 @@ class UserGuide(commands.Cog):
         try:
             # 1단계 -> 2단계 (가입 경로 인증 -> 디코올 인증)
             if current_step == 1:
-                embed_data = await get_embed_from_db("guide_step_2_dicoall")
+                embed_data = get_embed("guide_step_2_dicoall")
                 if embed_data:
                     embed = format_embed_from_db(embed_data)
                     await message.channel.send(embed=embed)
@@ -262,7 +263,7 @@ class UserGuide(commands.Cog):
 
             # 2단계 -> 3단계 (디코올 인증 -> 자기소개 버튼)
             elif current_step == 2:
-                embed_data = await get_embed_from_db("guide_step_3_intro")
+                embed_data = get_embed("guide_step_3_intro")
                 if embed_data:
                     embed = format_embed_from_db(embed_data)
                     view = IntroductionButtonView(self)
@@ -278,7 +279,7 @@ class UserGuide(commands.Cog):
         channel = self.bot.get_channel(self.public_intro_channel_id)
         if not channel: return
 
-        embed_data = await get_embed_from_db("guide_public_introduction")
+        embed_data = get_embed("guide_public_introduction")
         if not embed_data: return
         
         embed = format_embed_from_db(
@@ -314,10 +315,10 @@ class UserGuide(commands.Cog):
                 try: await (await channel.fetch_message(old_id)).delete()
                 except: pass
             
-            embed_data = await get_embed_from_db("panel_user_guide")
+            embed_data = get_embed("panel_user_guide")
             if not embed_data: return False
             
-            await self.panel_view.setup_buttons()
+            await panel_views.ensure_built("user_guide", self.panel_view)
             new_msg = await channel.send(embed=discord.Embed.from_dict(embed_data), view=self.panel_view)
             await save_panel_id("user_guide", new_msg.id, channel.id)
             return True
@@ -8,12 +8,12 @@ from discord import ui
 import logging
 from typing import Dict, Optional, Any, Set
 import asyncio
-import time
 
 # ▼▼▼ [핵심 수정] 누락된 함수들을 import 목록에 추가합니다. ▼▼▼
 from utils.database import (
-    get_id, get_all_temp_channels, add_temp_channel, 
-    update_temp_channel_owner, remove_temp_channel, remove_multiple_temp_channels
+    get_id, get_cached_temp_channels, add_temp_channel, 
+    update_temp_channel_owner, remove_temp_channel, remove_multiple_temp_channels,
+    get_cooldown_remaining, start_cooldown
 )
 from utils.helpers import get_clean_display_name
 from utils.ui_defaults import ADMIN_ROLE_KEYS
@@ -97,9 +97,6 @@ class VoiceMaster(commands.Cog):
         self.user_channel_map: Dict[int, int] = {}
         self.active_creations: Set[int] = set()
         
-        # ▼▼▼ [추가] 쿨타임 저장을 위한 딕셔너리 ▼▼▼
-        self.vc_creation_cooldowns: Dict[int, float] = {}
-        
         self.admin_role_ids: List[int] = []
         self.default_category_id: Optional[int] = None
         logger.info("VoiceMaster Cog가 성공적으로 초기화되었습니다.")
@@ -119,7 +116,7 @@ class VoiceMaster(commands.Cog):
 
     async def sync_channels_from_db(self):
         await self.bot.wait_until_ready()
-        db_channels = await get_all_temp_channels();
+        db_channels = get_cached_temp_channels()
         if not db_channels: return
         logger.info(f"[VoiceMaster] DB에서 {len(db_channels)}개의 임시 채널 정보를 발견하여 동기화를 시작합니다.")
         zombie_channel_ids = []
@@ -152,11 +149,10 @@ class VoiceMaster(commands.Cog):
                 
                 # 1. 쿨타임(60초)을 확인합니다.
                 cooldown_seconds = 60
-                now = time.monotonic()
-                last_creation_time = self.vc_creation_cooldowns.get(member.id, 0)
+                remaining_cooldown = get_cooldown_remaining(member.id, "vc_creation", cooldown_seconds)
 
-                if (now - last_creation_time) < cooldown_seconds:
-                    remaining = int(cooldown_seconds - (now - last_creation_time)) + 1
+                if remaining_cooldown > 0:
+                    remaining = int(remaining_cooldown) + 1
                     try:
                         await member.send(f"❌ 음성 채널 생성은 {cooldown_seconds}초에 한 번만 가능합니다. {remaining}초 후에 다시 시도해주세요.")
                     except discord.Forbidden:
@@ -167,7 +163,8 @@ class VoiceMaster(commands.Cog):
                 # 2. '이미 채널을 소유하고 있는지' 확인하는 로직을 삭제했습니다.
                 
                 # 3. 쿨타임을 갱신합니다.
-                self.vc_creation_cooldowns[member.id] = now
+                # 짧은 쿨타임이라 DB에는 기록하지 않습니다.
+                start_cooldown(member.id, "vc_creation", cooldown_seconds, persist=False)
 
                 # --- ▲▲▲ [수정 완료] ▲▲▲
 
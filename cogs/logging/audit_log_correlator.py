@@ -0,0 +1,177 @@
+# cogs/logging/audit_log_correlator.py
+
+import discord
+from discord.ext import commands, tasks
+import logging
+import asyncio
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone, timedelta
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from utils.perf import perf
+
+logger = logging.getLogger(__name__)
+
+# 인덱스에 감사 로그 항목을 보관하는 시간 (초)
+ENTRY_TTL_SECONDS = 60
+# 게이트웨이로 감사 로그 항목이 도착하기를 기다리는 최대 시간 (초)
+WAIT_TIMEOUT_SECONDS = 2.0
+# 게이트웨이 이벤트를 놓쳤을 때, 같은 서버/액션에 대해 API 조회를 다시 허용하기까지의 간격 (초)
+FETCH_WINDOW_SECONDS = 5.0
+# 이벤트 발생 시각 기준으로 유효하다고 보는 감사 로그의 최대 나이 (초)
+MATCH_WINDOW_SECONDS = 5
+
+IndexKey = Tuple[int, discord.AuditLogAction, Optional[int]]
+EntryPredicate = Callable[[discord.AuditLogEntry], bool]
+
+
+class AuditLogCorrelator(commands.Cog):
+    """
+    모든 로거가 공유하는 감사 로그 인덱스입니다.
+    on_audit_log_entry_create로 들어오는 항목을 (서버, 액션, 대상 ID) 기준으로 잠시 보관하고,
+    로거들은 API를 직접 호출하는 대신 이 인덱스에서 실행자를 찾습니다.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        # 대상 ID가 없는 조회(예: 메시지 삭제)를 위해 모든 항목을 target_id=None 키에도 함께 저장합니다.
+        self._index: Dict[IndexKey, Deque[Tuple[float, discord.AuditLogEntry]]] = defaultdict(deque)
+        self._waiters: List[Tuple[IndexKey, Callable[[discord.AuditLogEntry], bool], asyncio.Future]] = []
+        self._fetch_tasks: Dict[Tuple[int, discord.AuditLogAction], asyncio.Task] = {}
+        self._last_fetch: Dict[Tuple[int, discord.AuditLogAction], float] = {}
+        self.stats: Dict[str, int] = {"gateway_entries": 0, "index_hits": 0, "gateway_waits": 0, "api_fetches": 0, "misses": 0}
+        self.prune_index.start()
+        logger.info("AuditLogCorrelator Cog가 성공적으로 초기화되었습니다.")
+
+    def cog_unload(self):
+        self.prune_index.cancel()
+        for _, _, future in self._waiters:
+            if not future.done(): future.cancel()
+        self._waiters.clear()
+
+    @tasks.loop(seconds=60)
+    async def prune_index(self):
+        cutoff = time.monotonic() - ENTRY_TTL_SECONDS
+        for key in list(self._index.keys()):
+            bucket = self._index[key]
+            while bucket and bucket[0][0] < cutoff:
+                bucket.popleft()
+            if not bucket:
+                del self._index[key]
+        self._waiters = [waiter for waiter in self._waiters if not waiter[2].done()]
+
+    @commands.Cog.listener()
+    async def on_audit_log_entry_create(self, entry: discord.AuditLogEntry):
+        self.stats["gateway_entries"] += 1
+        self._ingest(entry)
+
+    def _ingest(self, entry: discord.AuditLogEntry):
+        target_id = getattr(entry.target, 'id', None)
+        keys = {(entry.guild.id, entry.action, target_id), (entry.guild.id, entry.action, None)}
+        now = time.monotonic()
+        for key in keys:
+            bucket = self._index[key]
+            # API 폴백 조회로 같은 항목이 다시 들어올 수 있으므로 중복을 건너뜁니다.
+            if any(existing.id == entry.id for _, existing in bucket):
+                continue
+            bucket.append((now, entry))
+
+        if not self._waiters: return
+        remaining = []
+        for key, matcher, future in self._waiters:
+            if future.done():
+                continue
+            if key in keys and matcher(entry):
+                future.set_result(entry)
+            else:
+                remaining.append((key, matcher, future))
+        self._waiters = remaining
+
+    def _lookup(self, key: IndexKey, matcher: Callable[[discord.AuditLogEntry], bool]) -> Optional[discord.AuditLogEntry]:
+        # 가장 최근 항목부터 확인합니다.
+        for _, entry in reversed(self._index.get(key, ())):
+            if matcher(entry):
+                return entry
+        return None
+
+    async def _fetch_recent(self, guild: discord.Guild, action: discord.AuditLogAction):
+        """게이트웨이 이벤트를 놓친 경우, 서버/액션당 시간 창마다 최대 한 번만 API를 조회합니다."""
+        fetch_key = (guild.id, action)
+        task = self._fetch_tasks.get(fetch_key)
+        if task is None:
+            if time.monotonic() - self._last_fetch.get(fetch_key, 0.0) < FETCH_WINDOW_SECONDS:
+                return
+            self._last_fetch[fetch_key] = time.monotonic()
+            task = asyncio.create_task(self._do_fetch(guild, action))
+            self._fetch_tasks[fetch_key] = task
+            task.add_done_callback(lambda _: self._fetch_tasks.pop(fetch_key, None))
+        await asyncio.shield(task)
+
+    async def _do_fetch(self, guild: discord.Guild, action: discord.AuditLogAction):
+        self.stats["api_fetches"] += 1
+        try:
+            after = datetime.now(timezone.utc) - timedelta(seconds=MATCH_WINDOW_SECONDS * 2)
+            async for entry in guild.audit_logs(action=action, limit=25, after=after):
+                self._ingest(entry)
+        except discord.Forbidden:
+            logger.warning(f"감사 로그 읽기 권한이 없습니다: {guild.name}")
+        except Exception as e:
+            logger.error(f"'{action}' 감사 로그 확인 중 오류: {e}", exc_info=True)
+
+    async def find_entry(
+        self,
+        guild: discord.Guild,
+        action: discord.AuditLogAction,
+        target_id: Optional[int] = None,
+        predicate: Optional[EntryPredicate] = None,
+        *,
+        include_bots: bool = False,
+        timeout: float = WAIT_TIMEOUT_SECONDS,
+        fetch: bool = True
+    ) -> Optional[discord.AuditLogEntry]:
+        """
+        이벤트에 대응하는 감사 로그 항목을 찾습니다.
+        인덱스 → 게이트웨이 대기 → (서버/액션당 1회) API 조회 순서로 확인합니다.
+        fetch=False면 API 조회 없이 인덱스와 게이트웨이만 확인합니다. (timeout=0이면 인덱스만 확인)
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=MATCH_WINDOW_SECONDS)
+
+        def matcher(entry: discord.AuditLogEntry) -> bool:
+            if entry.created_at < cutoff: return False
+            if not include_bots and (entry.user is None or entry.user.bot): return False
+            return predicate is None or predicate(entry)
+
+        key: IndexKey = (guild.id, action, target_id)
+        if (entry := self._lookup(key, matcher)):
+            self.stats["index_hits"] += 1
+            return entry
+        if timeout <= 0 and not fetch:
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((key, matcher, future))
+        started_at = time.perf_counter()
+        try:
+            entry = await asyncio.wait_for(future, timeout=timeout)
+            self.stats["gateway_waits"] += 1
+            return entry
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            perf.add_wait_time(time.perf_counter() - started_at)
+
+        if not fetch:
+            return None
+        await self._fetch_recent(guild, action)
+        if (entry := self._lookup(key, matcher)):
+            return entry
+        self.stats["misses"] += 1
+        return None
+
+    async def find_user(self, guild: discord.Guild, action: discord.AuditLogAction, target_id: Optional[int] = None, predicate: Optional[EntryPredicate] = None) -> Optional[discord.abc.User]:
+        entry = await self.find_entry(guild, action, target_id, predicate)
+        return entry.user if entry else None
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(AuditLogCorrelator(bot))
@@ -3,10 +3,10 @@
 import discord
 from discord.ext import commands
 import logging
-from datetime import datetime, timezone, timedelta
 import asyncio
 
 from utils.database import get_id
+from utils.log_dispatcher import log_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -32,36 +32,30 @@ class BanLogger(commands.Cog):
         log_channel = await self.get_log_channel()
         if not log_channel: return
         
-        await asyncio.sleep(1.5)
-        try:
-            async for entry in guild.audit_logs(action=discord.AuditLogAction.ban, limit=5, after=datetime.now(timezone.utc) - timedelta(seconds=5)):
-                if entry.target and entry.target.id == user.id and not entry.user.bot:
-                    # 임시 캐시에 유저 ID를 추가하여 leave_logger가 중복 기록하는 것을 방지
-                    self.bot.recently_moderated_users.add(user.id)
-
-                    embed = discord.Embed(
-                        title="🚫 멤버 차단됨",
-                        description=f"{user.mention} 님이 서버에서 차단되었습니다.",
-                        color=discord.Color.brand_red(),
-                        timestamp=entry.created_at
-                    )
-                    embed.set_author(name=f"{user.name} ({user.id})", icon_url=user.display_avatar.url if user.display_avatar else None)
-                    embed.add_field(name="실행자", value=f"{entry.user.mention} (`{entry.user.id}`)", inline=False)
-                    if entry.reason:
-                        embed.add_field(name="사유", value=entry.reason, inline=False)
-                    await log_channel.send(embed=embed)
-
-                    # 10초 후에 캐시에서 ID를 자동으로 제거
-                    async def remove_from_cache():
-                        await asyncio.sleep(10)
-                        self.bot.recently_moderated_users.discard(user.id)
-                    asyncio.create_task(remove_from_cache())
-
-                    return
-        except discord.Forbidden:
-            logger.warning(f"감사 로그 읽기 권한이 없습니다: {guild.name}")
-        except Exception as e:
-            logger.error(f"'ban' 감사 로그 확인 중 오류: {e}", exc_info=True)
+        correlator = self.bot.get_cog("AuditLogCorrelator")
+        entry = await correlator.find_entry(guild, discord.AuditLogAction.ban, user.id) if correlator else None
+        if not entry: return
+
+        # 임시 캐시에 유저 ID를 추가하여 leave_logger가 중복 기록하는 것을 방지
+        self.bot.recently_moderated_users.add(user.id)
+
+        embed = discord.Embed(
+            title="🚫 멤버 차단됨",
+            description=f"{user.mention} 님이 서버에서 차단되었습니다.",
+            color=discord.Color.brand_red(),
+            timestamp=entry.created_at
+        )
+        embed.set_author(name=f"{user.name} ({user.id})", icon_url=user.display_avatar.url if user.display_avatar else None)
+        embed.add_field(name="실행자", value=f"{entry.user.mention} (`{entry.user.id}`)", inline=False)
+        if entry.reason:
+            embed.add_field(name="사유", value=entry.reason, inline=False)
+        log_dispatcher.enqueue(log_channel, embed)
+
+        # 10초 후에 캐시에서 ID를 자동으로 제거
+        async def remove_from_cache():
+            await asyncio.sleep(10)
+            self.bot.recently_moderated_users.discard(user.id)
+        asyncio.create_task(remove_from_cache())
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(BanLogger(bot))
@@ -5,6 +5,7 @@ import logging
 from datetime import datetime, timezone
 
 from utils.database import get_id
+from utils.log_dispatcher import log_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -32,8 +33,8 @@ class InviteLogger(commands.Cog):
 
         tracker_cog = self.bot.get_cog("InviteTracker")
         if tracker_cog:
-            invite = await tracker_cog.get_invite_for_member(member)
-            if invite and invite.inviter:
+            attribution = await tracker_cog.get_invite_for_member(member)
+            if attribution and attribution.get("inviter_id"):
                 embed = discord.Embed(
                     title="📨 초대 링크를 통해 참여",
                     description=f"{member.mention} 님이 초대를 통해 서버에 참여했습니다.",
@@ -41,10 +42,12 @@ class InviteLogger(commands.Cog):
                     timestamp=datetime.now(timezone.utc)
                 )
                 embed.set_author(name=f"{member.name} ({member.id})", icon_url=member.display_avatar.url if member.display_avatar else None)
-                embed.add_field(name="🔗 사용된 코드", value=f"`{invite.code}`", inline=True)
-                embed.add_field(name="💌 초대자", value=f"{invite.inviter.mention} (`{invite.inviter.id}`)", inline=True)
+                embed.add_field(name="🔗 사용된 코드", value=f"`{attribution['code']}`", inline=True)
+                embed.add_field(name="💌 초대자", value=f"<@{attribution['inviter_id']}> (`{attribution['inviter_id']}`)", inline=True)
+                if attribution.get("ambiguous"):
+                    embed.set_footer(text="동시에 여러 명이 입장하여 초대 코드는 추정값입니다.")
                 
-                await log_channel.send(embed=embed)
+                log_dispatcher.enqueue(log_channel, embed)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(InviteLogger(bot))
@@ -5,6 +5,7 @@ import logging
 from datetime import datetime, timezone
 
 from utils.database import get_id
+from utils.log_dispatcher import log_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -41,7 +42,7 @@ class JoinLogger(commands.Cog):
         
         # 초대 정보 관련 로직이 여기서 제거되었습니다.
 
-        await log_channel.send(embed=embed)
+        log_dispatcher.enqueue(log_channel, embed)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(JoinLogger(bot))
@@ -7,6 +7,7 @@ from datetime import datetime, timezone
 import asyncio
 
 from utils.database import get_id
+from utils.log_dispatcher import log_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -31,13 +32,27 @@ class LeaveLogger(commands.Cog):
     async def on_member_remove(self, member: discord.Member):
         if member.bot: return
         
-        # 다른 로거가 처리할 시간을 주기 위해 잠시 대기
-        await asyncio.sleep(2)
-
         # 만약 멤버가 최근에 추방/차단되었다면, 로그를 남기지 않고 종료
         if hasattr(self.bot, 'recently_moderated_users') and member.id in self.bot.recently_moderated_users:
             return
 
+        # 공용 감사 로그 인덱스와 게이트웨이 이벤트로만 추방/차단 기록을 확인합니다. (fetch=False: API 조회 없음)
+        # API 폴백 조회는 KickLogger/BanLogger가 담당하고, 그 결과는 recently_moderated_users로 알 수 있습니다.
+        correlator = self.bot.get_cog("AuditLogCorrelator")
+        if correlator:
+            kick_entry, ban_entry = await asyncio.gather(
+                correlator.find_entry(member.guild, discord.AuditLogAction.kick, member.id, fetch=False),
+                correlator.find_entry(member.guild, discord.AuditLogAction.ban, member.id, fetch=False)
+            )
+            if kick_entry or ban_entry:
+                return
+            if hasattr(self.bot, 'recently_moderated_users') and member.id in self.bot.recently_moderated_users:
+                return
+        else:
+            await asyncio.sleep(2)
+            if hasattr(self.bot, 'recently_moderated_users') and member.id in self.bot.recently_moderated_users:
+                return
+
         log_channel = await self.get_log_channel()
         if not log_channel: return
 
@@ -48,7 +63,7 @@ class LeaveLogger(commands.Cog):
             timestamp=datetime.now(timezone.utc)
         )
         embed.set_author(name=f"{member.name} ({member.id})", icon_url=member.display_avatar.url if member.display_avatar else None)
-        await log_channel.send(embed=embed)
+        log_dispatcher.enqueue(log_channel, embed)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(LeaveLogger(bot))
@@ -2,10 +2,10 @@
 import discord
 from discord.ext import commands
 import logging
-from datetime import datetime, timezone, timedelta
-import asyncio
+from datetime import datetime, timezone
 
 from utils.database import get_id
+from utils.log_dispatcher import log_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -36,18 +36,17 @@ class MessageLogger(commands.Cog):
 
         author, author_id, deleter = None, None, None
         
-        try:
-            guild = self.bot.get_guild(payload.guild_id)
-            if guild and guild.me.guild_permissions.view_audit_log:
-                await asyncio.sleep(1.5)
-                async for entry in guild.audit_logs(action=discord.AuditLogAction.message_delete, limit=1, after=datetime.now(timezone.utc) - timedelta(seconds=5)):
-                    if entry.extra.channel.id == payload.channel_id and isinstance(entry.target, discord.Member):
-                        author, author_id, deleter = entry.target, entry.target.id, entry.user
-                        break
-        except discord.Forbidden:
-            logger.warning(f"감사 로그 읽기 권한이 없어 삭제자를 추적할 수 없습니다: {guild.name}")
-        except Exception as e:
-            logger.error(f"메시지 삭제 감사 로그 확인 중 오류: {e}", exc_info=True)
+        guild = self.bot.get_guild(payload.guild_id)
+        correlator = self.bot.get_cog("AuditLogCorrelator")
+        if guild and correlator and guild.me.guild_permissions.view_audit_log:
+            # 메시지 삭제 감사 로그는 작성자를 대상으로 기록되므로, 채널 기준으로 찾습니다.
+            entry = await correlator.find_entry(
+                guild, discord.AuditLogAction.message_delete,
+                predicate=lambda e: e.extra.channel.id == payload.channel_id and isinstance(e.target, discord.Member),
+                include_bots=True
+            )
+            if entry:
+                author, author_id, deleter = entry.target, entry.target.id, entry.user
 
         message = payload.cached_message
         if message:
@@ -76,7 +75,7 @@ class MessageLogger(commands.Cog):
         embed.set_footer(text=f"작성자 ID: {author_id if author_id else '알 수 없음'}")
         if attachments:
             embed.add_field(name="첨부 파일", value="\n".join([f"[{att.filename}]({att.url})" for att in attachments]), inline=False)
-        await log_channel.send(embed=embed)
+        log_dispatcher.enqueue(log_channel, embed)
 
     @commands.Cog.listener()
     async def on_message_edit(self, before: discord.Message, after: discord.Message):
@@ -93,7 +92,7 @@ class MessageLogger(commands.Cog):
         embed.add_field(name="수정 전", value=f"```\n{before.content}\n```" if before.content else "내용 없음", inline=False)
         embed.add_field(name="수정 후", value=f"```\n{after.content}\n```" if after.content else "내용 없음", inline=False)
         embed.set_footer(text=f"작성자 ID: {after.author.id}")
-        await log_channel.send(embed=embed)
+        log_dispatcher.enqueue(log_channel, embed)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(MessageLogger(bot))
@@ -2,10 +2,10 @@
 import discord
 from discord.ext import commands
 import logging
-from datetime import datetime, timezone, timedelta
-import asyncio
+from datetime import datetime, timezone
 
 from utils.database import get_id
+from utils.log_dispatcher import log_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -26,22 +26,20 @@ class NicknameLogger(commands.Cog):
         return self.bot.get_channel(self.log_channel_id)
 
     @commands.Cog.listener()
-    async def on_member_update(self, before: discord.Member, after: discord.Member):
-        if before.bot or before.nick == after.nick: return
+    async def on_member_diff(self, diff):
+        # 봇 자신이 변경한 별명(self_inflicted)은 changed에 포함되지 않으므로 감사 로그를 조회하지 않습니다.
+        before, after = diff.before, diff.after
+        if before.bot or "nick" not in diff.changed: return
         log_channel = await self.get_log_channel()
         if not log_channel: return
         
-        await asyncio.sleep(1.5)
         moderator = None
-        try:
-            async for entry in after.guild.audit_logs(limit=5, action=discord.AuditLogAction.member_update, after=datetime.now(timezone.utc) - timedelta(seconds=5)):
-                if entry.target.id == after.id and not entry.user.bot and hasattr(entry.before, 'nick') and hasattr(entry.after, 'nick'):
-                    moderator = entry.user
-                    break
-        except discord.Forbidden:
-            logger.warning(f"[{after.guild.name}] 멤버 닉네임 업데이트 감사 로그 읽기 권한이 없습니다.")
-        except Exception as e:
-            logger.error(f"멤버 닉네임 업데이트 감사 로그 확인 중 오류: {e}", exc_info=True)
+        correlator = self.bot.get_cog("AuditLogCorrelator")
+        if correlator:
+            moderator = await correlator.find_user(
+                after.guild, discord.AuditLogAction.member_update, after.id,
+                lambda e: hasattr(e.before, 'nick') and hasattr(e.after, 'nick')
+            )
 
         # 봇 자신이 변경한 경우는 로그를 남기지 않음
         if moderator and moderator.id == self.bot.user.id:
@@ -56,7 +54,7 @@ class NicknameLogger(commands.Cog):
         embed.add_field(name="변경 전", value=f"`{before.nick or before.name}`", inline=True)
         embed.add_field(name="변경 후", value=f"`{after.nick or after.name}`", inline=True)
         embed.add_field(name="실행자", value=performer_mention, inline=False)
-        await log_channel.send(embed=embed)
+        log_dispatcher.enqueue(log_channel, embed)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(NicknameLogger(bot))
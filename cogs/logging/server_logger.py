@@ -3,10 +3,10 @@
 import discord
 from discord.ext import commands
 import logging
-from datetime import datetime, timezone, timedelta
-import asyncio
+from datetime import datetime, timezone
 
 from utils.database import get_id
+from utils.log_dispatcher import log_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -28,16 +28,9 @@ class ServerLogger(commands.Cog):
         return self.bot.get_channel(self.log_channel_id)
         
     async def get_audit_log_user(self, guild: discord.Guild, action: discord.AuditLogAction, target) -> discord.Member | None:
-        await asyncio.sleep(1.5)
-        try:
-            async for entry in guild.audit_logs(action=action, limit=5, after=datetime.now(timezone.utc) - timedelta(seconds=5)):
-                if entry.target and entry.target.id == target.id and not entry.user.bot:
-                    return entry.user
-        except discord.Forbidden:
-            logger.warning(f"감사 로그 읽기 권한이 없습니다: {guild.name}")
-        except Exception as e:
-            logger.error(f"'{action}' 감사 로그 확인 중 오류: {e}", exc_info=True)
-        return None
+        correlator = self.bot.get_cog("AuditLogCorrelator")
+        if not correlator: return None
+        return await correlator.find_user(guild, action, target.id)
 
     @commands.Cog.listener()
     async def on_guild_update(self, before: discord.Guild, after: discord.Guild):
@@ -65,7 +58,7 @@ class ServerLogger(commands.Cog):
         if changes:
             embed.description = "\n".join(changes)
             embed.add_field(name="수정한 사람", value=f"{user.mention} (`{user.id}`)", inline=False)
-            await log_channel.send(embed=embed)
+            log_dispatcher.enqueue(log_channel, embed)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(ServerLogger(bot))
@@ -3,10 +3,9 @@
 import discord
 from discord.ext import commands
 import logging
-from datetime import datetime, timezone, timedelta
-import asyncio
 
 from utils.database import get_id
+from utils.log_dispatcher import log_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -27,30 +26,23 @@ class TimeoutLogger(commands.Cog):
         return self.bot.get_channel(self.log_channel_id)
 
     @commands.Cog.listener()
-    async def on_member_update(self, before: discord.Member, after: discord.Member):
+    async def on_member_diff(self, diff):
         # 타임아웃 상태가 실제로 변경되었는지 먼저 확인
-        if before.timed_out_until == after.timed_out_until:
+        after = diff.after
+        if "timeout" not in diff.all_changes:
             return
             
         log_channel = await self.get_log_channel()
         if not log_channel: return
 
-        # 감사 로그가 기록될 시간을 줌
-        await asyncio.sleep(1.5)
+        # 변경된 속성 중에 'timed_out_until'이 있는 멤버 업데이트 감사 로그만 찾습니다.
+        correlator = self.bot.get_cog("AuditLogCorrelator")
         entry = None
-        try:
-            # 멤버 업데이트 감사 로그를 확인
-            async for audit_entry in after.guild.audit_logs(action=discord.AuditLogAction.member_update, limit=5, after=datetime.now(timezone.utc) - timedelta(seconds=5)):
-                # 감사 로그의 대상이 일치하고, 실행자가 봇이 아닌지 확인
-                if audit_entry.target and audit_entry.target.id == after.id and not audit_entry.user.bot:
-                    # [핵심 수정] 변경된 속성 중에 'timed_out_until'이 있는지 정확하게 확인
-                    if hasattr(audit_entry.changes.before, 'timed_out_until') and hasattr(audit_entry.changes.after, 'timed_out_until'):
-                        entry = audit_entry
-                        break # 정확한 로그를 찾았으므로 반복 중단
-        except discord.Forbidden:
-            logger.warning(f"감사 로그 읽기 권한이 없습니다: {after.guild.name}")
-        except Exception as e:
-            logger.error(f"'member_update' 감사 로그 확인 중 오류: {e}", exc_info=True)
+        if correlator:
+            entry = await correlator.find_entry(
+                after.guild, discord.AuditLogAction.member_update, after.id,
+                lambda e: hasattr(e.changes.before, 'timed_out_until') and hasattr(e.changes.after, 'timed_out_until')
+            )
 
         # 올바른 감사 로그를 찾지 못했으면 함수 종료
         if not entry:
@@ -78,7 +70,7 @@ class TimeoutLogger(commands.Cog):
         
         embed.set_author(name=f"{after.name} ({after.id})", icon_url=after.display_avatar.url if after.display_avatar else None)
         embed.add_field(name="실행자", value=f"{entry.user.mention} (`{entry.user.id}`)", inline=False)
-        await log_channel.send(embed=embed)
+        log_dispatcher.enqueue(log_channel, embed)
 
 
 async def setup(bot: commands.Bot):
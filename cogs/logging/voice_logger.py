@@ -5,6 +5,7 @@ import logging
 from datetime import datetime, timezone
 
 from utils.database import get_id
+from utils.log_dispatcher import log_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +65,7 @@ class VoiceLogger(commands.Cog):
             embed.set_author(name=f"{member.display_name} ({member.id})", icon_url=member.display_avatar.url if member.display_avatar else None)
         
         if embed:
-            await log_channel.send(embed=embed)
+            log_dispatcher.enqueue(log_channel, embed)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(VoiceLogger(bot))
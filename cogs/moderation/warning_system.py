@@ -8,9 +8,11 @@ from typing import Optional, List, Dict
 import asyncio
 from datetime import datetime, timezone
 
-from utils.database import get_id, save_panel_id, get_panel_id, get_embed_from_db, get_panel_components_from_db, supabase
+from utils.database import get_id, save_panel_id, get_panel_id, get_embed, get_panel_components_from_db, add_warning_and_get_total
 from utils.ui_defaults import POLICE_ROLE_KEY, WARNING_THRESHOLDS
 from utils.helpers import format_embed_from_db, has_required_roles
+from utils.view_registry import panel_views
+from utils.role_queue import role_queue
 
 logger = logging.getLogger(__name__)
 
@@ -151,24 +153,16 @@ class WarningSystem(commands.Cog):
         
     async def register_persistent_views(self):
         self.view_instance = WarningPanelView(self)
-        await self.view_instance.setup_buttons()
+        await panel_views.ensure_built("warning", self.view_instance)
         self.bot.add_view(self.view_instance)
         logger.info("✅ 벌점 시스템의 영구 View가 성공적으로 등록되었습니다.")
         
     async def process_warning(self, interaction: discord.Interaction, target_member: discord.Member, amount: int, reason: str, action_type: str) -> Optional[int]:
         """경고 부여/차감 공통 로직"""
-        try:
-            rpc_params = {
-                'p_guild_id': interaction.guild_id,
-                'p_user_id': target_member.id,
-                'p_moderator_id': interaction.user.id,
-                'p_reason': reason,
-                'p_amount': amount # 차감 시 음수값이 전달됨
-            }
-            response = await supabase.rpc('add_warning_and_get_total', rpc_params).execute()
-            new_total = response.data
-        except Exception as e:
-            logger.error(f"add_warning_and_get_total RPC 호출 실패: {e}", exc_info=True)
+        # 차감 시 amount에는 음수값이 전달됨
+        new_total = await add_warning_and_get_total(interaction.guild_id, target_member.id, interaction.user.id, reason, amount)
+        if new_total is None:
+            logger.error(f"add_warning_and_get_total 호출 실패 (대상: {target_member.id})")
             await interaction.followup.send("❌ 경고 처리 중 데이터베이스 오류가 발생했습니다.", ephemeral=True)
             return None
 
@@ -199,10 +193,7 @@ class WarningSystem(commands.Cog):
                 if target_role not in member.roles:
                     roles_to_add.append(target_role)
             
-            if roles_to_add:
-                await member.add_roles(*roles_to_add, reason=f"누적 벌점 {total_count}회 도달")
-            if roles_to_remove:
-                await member.remove_roles(*roles_to_remove, reason=f"벌점 역할 업데이트")
+            await role_queue.apply(member, add=roles_to_add, remove=roles_to_remove, reason=f"누적 벌점 {total_count}회 도달")
                 
         except discord.Forbidden:
             logger.error(f"벌점 역할 업데이트 실패: {member.display_name}님의 역할을 변경할 권한이 없습니다.")
@@ -216,7 +207,7 @@ class WarningSystem(commands.Cog):
         if not log_channel: return
         
         embed_key = "log_warning" if action_type == 'issue' else "log_warning_deduct"
-        embed_data = await get_embed_from_db(embed_key)
+        embed_data = get_embed(embed_key)
         if not embed_data: return
         
         embed = format_embed_from_db(embed_data)
@@ -247,7 +238,7 @@ class WarningSystem(commands.Cog):
                     await old_message.delete()
                 except (discord.NotFound, discord.Forbidden): pass
             
-            embed_data = await get_embed_from_db(embed_key)
+            embed_data = get_embed(embed_key)
             if not embed_data:
                 logger.error(f"DB에서 '{embed_key}' 임베드를 찾을 수 없어 패널을 생성할 수 없습니다.")
                 return False
@@ -257,7 +248,7 @@ class WarningSystem(commands.Cog):
             if self.view_instance is None:
                 await self.register_persistent_views() # View가 없다면 여기서 등록
             else:
-                 await self.view_instance.setup_buttons() # 이미 있다면 버튼만 새로고침
+                 await panel_views.ensure_built("warning", self.view_instance) # 이미 있다면 구성이 바뀐 경우에만 버튼을 새로 만듦
             
             new_message = await channel.send(embed=embed, view=self.view_instance)
             await save_panel_id(base_panel_key, new_message.id, channel.id)
@@ -2,74 +2,210 @@
 import discord
 from discord.ext import commands
 import logging
-from typing import Dict, Optional
+import asyncio
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# 입장 이벤트를 모아서 한 번에 초대 사용 횟수를 비교하는 대기 시간 (초)
+JOIN_BATCH_WINDOW_SECONDS = 1.5
+# 최대 사용 횟수에 도달해 삭제된 초대를 입장 귀속 후보로 남겨두는 시간 (초)
+DELETED_INVITE_GRACE_SECONDS = 30
+# 서버별로 메모리에 보관하는 최근 귀속 기록 수
+MAX_ATTRIBUTIONS_PER_GUILD = 1000
+
 class InviteTracker(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        # { guild_id: { code: invite } }
-        self.invite_cache: Dict[int, Dict[str, discord.Invite]] = {}
+        # { guild_id: { code: uses } } - 초대 객체 대신 사용 횟수만 보관합니다.
+        self.invite_uses: Dict[int, Dict[str, int]] = {}
+        # { guild_id: { code: (inviter_id, max_uses) } }
+        self.invite_meta: Dict[int, Dict[str, Tuple[Optional[int], int]]] = {}
+        # { guild_id: { code: (uses, max_uses, inviter_id, 삭제 시각) } }
+        self.deleted_invites: Dict[int, Dict[str, Tuple[int, int, Optional[int], float]]] = {}
+        # 귀속 대기 중인 입장: { guild_id: [(member_id, future)] }
+        self.pending_joins: Dict[int, List[Tuple[int, asyncio.Future]]] = {}
+        self.pending_futures: Dict[Tuple[int, int], asyncio.Future] = {}
+        self.batch_tasks: Dict[int, asyncio.Task] = {}
+        # 귀속 결과 기록: { guild_id: { member_id: attribution } }, 초대자별 누적 입장 수
+        self.attributions: Dict[int, Dict[int, Dict[str, Any]]] = {}
+        self.attribution_order: Dict[int, Deque[int]] = {}
+        self.inviter_counts: Dict[int, Counter] = {}
         logger.info("InviteTracker Cog가 성공적으로 초기화되었습니다.")
 
     async def cog_load(self):
         self.bot.loop.create_task(self.build_cache())
 
+    def cog_unload(self):
+        for task in self.batch_tasks.values():
+            task.cancel()
+        # 귀속을 기다리는 쪽(InviteLogger 등)이 영원히 대기하지 않도록 결과 없음으로 끝냅니다.
+        for future in self.pending_futures.values():
+            if not future.done():
+                future.set_result(None)
+        self.pending_futures.clear()
+        self.pending_joins.clear()
+
+    def _store_invites(self, guild_id: int, invites: List[discord.Invite]):
+        self.invite_uses[guild_id] = {invite.code: invite.uses or 0 for invite in invites}
+        self.invite_meta[guild_id] = {
+            invite.code: (invite.inviter.id if invite.inviter else None, invite.max_uses or 0)
+            for invite in invites
+        }
+
     async def build_cache(self):
         await self.bot.wait_until_ready()
         logger.info("[InviteTracker] 서버 초대 정보 캐싱을 시작합니다...")
         for guild in self.bot.guilds:
             try:
-                self.invite_cache[guild.id] = {invite.code: invite for invite in await guild.invites()}
+                self._store_invites(guild.id, await guild.invites())
             except discord.Forbidden:
                 logger.warning(f"[{guild.name}] 서버의 초대 링크를 볼 권한이 없어 캐시할 수 없습니다.")
         logger.info("[InviteTracker] 초대 정보 캐싱이 완료되었습니다.")
 
     @commands.Cog.listener()
     async def on_invite_create(self, invite: discord.Invite):
-        if invite.guild.id in self.invite_cache:
-            self.invite_cache[invite.guild.id][invite.code] = invite
+        if invite.guild.id in self.invite_uses:
+            self.invite_uses[invite.guild.id][invite.code] = invite.uses or 0
+            self.invite_meta[invite.guild.id][invite.code] = (invite.inviter.id if invite.inviter else None, invite.max_uses or 0)
 
     @commands.Cog.listener()
     async def on_invite_delete(self, invite: discord.Invite):
-        if invite.guild.id in self.invite_cache and invite.code in self.invite_cache[invite.guild.id]:
-            del self.invite_cache[invite.guild.id][invite.code]
-    
+        guild_id = invite.guild.id
+        if guild_id in self.invite_uses and invite.code in self.invite_uses[guild_id]:
+            uses = self.invite_uses[guild_id].pop(invite.code)
+            inviter_id, max_uses = self.invite_meta[guild_id].pop(invite.code, (None, 0))
+            # 최대 사용 횟수에 도달해 삭제된 초대는, 직후의 입장을 이 초대로 귀속시킬 수 있도록 잠시 남겨둡니다.
+            if max_uses:
+                self.deleted_invites.setdefault(guild_id, {})[invite.code] = (uses, max_uses, inviter_id, time.monotonic())
+
     @commands.Cog.listener()
     async def on_guild_join(self, guild: discord.Guild):
         try:
-            self.invite_cache[guild.id] = {invite.code: invite for invite in await guild.invites()}
+            self._store_invites(guild.id, await guild.invites())
         except discord.Forbidden:
             pass
 
     @commands.Cog.listener()
     async def on_guild_remove(self, guild: discord.Guild):
-        if guild.id in self.invite_cache:
-            del self.invite_cache[guild.id]
+        for cache in (self.invite_uses, self.invite_meta, self.deleted_invites, self.attributions, self.attribution_order, self.inviter_counts):
+            cache.pop(guild.id, None)
 
-    async def get_invite_for_member(self, member: discord.Member) -> Optional[discord.Invite]:
-        """새로 참여한 멤버가 어떤 초대를 통해 들어왔는지 찾아냅니다."""
-        guild = member.guild
-        if guild.id not in self.invite_cache:
-            return None
-            
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        if member.bot: return
+        self._enqueue_join(member)
+
+    # --- 입장 귀속 ---
+    def _enqueue_join(self, member: discord.Member) -> asyncio.Future:
+        key = (member.guild.id, member.id)
+        if (future := self.pending_futures.get(key)):
+            return future
+        future = asyncio.get_running_loop().create_future()
+        self.pending_futures[key] = future
+        self.pending_joins.setdefault(member.guild.id, []).append((member.id, future))
+
+        task = self.batch_tasks.get(member.guild.id)
+        if task is None or task.done():
+            self.batch_tasks[member.guild.id] = asyncio.create_task(self._process_batch(member.guild))
+        return future
+
+    async def _process_batch(self, guild: discord.Guild):
+        """대기 시간 동안 모인 입장들을 한 번의 초대 목록 조회로 귀속시킵니다."""
+        await asyncio.sleep(JOIN_BATCH_WINDOW_SECONDS)
+        joins = self.pending_joins.pop(guild.id, [])
+        if not joins: return
+
+        results: Dict[int, Optional[Dict[str, Any]]] = {}
         try:
-            current_invites = await guild.invites()
+            if guild.id in self.invite_uses:
+                current_invites = await guild.invites()
+                # 조회를 기다리는 동안 들어온 입장은 이번 묶음에 넣지 않습니다. (다음 묶음에서 처리)
+                late_joins = len(self.pending_joins.get(guild.id, []))
+                results, leftover = self._attribute(guild.id, [member_id for member_id, _ in joins], current_invites)
+                self._store_invites(guild.id, current_invites)
+                if late_joins and leftover:
+                    # 조회 결과에 이미 반영됐을 수 있는 늦은 입장의 사용분은 다음 묶음이 귀속할 수 있도록 남겨둡니다.
+                    uses = self.invite_uses[guild.id]
+                    for code in leftover[:late_joins]:
+                        if code in uses: uses[code] -= 1
         except discord.Forbidden:
+            pass
+        except Exception as e:
+            logger.error(f"[{guild.name}] 초대 귀속 처리 중 오류 발생: {e}", exc_info=True)
+        finally:
+            for member_id, future in joins:
+                self.pending_futures.pop((guild.id, member_id), None)
+                if not future.done():
+                    future.set_result(results.get(member_id))
+
+        # 이 작업이 끝나기 전에 들어온 입장은 새 작업을 만들지 못했으므로 여기서 이어서 처리합니다.
+        if self.pending_joins.get(guild.id):
+            self.batch_tasks[guild.id] = asyncio.create_task(self._process_batch(guild))
+
+    def _attribute(self, guild_id: int, member_ids: List[int], current_invites: List[discord.Invite]) -> Tuple[Dict[int, Dict[str, Any]], List[str]]:
+        """입장을 초대 사용 증가분에 귀속시키고, (귀속 결과, 남은 증가분의 초대 코드 목록)을 돌려줍니다."""
+        old_uses = self.invite_uses.get(guild_id, {})
+        meta = self.invite_meta.get(guild_id, {})
+
+        # 초대별 사용 횟수 증가분을 계산합니다.
+        deltas: List[Tuple[str, int, Optional[int]]] = []
+        for invite in current_invites:
+            delta = (invite.uses or 0) - old_uses.get(invite.code, 0)
+            if delta > 0:
+                deltas.append((invite.code, delta, invite.inviter.id if invite.inviter else meta.get(invite.code, (None, 0))[0]))
+
+        # 한도에 도달해 삭제된 초대는 남은 사용 횟수만큼 증가한 것으로 봅니다.
+        now = time.monotonic()
+        deleted = self.deleted_invites.pop(guild_id, {})
+        for code, (uses, max_uses, inviter_id, deleted_at) in deleted.items():
+            if now - deleted_at <= DELETED_INVITE_GRACE_SECONDS and max_uses > uses:
+                deltas.append((code, max_uses - uses, inviter_id))
+
+        # 증가분을 입장 순서대로 나눠 줍니다. 여러 초대가 섞이면 어느 멤버가 어느 초대를 썼는지는 추정입니다.
+        slots = [(code, inviter_id) for code, delta, inviter_id in deltas for _ in range(delta)]
+        ambiguous = len(deltas) > 1
+        if sum(delta for _, delta, _ in deltas) != len(member_ids):
+            logger.info(f"[InviteTracker] 입장 {len(member_ids)}건과 초대 사용 증가분 {len(slots)}건이 일치하지 않아 일부는 추정으로 귀속합니다.")
+            ambiguous = ambiguous or len(member_ids) > 1
+
+        results: Dict[int, Dict[str, Any]] = {}
+        joined_at = datetime.now(timezone.utc)
+        for member_id, (code, inviter_id) in zip(member_ids, slots):
+            attribution = {"member_id": member_id, "code": code, "inviter_id": inviter_id, "joined_at": joined_at, "ambiguous": ambiguous}
+            results[member_id] = attribution
+            self._record_attribution(guild_id, attribution)
+        return results, [code for code, _ in slots[len(member_ids):]]
+
+    def _record_attribution(self, guild_id: int, attribution: Dict[str, Any]):
+        records = self.attributions.setdefault(guild_id, {})
+        order = self.attribution_order.setdefault(guild_id, deque())
+        records[attribution["member_id"]] = attribution
+        order.append(attribution["member_id"])
+        while len(order) > MAX_ATTRIBUTIONS_PER_GUILD:
+            records.pop(order.popleft(), None)
+        if attribution["inviter_id"]:
+            self.inviter_counts.setdefault(guild_id, Counter())[attribution["inviter_id"]] += 1
+
+    async def get_invite_for_member(self, member: discord.Member) -> Optional[Dict[str, Any]]:
+        """새로 참여한 멤버가 어떤 초대를 통해 들어왔는지 찾아냅니다. (code, inviter_id, ambiguous)"""
+        guild = member.guild
+        if guild.id not in self.invite_uses:
             return None
+        if (attribution := self.get_attribution(guild.id, member.id)):
+            return attribution
+        return await asyncio.shield(self._enqueue_join(member))
+
+    def get_attribution(self, guild_id: int, member_id: int) -> Optional[Dict[str, Any]]:
+        """이미 기록된 귀속 정보를 API 호출 없이 돌려줍니다."""
+        return self.attributions.get(guild_id, {}).get(member_id)
 
-        found_invite = None
-        for new_invite in current_invites:
-            cached_invite = self.invite_cache[guild.id].get(new_invite.code)
-            # 캐시된 사용 횟수보다 현재 사용 횟수가 1 많으면, 이 초대를 통해 들어온 것
-            if cached_invite and new_invite.uses > cached_invite.uses:
-                found_invite = new_invite
-                break
-        
-        # 최신 정보로 캐시 업데이트
-        self.invite_cache[guild.id] = {invite.code: invite for invite in current_invites}
-        return found_invite
+    def get_inviter_leaderboard(self, guild_id: int, limit: int = 10) -> List[Tuple[int, int]]:
+        """봇이 켜진 뒤 기록된 초대자별 입장 수 상위 목록입니다."""
+        return self.inviter_counts.get(guild_id, Counter()).most_common(limit)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(InviteTracker(bot))
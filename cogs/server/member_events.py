@@ -6,7 +6,8 @@ from typing import Optional, List
 import re
 
 from utils.helpers import format_embed_from_db
-from utils.database import get_id, get_embed_from_db, supabase, get_config, backup_member_data, get_member_backup, delete_member_backup
+from utils.database import get_id, get_embed, get_config, backup_member_data, get_member_backup, delete_member_backup, create_initial_user_level
+from utils.role_queue import role_queue
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +21,11 @@ class MemberEvents(commands.Cog):
     async def cog_load(self):
         pass
 
+    def _expect_self_edit(self, member: discord.Member, **changes):
+        # 봇이 직접 바꾼 역할/닉네임이 로거에서 감사 로그 조회로 이어지지 않도록 미리 알려 둡니다.
+        if (dispatcher := self.bot.get_cog("MemberUpdateDispatcher")):
+            dispatcher.expect_self_edit(member, **changes)
+
     async def load_configs(self):
         self.welcome_channel_id = get_id("new_welcome_channel_id")
         self.farewell_channel_id = get_id("farewell_channel_id")
@@ -37,14 +43,16 @@ class MemberEvents(commands.Cog):
                 role_ids_to_restore = backup.get('roles', [])
                 roles_to_restore = [role for role_id in role_ids_to_restore if (role := member.guild.get_role(role_id)) is not None]
                 restored_nick = backup.get('nickname')
-                if roles_to_restore or restored_nick: await member.edit(roles=roles_to_restore, nick=restored_nick, reason="서버 재참여로 인한 데이터 복구")
+                if roles_to_restore or restored_nick:
+                    self._expect_self_edit(member, nick=restored_nick, roles_added=[role.id for role in roles_to_restore])
+                    await member.edit(roles=roles_to_restore, nick=restored_nick, reason="서버 재참여로 인한 데이터 복구")
                 await delete_member_backup(member.id, member.guild.id)
             except Exception as e: logger.error(f"'{member.display_name}'님 데이터 복구 중 오류: {e}", exc_info=True)
             return
             
         # 신규 유저 초기 데이터 생성 (유지)
         try:
-            await supabase.table('user_levels').upsert({'user_id': member.id, 'level': 1, 'xp': 0}, on_conflict='user_id').execute()
+            await create_initial_user_level(member.id)
         except Exception as e: logger.error(f"'{member.display_name}'님의 초기 레벨 데이터 생성 중 오류: {e}", exc_info=True)
         
         # 초기 알림 역할만 부여
@@ -52,12 +60,13 @@ class MemberEvents(commands.Cog):
         
         roles_to_add = [role for key in initial_role_keys if (role_id := get_id(key)) and (role := member.guild.get_role(role_id))]
         if roles_to_add:
+            self._expect_self_edit(member, roles_added=[role.id for role in roles_to_add])
             try: await member.add_roles(*roles_to_add, reason="서버 참여 시 초기 역할 부여")
             except discord.Forbidden: logger.error(f"'{member.display_name}'님에게 초기 역할을 부여하지 못했습니다. (권한 부족)")
             
         # 환영 메시지 전송 (유지)
         if self.welcome_channel_id and (channel := self.bot.get_channel(self.welcome_channel_id)):
-            embed_data = await get_embed_from_db('welcome_embed')
+            embed_data = get_embed('welcome_embed')
             if embed_data:
                 embed = format_embed_from_db(embed_data, member_mention=member.mention, guild_name=member.guild.name)
                 if member.display_avatar: embed.set_thumbnail(url=member.display_avatar.url)
@@ -71,7 +80,7 @@ class MemberEvents(commands.Cog):
             await backup_member_data(member.id, member.guild.id, role_ids_to_backup, member.nick)
         except Exception as e: logger.error(f"'{member.display_name}'님 데이터 백업 중 오류: {e}", exc_info=True)
         if self.farewell_channel_id and (channel := self.bot.get_channel(self.farewell_channel_id)):
-            embed_data = await get_embed_from_db('farewell_embed')
+            embed_data = get_embed('farewell_embed')
             if embed_data:
                 embed = format_embed_from_db(embed_data, member_name=member.name)
                 if member.display_avatar: embed.set_thumbnail(url=member.display_avatar.url)
@@ -114,9 +123,7 @@ class MemberEvents(commands.Cog):
             if new_level > 10: new_level = 10
             role_to_add = boost_ticket_roles_by_level.get(new_level)
             
-            final_roles = list(current_member_roles - roles_to_remove_set)
-            if role_to_add: final_roles.append(role_to_add)
-            await member.edit(roles=final_roles, reason="서버 부스트 보상 업데이트")
+            await role_queue.apply(member, add=[role_to_add] if role_to_add else [], remove=list(roles_to_remove_set - {role_to_add}), reason="서버 부스트 보상 업데이트")
             final_roles_for_embed = [role_to_add] if role_to_add else []
         else:
             logger.info("이미 최고 레벨(10)에 도달하여 역할 변경은 없습니다.")
@@ -125,7 +132,7 @@ class MemberEvents(commands.Cog):
         try:
             boost_channel_id = get_id("boost_log_channel_id")
             if boost_channel := self.bot.get_channel(boost_channel_id):
-                embed_data = await get_embed_from_db("log_boost_start")
+                embed_data = get_embed("log_boost_start")
                 if embed_data:
                     roles_list_str = "\n".join([f"- {role.mention}" for role in final_roles_for_embed]) if final_roles_for_embed else "최고 레벨 달성!"
                     embed = format_embed_from_db(
@@ -141,27 +148,24 @@ class MemberEvents(commands.Cog):
         logger.info(f"--- 부스트 보상 지급 프로세스 종료: {member.display_name} ---")
     
     @commands.Cog.listener()
-    async def on_member_update(self, before: discord.Member, after: discord.Member):
-        if after.bot: return
-
-        if before.premium_since == after.premium_since:
-            return
+    async def on_member_diff(self, diff):
+        after = diff.after
+        if after.bot or "boost" not in diff.all_changes: return
 
-        if before.premium_since is None and after.premium_since is not None:
+        if diff.boost_started:
             await self._handle_boost_start(after)
 
-        elif before.premium_since is not None and after.premium_since is None:
+        elif diff.boost_stopped:
             logger.info(f"{after.display_name}님이 서버 부스트를 중지하여 보상 역할을 회수합니다.")
             boost_ticket_role_keys = [f"role_boost_ticket_{i}" for i in range(1, 11)]
             all_reward_role_ids = {get_id(key) for key in boost_ticket_role_keys if get_id(key)}
             roles_to_remove = [role for role in after.roles if role.id in all_reward_role_ids]
             try:
-                if roles_to_remove:
-                    await after.remove_roles(*roles_to_remove, reason="서버 부스트 중지")
+                await role_queue.apply(after, remove=roles_to_remove, reason="서버 부스트 중지")
                 
                 boost_channel_id = get_id("boost_log_channel_id")
                 if boost_channel := self.bot.get_channel(boost_channel_id):
-                    embed_data = await get_embed_from_db("log_boost_stop")
+                    embed_data = get_embed("log_boost_stop")
                     if embed_data:
                         embed = format_embed_from_db(embed_data, member_mention=after.mention)
                         if after.display_avatar:
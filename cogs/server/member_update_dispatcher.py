@@ -0,0 +1,169 @@
+# cogs/server/member_update_dispatcher.py
+
+import discord
+from discord.ext import commands
+import logging
+import asyncio
+import time
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+from utils.role_queue import role_queue
+
+logger = logging.getLogger(__name__)
+
+# 같은 멤버에 대한 연속 업데이트를 하나로 합치는 대기 시간 (초)
+COALESCE_WINDOW_SECONDS = 0.75
+# 봇이 직접 만든 변경으로 간주하는 예약을 보관하는 시간 (초)
+SELF_EDIT_TTL_SECONDS = 10.0
+
+MemberKey = Tuple[int, int]
+
+_UNSET = object()
+
+
+class MemberDiff:
+    """
+    한 멤버에게 짧은 시간 안에 일어난 변경을 합친 결과입니다.
+    changed에는 봇 자신이 만든 변경(self_inflicted)이 빠져 있고, all_changes에는 모두 들어 있습니다.
+    필드 이름: "roles", "nick", "timeout", "boost"
+    """
+    def __init__(self, before: discord.Member, after: discord.Member):
+        self.before = before
+        self.after = after
+        before_roles = {role.id: role for role in before.roles}
+        after_roles = {role.id: role for role in after.roles}
+        self.roles_added: List[discord.Role] = [role for role_id, role in after_roles.items() if role_id not in before_roles]
+        self.roles_removed: List[discord.Role] = [role for role_id, role in before_roles.items() if role_id not in after_roles]
+
+        changes: Set[str] = set()
+        if self.roles_added or self.roles_removed: changes.add("roles")
+        if before.nick != after.nick: changes.add("nick")
+        if before.timed_out_until != after.timed_out_until: changes.add("timeout")
+        if before.premium_since != after.premium_since: changes.add("boost")
+        self.all_changes: FrozenSet[str] = frozenset(changes)
+        self.self_inflicted: FrozenSet[str] = frozenset()
+        self.changed: FrozenSet[str] = self.all_changes
+
+    @property
+    def member(self) -> discord.Member:
+        return self.after
+
+    @property
+    def boost_started(self) -> bool:
+        return self.before.premium_since is None and self.after.premium_since is not None
+
+    @property
+    def boost_stopped(self) -> bool:
+        return self.before.premium_since is not None and self.after.premium_since is None
+
+    def _mark_self_inflicted(self, fields: Set[str]):
+        self.self_inflicted = frozenset(fields & self.all_changes)
+        self.changed = self.all_changes - self.self_inflicted
+
+
+class _SelfEdit:
+    __slots__ = ("expires_at", "nick", "roles_added", "roles_removed")
+
+    def __init__(self, nick, roles_added: Iterable[int], roles_removed: Iterable[int]):
+        self.expires_at = time.monotonic() + SELF_EDIT_TTL_SECONDS
+        self.nick = nick
+        self.roles_added = frozenset(roles_added)
+        self.roles_removed = frozenset(roles_removed)
+
+
+class MemberUpdateDispatcher(commands.Cog):
+    """
+    on_member_update를 한 곳에서만 받아 변경 내용을 한 번 계산하고, 'member_diff' 이벤트로 다시 보냅니다.
+    각 Cog는 on_member_diff(diff) 리스너에서 필요한 필드만 확인합니다.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        # { (guild_id, member_id): [최초 before, 최신 after, 합치기 작업] }
+        self._pending: Dict[MemberKey, list] = {}
+        self._self_edits: Dict[MemberKey, List[_SelfEdit]] = {}
+        self._next_sweep_at = 0.0
+        self.stats: Dict[str, int] = {"raw_updates": 0, "dispatched": 0, "coalesced": 0, "self_suppressed": 0}
+        logger.info("MemberUpdateDispatcher Cog가 성공적으로 초기화되었습니다.")
+
+    async def cog_load(self):
+        # 공용 역할 큐가 보내는 PATCH도 봇 자신의 변경으로 분류되도록 연결합니다.
+        role_queue.set_self_edit_hook(self.expect_self_edit)
+
+    def cog_unload(self):
+        role_queue.set_self_edit_hook(None)
+        for _, _, task in self._pending.values():
+            task.cancel()
+        self._pending.clear()
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        self.stats["raw_updates"] += 1
+        key = (after.guild.id, after.id)
+        if (pending := self._pending.get(key)):
+            pending[1] = after
+            self.stats["coalesced"] += 1
+            return
+        if before.roles == after.roles and before.nick == after.nick \
+                and before.timed_out_until == after.timed_out_until and before.premium_since == after.premium_since:
+            return
+        self._pending[key] = [before, after, asyncio.create_task(self._flush_after_window(key))]
+
+    async def _flush_after_window(self, key: MemberKey):
+        await asyncio.sleep(COALESCE_WINDOW_SECONDS)
+        pending = self._pending.pop(key, None)
+        if not pending: return
+        diff = MemberDiff(pending[0], pending[1])
+        if not diff.all_changes: return
+        self._apply_self_edits(key, diff)
+        self._sweep_self_edits()
+        if diff.self_inflicted:
+            self.stats["self_suppressed"] += 1
+        self.stats["dispatched"] += 1
+        self.bot.dispatch("member_diff", diff)
+
+    def expect_self_edit(self, member: discord.Member, *, nick=_UNSET, roles_added: Iterable[int] = (), roles_removed: Iterable[int] = ()):
+        """
+        봇이 곧 이 멤버를 수정한다고 미리 알려 둡니다.
+        이어서 도착하는 업데이트 중 예약과 일치하는 필드는 self_inflicted로 분류되어, 로거들이 감사 로그를 조회하지 않습니다.
+        """
+        key = (member.guild.id, member.id)
+        now = time.monotonic()
+        edits = [edit for edit in self._self_edits.get(key, []) if edit.expires_at > now]
+        edits.append(_SelfEdit(nick, roles_added, roles_removed))
+        self._self_edits[key] = edits
+        self._sweep_self_edits()
+
+    def _sweep_self_edits(self):
+        """업데이트가 끝내 오지 않은 멤버의 만료된 예약을 정리합니다. (TTL마다 한 번만 전체를 훑습니다)"""
+        now = time.monotonic()
+        if now < self._next_sweep_at: return
+        self._next_sweep_at = now + SELF_EDIT_TTL_SECONDS
+        for key in list(self._self_edits):
+            edits = [edit for edit in self._self_edits[key] if edit.expires_at > now]
+            if edits: self._self_edits[key] = edits
+            else: del self._self_edits[key]
+
+    def _apply_self_edits(self, key: MemberKey, diff: MemberDiff):
+        now = time.monotonic()
+        edits = [edit for edit in self._self_edits.pop(key, []) if edit.expires_at > now]
+        if not edits: return
+
+        fields: Set[str] = set()
+        used: Set[int] = set()
+        for i, edit in enumerate(edits):
+            if edit.nick is not _UNSET and "nick" in diff.all_changes and edit.nick == diff.after.nick:
+                fields.add("nick"); used.add(i)
+        if "roles" in diff.all_changes:
+            role_edits = [i for i, edit in enumerate(edits) if edit.roles_added or edit.roles_removed]
+            expected_added = frozenset().union(*(edits[i].roles_added for i in role_edits))
+            expected_removed = frozenset().union(*(edits[i].roles_removed for i in role_edits))
+            if role_edits and {r.id for r in diff.roles_added} <= expected_added and {r.id for r in diff.roles_removed} <= expected_removed:
+                fields.add("roles"); used.update(role_edits)
+
+        if (remaining := [edit for i, edit in enumerate(edits) if i not in used]):
+            self._self_edits[key] = remaining
+        diff._mark_self_inflicted(fields)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(MemberUpdateDispatcher(bot))
@@ -11,10 +11,12 @@ from typing import List, Dict, Any, Optional
 import copy
 
 from utils.database import (
-    get_id, save_panel_id, get_panel_id, get_cooldown, set_cooldown, 
-    get_embed_from_db, get_onboarding_steps, get_panel_components_from_db, get_config
+    get_id, save_panel_id, get_panel_id, get_cooldown_remaining, start_cooldown, 
+    get_embed, get_onboarding_steps, get_panel_components_from_db, get_config
 )
 from utils.helpers import format_embed_from_db, format_seconds_to_hms, has_required_roles
+from utils.view_registry import panel_views
+from utils.role_queue import role_queue
 
 logger = logging.getLogger(__name__)
 
@@ -77,7 +79,7 @@ class IntroductionModal(ui.Modal, title="주민 등록증"):
 
             approval_channel = self.onboarding_cog.approval_channel
             if not approval_channel: await interaction.followup.send("❌ 오류: 승인 채널을 찾을 수 없습니다.", ephemeral=True); return
-            embed_data = await get_embed_from_db("embed_onboarding_approval")
+            embed_data = get_embed("embed_onboarding_approval")
             if not embed_data: await interaction.followup.send("❌ 오류: 승인용 메시지 템플릿을 찾을 수 없습니다.", ephemeral=True); return
             
             embed = format_embed_from_db(embed_data, member_mention=interaction.user.mention, member_name=interaction.user.display_name)
@@ -350,8 +352,8 @@ class ApprovalView(ui.View):
                         break
             # ▲▲▲▲▲ 핵심 수정 종료 ▲▲▲▲▲
             
-            if roles_to_add: await member.add_roles(*list(set(roles_to_add)), reason="자기소개 승인")
-            if (rid := get_id("role_guest")) and (r := guild.get_role(rid)) and r in member.roles: await member.remove_roles(r, reason="자기소개 승인 완료")
+            roles_to_remove = [r] if (rid := get_id("role_guest")) and (r := guild.get_role(rid)) else []
+            await role_queue.apply(member, add=roles_to_add, remove=roles_to_remove, reason="자기소개 승인")
             
             if failed_to_find_roles: 
                 return f"역할을 찾을 수 없음: `{', '.join(failed_to_find_roles)}`. `/setup` 명령어로 역할을 동기화해주세요."
@@ -394,7 +396,7 @@ class ApprovalView(ui.View):
         try:
             ch_id = self.onboarding_cog.main_chat_channel_id
             if ch_id and (ch := member.guild.get_channel(ch_id)):
-                embed_data = await get_embed_from_db("embed_main_chat_welcome")
+                embed_data = get_embed("embed_main_chat_welcome")
                 if not embed_data: return "메인 채팅 환영 임베드를 찾을 수 없음."
                 
                 staff_role_id = get_id('role_staff_newbie_helper') or 1412052122949779517
@@ -424,11 +426,11 @@ class ApprovalView(ui.View):
         try:
             guild_name = member.guild.name
             if is_approved:
-                embed_data = await get_embed_from_db("dm_onboarding_approved")
+                embed_data = get_embed("dm_onboarding_approved")
                 if not embed_data: return
                 embed = format_embed_from_db(embed_data, guild_name=guild_name)
             else:
-                embed_data = await get_embed_from_db("dm_onboarding_rejected")
+                embed_data = get_embed("dm_onboarding_rejected")
                 if not embed_data: return
                 embed = format_embed_from_db(embed_data, guild_name=guild_name)
                 embed.add_field(name="사유", value=reason, inline=False)
@@ -484,7 +486,7 @@ class OnboardingGuideView(ui.View):
         if role_id and isinstance(interaction.user, discord.Member):
             if role := interaction.guild.get_role(role_id):
                 try:
-                    if role not in interaction.user.roles: await interaction.user.add_roles(role, reason="온보딩 진행")
+                    await role_queue.apply(interaction.user, add=[role], reason="온보딩 진행")
                 except Exception as e: logger.error(f"온보딩 가이드 중 역할 부여 실패: {e}")
             else: logger.warning(f"온보딩: DB에 설정된 역할 ID({role_id})를 서버에서 찾을 수 없습니다. ({role_key_to_add})")
     
@@ -565,18 +567,16 @@ class OnboardingPanelView(ui.View):
             cooldown_seconds = 300
             logger.warning("ONBOARDING_COOLDOWN_SECONDS 설정값이 숫자가 아니므로 기본값(300)을 사용합니다.")
         
-        utc_now = datetime.now(timezone.utc).timestamp()
-        last_time = await get_cooldown(user_id_str, cooldown_key)
+        time_remaining = get_cooldown_remaining(user_id_str, cooldown_key, cooldown_seconds)
         
-        if last_time > 0 and (utc_now - last_time) < cooldown_seconds:
-            time_remaining = cooldown_seconds - (utc_now - last_time)
+        if time_remaining > 0:
             formatted_time = format_seconds_to_hms(time_remaining)
             message = f"❌ 다음 안내는 **{formatted_time}** 후에 볼 수 있습니다. 잠시만 기다려주세요."
             await interaction.response.send_message(message, ephemeral=True)
             return
             
         await interaction.response.defer(ephemeral=True, thinking=True)
-        await set_cooldown(user_id_str, cooldown_key)
+        start_cooldown(user_id_str, cooldown_key, cooldown_seconds)
         try:
             steps = await get_onboarding_steps()
             if not steps: 
@@ -626,7 +626,7 @@ class Onboarding(commands.Cog):
 
     async def register_persistent_views(self):
         self.view_instance = OnboardingPanelView(self)
-        await self.view_instance.setup_buttons()
+        await panel_views.ensure_built("onboarding", self.view_instance)
         self.bot.add_view(self.view_instance)
 
     async def cog_load(self): 
@@ -656,7 +656,7 @@ class Onboarding(commands.Cog):
                     await old_message.delete()
                 except (discord.NotFound, discord.HTTPException): pass
 
-            embed_data = await get_embed_from_db(embed_key)
+            embed_data = get_embed(embed_key)
             if not embed_data:
                 logger.warning(f"DB에서 '{embed_key}' 임베드 데이터를 찾을 수 없어, 패널 생성을 건너뜁니다.")
                 return False
@@ -665,7 +665,7 @@ class Onboarding(commands.Cog):
             if self.view_instance is None:
                 await self.register_persistent_views()
             
-            await self.view_instance.setup_buttons()
+            await panel_views.ensure_built("onboarding", self.view_instance)
             new_message = await channel.send(embed=embed, view=self.view_instance)
             await save_panel_id(base_panel_key, new_message.id, channel.id)
             logger.info(f"✅ {panel_key} 패널을 성공적으로 새로 생성했습니다. (채널: #{channel.name})")
@@ -7,7 +7,8 @@ import logging
 from typing import Optional, List, Dict, Any, Set
 import asyncio
 
-from utils.database import get_id, save_panel_id, get_panel_id, get_embed_from_db, get_config
+from utils.database import get_id, save_panel_id, get_panel_id, get_embed, get_config
+from utils.role_queue import role_queue
 
 logger = logging.getLogger(__name__)
 
@@ -52,15 +53,11 @@ class RoleSelectDropdown(ui.Select):
              return
 
         try:
+            # 이 드롭다운이 관리하는 역할의 목표 상태만 넘기면, 실제로 바뀌는 역할은 역할 큐가 최신 기준으로 계산합니다.
             selected_ids = {int(value) for value in self.values}
-            current_roles_set = set(interaction.user.roles)
-            unmanaged_roles = [role for role in current_roles_set if role.id not in self.managed_role_ids]
-            roles_to_set = unmanaged_roles
-            for role_id in selected_ids:
-                if role := interaction.guild.get_role(role_id):
-                    roles_to_set.append(role)
-            
-            await interaction.user.edit(roles=roles_to_set, reason="역할 패널을 통한 역할 변경")
+            to_add = [role for role_id in selected_ids if (role := interaction.guild.get_role(role_id))]
+            to_remove = [role for role_id in self.managed_role_ids - selected_ids if (role := interaction.guild.get_role(role_id))]
+            await role_queue.apply(interaction.user, add=to_add, remove=to_remove, reason="역할 패널을 통한 역할 변경")
             
             message = await interaction.followup.send("✅ 역할이 성공적으로 업데이트되었습니다.", ephemeral=True, wait=True)
             await asyncio.sleep(5)
@@ -168,7 +165,7 @@ class RolePanel(commands.Cog):
                 logger.error(f"❌ '{panel_key}' 설정에 'embed_key'가 지정되지 않았습니다.")
                 return False
 
-            embed_data = await get_embed_from_db(embed_key)
+            embed_data = get_embed(embed_key)
             if not embed_data:
                 logger.error(f"❌ '{embed_key}' 임베드 데이터를 찾을 수 없어 패널 생성을 중단합니다.")
                 return False
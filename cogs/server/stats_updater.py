@@ -2,7 +2,8 @@
 import discord
 from discord.ext import commands, tasks
 import logging
-from typing import Optional
+from collections import Counter
+from typing import Optional, Dict, List, Any
 
 from utils.database import get_all_stats_channels
 
@@ -11,10 +12,18 @@ logger = logging.getLogger(__name__)
 class StatsUpdater(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # { guild_id: {"humans": int, "bots": int, "roles": Counter(role_id -> 멤버 수)} }
+        self.counters: Dict[int, Dict[str, Any]] = {}
+        # stats_channels 설정 캐시 (None이면 다음 루프에서 DB에서 다시 읽음)
+        self.stats_configs: Optional[List[Dict[str, Any]]] = None
+        # { channel_id: 마지막으로 적용한 채널 이름 }
+        self.last_written: Dict[int, str] = {}
         logger.info("StatsUpdater Cog가 성공적으로 초기화되었습니다.")
 
     @commands.Cog.listener()
     async def on_ready(self):
+        # 재연결(재식별) 중 놓친 입장/퇴장이 있을 수 있으므로 카운터를 다시 집계하도록 비웁니다.
+        self.counters.clear()
         # [개선] 봇이 완전히 준비된 후에 루프를 시작하여 초기 오류 방지
         if not self.update_stats_loop.is_running():
             self.update_stats_loop.start()
@@ -24,10 +33,80 @@ class StatsUpdater(commands.Cog):
         self.update_stats_loop.cancel()
         logger.info("통계 업데이트 루프가 중지되었습니다.")
 
+    def reload_configs(self):
+        """통계 채널 설정이 바뀌었을 때 호출하면, 다음 루프에서 DB 설정을 다시 읽습니다."""
+        self.stats_configs = None
+        self.last_written.clear()
+
+    # --- 카운터 관리 ---
+    def _build_counters(self, guild: discord.Guild) -> Dict[str, Any]:
+        """서버 멤버를 한 번만 훑어서 카운터를 초기화합니다."""
+        humans, bots = 0, 0
+        roles: Counter = Counter()
+        for member in guild.members:
+            if member.bot: bots += 1
+            else: humans += 1
+            roles.update(role.id for role in member.roles if not role.is_default())
+        self.counters[guild.id] = {"humans": humans, "bots": bots, "roles": roles}
+        logger.info(f"📊 [{guild.name}] 통계 카운터를 초기화했습니다. (사람: {humans}, 봇: {bots})")
+        return self.counters[guild.id]
+
+    def _apply_member(self, member: discord.Member, delta: int):
+        counters = self.counters.get(member.guild.id)
+        if counters is None: return
+        counters["bots" if member.bot else "humans"] += delta
+        for role in member.roles:
+            if not role.is_default():
+                counters["roles"][role.id] += delta
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        self._apply_member(member, 1)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        self._apply_member(member, -1)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.roles == after.roles: return
+        counters = self.counters.get(after.guild.id)
+        if counters is None: return
+        before_ids, after_ids = {r.id for r in before.roles}, {r.id for r in after.roles}
+        for role_id in after_ids - before_ids:
+            counters["roles"][role_id] += 1
+        for role_id in before_ids - after_ids:
+            counters["roles"][role_id] -= 1
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        if (counters := self.counters.get(role.guild.id)):
+            counters["roles"].pop(role.id, None)
+
+    def get_count(self, guild: discord.Guild, stat_type: str, role_id: Optional[int] = None) -> Optional[int]:
+        counters = self.counters.get(guild.id) or self._build_counters(guild)
+        if stat_type == "total":
+            return guild.member_count
+        if stat_type == "humans":
+            return counters["humans"]
+        if stat_type == "bots":
+            return counters["bots"]
+        if stat_type == "boosters":
+            return guild.premium_subscription_count
+        if stat_type == "role":
+            if role_id and guild.get_role(role_id):
+                return counters["roles"].get(role_id, 0)
+            logger.warning(f"통계 업데이트: 역할 ID({role_id})를 찾을 수 없습니다.")
+            return 0
+        return None
+
     @tasks.loop(minutes=10)
     async def update_stats_loop(self):
         try:
-            configs = await get_all_stats_channels()
+            if self.stats_configs is None:
+                # 조회에 실패하면(None) 캐시하지 않고 다음 루프에서 다시 시도합니다.
+                self.stats_configs = await get_all_stats_channels()
+            configs = self.stats_configs
             if not configs:
                 return
 
@@ -35,38 +114,27 @@ class StatsUpdater(commands.Cog):
                 guild_configs = [c for c in configs if c.get("guild_id") == guild.id]
                 if not guild_configs:
                     continue
-                
-                all_members = guild.members
 
                 for config in guild_configs:
                     stat_type = config.get("stat_type")
                     template = config.get("channel_name_template")
                     channel_id = config.get("channel_id")
-                    
+
                     if not all([stat_type, template, channel_id]):
                         continue
 
-                    count = 0
-                    if stat_type == "total":
-                        count = guild.member_count
-                    elif stat_type == "humans":
-                        count = len([m for m in all_members if not m.bot])
-                    elif stat_type == "bots":
-                        count = len([m for m in all_members if m.bot])
-                    elif stat_type == "boosters":
-                        count = guild.premium_subscription_count
-                    elif stat_type == "role":
-                        if role_id := config.get("role_id"):
-                            if role := guild.get_role(role_id):
-                                count = len(role.members)
-                            else:
-                                logger.warning(f"통계 업데이트: 역할 ID({role_id})를 찾을 수 없습니다.")
-                    
+                    count = self.get_count(guild, stat_type, config.get("role_id"))
+                    if count is None:
+                        continue
+
                     try:
                         new_name = template.format(count=count)
+                        if self.last_written.get(channel_id) == new_name:
+                            continue
                         if channel := guild.get_channel(channel_id):
                             if channel.name != new_name:
                                 await channel.edit(name=new_name, reason="서버 통계 자동 업데이트")
+                            self.last_written[channel_id] = new_name
                         else:
                             logger.warning(f"통계 업데이트: 채널 ID({channel_id})를 찾을 수 없습니다.")
                     except KeyError:
@@ -11,14 +11,15 @@ import time
 import json
 
 from utils.database import (
-    get_config, save_id_to_db, save_config_to_db, get_id,
+    get_config, save_ids_to_db, save_config_to_db, get_id,
     get_all_stats_channels, add_stats_channel, remove_stats_channel,
     _channel_id_cache,
-    supabase,
-    get_all_embeds, get_embed_from_db, save_embed_to_db,
+    get_pet, set_pet_hatch_time,
+    get_all_embeds, get_embed, save_embed_to_db,
     delete_config_from_db
 )
 from utils.helpers import calculate_xp_for_level
+from utils.perf import perf
 from utils.ui_defaults import (
     UI_ROLE_KEY_MAP, SETUP_COMMAND_MAP, ADMIN_ROLE_KEYS, 
     ADMIN_ACTION_MAP, UI_STRINGS, JOB_ADVANCEMENT_DATA, PROFILE_RANK_ROLES,
@@ -27,6 +28,10 @@ from utils.ui_defaults import (
 
 logger = logging.getLogger(__name__)
 
+# 패널 일괄 재설치 시 동시에 처리할 채널 수와 진행 상황 편집 간격 (초)
+PANEL_REGENERATE_CONCURRENCY = 5
+PANEL_PROGRESS_EDIT_INTERVAL = 1.5
+
 async def is_admin(interaction: discord.Interaction) -> bool:
     if not isinstance(interaction.user, discord.Member): return False
     admin_role_ids = {get_id(key) for key in ADMIN_ROLE_KEYS if get_id(key)}
@@ -84,7 +89,9 @@ class EmbedTemplateSelectView(ui.View):
         await interaction.response.send_modal(modal)
         await modal.wait()
         if modal.embed:
-            await save_embed_to_db(embed_key, modal.embed.to_dict())
+            new_embed_data = modal.embed.to_dict()
+            await save_embed_to_db(embed_key, new_embed_data)
+            self.all_embeds[embed_key] = new_embed_data
             for item in self.children: item.disabled = True
             await interaction.edit_original_response(view=self)
             await interaction.followup.send(f"✅ 임베드 템플릿 `{embed_key}`가 성공적으로 업데이트되었습니다.\n`/admin setup`으로 관련 패널을 재설치하면 변경사항이 적용됩니다.", embed=modal.embed, ephemeral=True)
@@ -110,6 +117,94 @@ class ServerSystem(commands.Cog):
             else: 
                 await interaction.followup.send("❌ 명령어를 처리하는 중 예기치 않은 오류가 발생했습니다.", ephemeral=True)
 
+    # --- 패널 일괄 재설치 ---
+    def _build_regenerate_embed(self, success_list: List[str], failure_list: List[str], progress: Optional[str] = None) -> discord.Embed:
+        title = f"⏳ 패널 재설치 진행 중 ({progress})" if progress else "⚙️ 모든 패널 재설치 결과"
+        embed = discord.Embed(title=title, color=0x3498DB, timestamp=discord.utils.utcnow())
+        if success_list: embed.add_field(name="✅ 성공/요청", value="\n".join(success_list)[:1024], inline=False)
+        if failure_list:
+            embed.color = 0xED4245
+            embed.add_field(name="❌ 실패", value="\n".join(failure_list)[:1024], inline=False)
+        return embed
+
+    async def regenerate_all_panels(self, interaction: discord.Interaction, setup_map: Dict[str, Any]) -> tuple[List[str], List[str]]:
+        """
+        패널을 대상 채널별로 묶어 재설치합니다.
+        서로 다른 채널은 동시에 처리하고(채널마다 디스코드 속도 제한 버킷이 따로 있음), 같은 채널 안에서는 순서를 지킵니다.
+        """
+        success_list, failure_list = [], []
+        jobs_by_channel: Dict[int, List[tuple]] = {}
+        game_requests: Dict[str, str] = {}
+
+        for key, info in setup_map.items():
+            if info.get("type") != "panel": continue
+            friendly_name = info.get("friendly_name", key)
+            cog_name, channel_db_key = info.get("cog_name"), info.get("key")
+            if not all([cog_name, channel_db_key]):
+                failure_list.append(f"・`{friendly_name}`: 설정 정보가 불완전합니다.")
+                continue
+            if "[게임]" in friendly_name or "[보스]" in friendly_name:
+                game_requests[key] = friendly_name
+                continue
+            cog = self.bot.get_cog(cog_name)
+            if not cog or not hasattr(cog, 'regenerate_panel'):
+                failure_list.append(f"・`{friendly_name}`: Cog를 찾을 수 없거나 재설치 기능이 없습니다.")
+                continue
+            channel_id = get_id(channel_db_key)
+            if not channel_id or not (target_channel := self.bot.get_channel(channel_id)):
+                failure_list.append(f"・`{friendly_name}`: 채널이 설정되지 않았거나 찾을 수 없습니다.")
+                continue
+            jobs_by_channel.setdefault(target_channel.id, []).append((key, friendly_name, cog, target_channel))
+
+        # 게임 봇 패널은 DB에 요청만 남기면 되므로 함께 보냅니다.
+        async def request_game_panel(key: str, friendly_name: str):
+            timestamp = datetime.now(timezone.utc).timestamp()
+            db_key = f"panel_regenerate_request_{key}"
+            await save_config_to_db(db_key, timestamp)
+            logger.info(f"[Game Bot Request] DB에 패널 재설치 요청을 보냈습니다. Key: '{db_key}', Value: {timestamp}")
+            success_list.append(f"・`{friendly_name}`: 게임 봇에게 재설치를 요청했습니다.")
+
+        total = len(failure_list) + len(game_requests) + sum(len(jobs) for jobs in jobs_by_channel.values())
+        finished = asyncio.Event()
+        semaphore = asyncio.Semaphore(PANEL_REGENERATE_CONCURRENCY)
+
+        async def run_channel(jobs: List[tuple]):
+            async with semaphore:
+                for key, friendly_name, cog, target_channel in jobs:
+                    try:
+                        if await cog.regenerate_panel(target_channel, panel_key=key):
+                            success_list.append(f"・`{friendly_name}` → <#{target_channel.id}>")
+                        else:
+                            failure_list.append(f"・`{friendly_name}`: 재설치 중 알 수 없는 오류가 발생했습니다.")
+                    except Exception as e:
+                        logger.error(f"'{friendly_name}' 패널 일괄 재설치 중 오류: {e}", exc_info=True)
+                        failure_list.append(f"・`{friendly_name}`: 스크립트 오류 발생.")
+
+        async def report_progress():
+            # 작업이 끝날 때마다 편집하면 웹훅 속도 제한에 걸리므로, 바뀐 내용이 있을 때만 일정 간격으로 반영합니다.
+            last_done = -1
+            while not finished.is_set():
+                done = len(success_list) + len(failure_list)
+                if done != last_done:
+                    last_done = done
+                    try:
+                        await interaction.edit_original_response(embed=self._build_regenerate_embed(success_list, failure_list, progress=f"{done}/{total}"))
+                    except discord.HTTPException: pass
+                try: await asyncio.wait_for(finished.wait(), timeout=PANEL_PROGRESS_EDIT_INTERVAL)
+                except asyncio.TimeoutError: pass
+
+        progress_task = asyncio.create_task(report_progress())
+        try:
+            await asyncio.gather(
+                *(request_game_panel(key, name) for key, name in game_requests.items()),
+                *(run_channel(jobs) for jobs in jobs_by_channel.values()),
+                return_exceptions=True
+            )
+        finally:
+            finished.set()
+            await progress_task
+        return success_list, failure_list
+
     @admin_group.command(name="purge", description="채널의 메시지를 삭제합니다. (별칭: clean)")
     @app_commands.rename(amount='개수', user='유저')
     @app_commands.describe(
@@ -180,6 +275,36 @@ class ServerSystem(commands.Cog):
         
         return sorted(choices, key=lambda c: c.name)[:25]
 
+    @admin_group.command(name="perf", description="핸들러별 처리 시간 통계를 보여줍니다. (PERF_INSTRUMENTATION=1 필요)")
+    @app_commands.rename(top='개수', sort_by='정렬', reset='초기화')
+    @app_commands.describe(top="표시할 핸들러 수 (최대 25개)", sort_by="정렬 기준", reset="표시 후 통계를 초기화합니다.")
+    @app_commands.choices(sort_by=[
+        app_commands.Choice(name="p95", value="p95"), app_commands.Choice(name="p99", value="p99"),
+        app_commands.Choice(name="평균", value="avg"), app_commands.Choice(name="호출 수", value="calls"),
+        app_commands.Choice(name="예외 수", value="errors"),
+    ])
+    @app_commands.check(is_admin)
+    async def perf_summary(self, interaction: discord.Interaction, top: app_commands.Range[int, 1, 25] = 10, sort_by: str = "p95", reset: bool = False):
+        if not perf.enabled:
+            return await interaction.response.send_message("ℹ️ 성능 계측이 꺼져 있습니다. `PERF_INSTRUMENTATION=1` 환경 변수로 봇을 시작해주세요.", ephemeral=True)
+
+        rows = perf.top(top, sort_by)
+        elapsed_minutes = (time.monotonic() - perf.started_at) / 60
+        embed = discord.Embed(title=f"⏱️ 핸들러 처리 시간 상위 {len(rows)}개 ({sort_by} 기준)", color=0x3498DB, timestamp=discord.utils.utcnow())
+        if not rows:
+            embed.description = "아직 기록된 핸들러가 없습니다."
+        for name, s in rows:
+            embed.add_field(
+                name=name[:256],
+                value=(f"호출 {s['calls']}회 · 예외 {s['errors']}회\n"
+                       f"p50 `{s['p50'] * 1000:.1f}ms` · p95 `{s['p95'] * 1000:.1f}ms` · p99 `{s['p99'] * 1000:.1f}ms`\n"
+                       f"평균 `{s['avg'] * 1000:.1f}ms` (REST `{s['rest_avg'] * 1000:.1f}ms` · DB `{s['db_avg'] * 1000:.1f}ms` · 감사 로그 대기 `{s['wait_avg'] * 1000:.1f}ms`)"),
+                inline=False
+            )
+        embed.set_footer(text=f"수집 기간: {elapsed_minutes:.1f}분 · 핸들러 {len(perf.handlers)}개")
+        if reset: perf.reset()
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     @admin_group.command(name="setup", description="봇의 모든 설정을 관리합니다.")
     @app_commands.describe(
         action="실행할 작업을 선택하세요.",
@@ -292,8 +417,7 @@ class ServerSystem(commands.Cog):
 
             db_key, friendly_name = config['key'], config['friendly_name']
             
-            save_success = await save_id_to_db(db_key, channel.id)
-            if not save_success:
+            if await save_ids_to_db({db_key: channel.id}):
                 return await interaction.followup.send(f"❌ **{friendly_name}** 설정 중 DB 저장에 실패했습니다.", ephemeral=True)
 
             if (cog_to_reload := self.bot.get_cog(config["cog_name"])) and hasattr(cog_to_reload, 'load_configs'):
@@ -457,15 +581,16 @@ class ServerSystem(commands.Cog):
                 return await interaction.followup.send("❌ 이 작업을 수행하려면 `user` 옵션을 지정해야 합니다.", ephemeral=True)
 
             try:
-                pet_res = await supabase.table('pets').select('id, current_stage').eq('user_id', user.id).maybe_single().execute()
-                if not (pet_res and pet_res.data):
+                pet = await get_pet(user.id)
+                if not pet:
                     return await interaction.followup.send(f"❌ {user.mention}님은 펫을 소유하고 있지 않습니다.", ephemeral=True)
                 
-                if pet_res.data['current_stage'] != 1:
+                if pet['current_stage'] != 1:
                     return await interaction.followup.send(f"❌ {user.mention}님의 펫은 이미 부화한 상태입니다.", ephemeral=True)
                 
-                past_time = (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()
-                await supabase.table('pets').update({'hatches_at': past_time}).eq('id', pet_res.data['id']).execute()
+                past_time = datetime.now(timezone.utc) - timedelta(seconds=1)
+                if not await set_pet_hatch_time(pet['id'], past_time):
+                    return await interaction.followup.send("❌ 펫 즉시 부화 처리 중 오류가 발생했습니다.", ephemeral=True)
                 
                 logger.info(f"관리자({interaction.user.id})가 {user.id}의 펫을 즉시 부화시켰습니다.")
                 await interaction.followup.send(f"✅ {user.mention}님의 알을 즉시 부화시키도록 게임 봇에게 요청했습니다.\n"
@@ -618,8 +743,7 @@ class ServerSystem(commands.Cog):
                 if choice.value == action:
                     friendly_name = choice.name.replace(" 설정", "")
             
-            save_success = await save_id_to_db(db_key, role.id)
-            if not save_success:
+            if await save_ids_to_db({db_key: role.id}):
                  return await interaction.followup.send(f"❌ **{friendly_name}** 설정 중 DB 저장에 실패했습니다. Supabase RLS 정책을 확인해주세요.", ephemeral=True)
 
             cog_to_reload = self.bot.get_cog("Reminder")
@@ -630,56 +754,12 @@ class ServerSystem(commands.Cog):
 
         elif action == "panels_regenerate_all":
             setup_map = get_config("SETUP_COMMAND_MAP", {})
-            success_list, failure_list = [], []
-
             await interaction.followup.send("⏳ 모든 패널의 재설치를 시작합니다...", ephemeral=True)
 
-            for key, info in setup_map.items():
-                if info.get("type") == "panel":
-                    friendly_name = info.get("friendly_name", key)
-                    
-                    try:
-                        cog_name, channel_db_key = info.get("cog_name"), info.get("key")
-                        if not all([cog_name, channel_db_key]):
-                            failure_list.append(f"・`{friendly_name}`: 설정 정보가 불완전합니다.")
-                            continue
-
-                        is_game_panel = "[게임]" in friendly_name or "[보스]" in friendly_name
-                        if is_game_panel:
-                            timestamp = datetime.now(timezone.utc).timestamp()
-                            db_key = f"panel_regenerate_request_{key}"
-                            await save_config_to_db(db_key, timestamp)
-                            logger.info(f"[Game Bot Request] DB에 패널 재설치 요청을 보냈습니다. Key: '{db_key}', Value: {timestamp}")
-                            success_list.append(f"・`{friendly_name}`: 게임 봇에게 재설치를 요청했습니다.")
-                            continue
-
-                        cog = self.bot.get_cog(cog_name)
-                        if not cog or not hasattr(cog, 'regenerate_panel'):
-                            failure_list.append(f"・`{friendly_name}`: Cog를 찾을 수 없거나 재설치 기능이 없습니다.")
-                            continue
-                        channel_id = get_id(channel_db_key)
-                        if not channel_id or not (target_channel := self.bot.get_channel(channel_id)):
-                            failure_list.append(f"・`{friendly_name}`: 채널이 설정되지 않았거나 찾을 수 없습니다.")
-                            continue
-                        
-                        success = await cog.regenerate_panel(target_channel, panel_key=key)
-                        
-                        if success: success_list.append(f"・`{friendly_name}` → <#{target_channel.id}>")
-                        
-                        else: failure_list.append(f"・`{friendly_name}`: 재설치 중 알 수 없는 오류가 발생했습니다.")
-                        
-                        await asyncio.sleep(1)
-
-                    except Exception as e:
-                        logger.error(f"'{friendly_name}' 패널 일괄 재설치 중 오류: {e}", exc_info=True)
-                        failure_list.append(f"・`{friendly_name}`: 스크립트 오류 발생.")
-
-            embed = discord.Embed(title="⚙️ 모든 패널 재설치 결과", color=0x3498DB, timestamp=discord.utils.utcnow())
-            if success_list: embed.add_field(name="✅ 성공/요청", value="\n".join(success_list), inline=False)
-            if failure_list:
-                embed.color = 0xED4245
-                embed.add_field(name="❌ 실패", value="\n".join(failure_list), inline=False)
-            
+            started_at = time.monotonic()
+            success_list, failure_list = await self.regenerate_all_panels(interaction, setup_map)
+            embed = self._build_regenerate_embed(success_list, failure_list)
+            embed.set_footer(text=f"소요 시간: {time.monotonic() - started_at:.1f}초")
             await interaction.edit_original_response(content="모든 패널 재설치가 완료되었습니다.", embed=embed)
 
         elif action == "roles_sync":
@@ -689,14 +769,20 @@ class ServerSystem(commands.Cog):
             synced_roles, missing_roles, error_roles = [], [], []
             server_roles_by_name = {r.name: r.id for r in interaction.guild.roles}
             
+            # 서버에 있는 역할 ID를 모두 모아 한 번의 upsert로 저장합니다.
+            found_ids: Dict[str, int] = {}
+            queued_roles: Dict[str, str] = {}
             for db_key, role_info in UI_ROLE_KEY_MAP.items():
                 if not (role_name := role_info.get('name')): continue
                 if role_id := server_roles_by_name.get(role_name):
-                    if await save_id_to_db(db_key, role_id): synced_roles.append(f"・`{role_name}`")
-                    else: error_roles.append(f"・`{role_name}`: DB 저장 실패")
+                    found_ids[db_key] = role_id
+                    queued_roles[db_key] = role_name
                 else: missing_roles.append(f"・`{role_name}`")
-                
-                await asyncio.sleep(0.1)
+
+            failed_keys = set(await save_ids_to_db(found_ids))
+            for db_key, role_name in queued_roles.items():
+                if db_key in failed_keys: error_roles.append(f"・`{role_name}`: DB 저장 실패")
+                else: synced_roles.append(f"・`{role_name}`")
             
             embed = discord.Embed(title="⚙️ 역할 데이터베이스 전체 동기화 결과", color=0x2ECC71)
             embed.set_footer(text=f"총 {len(UI_ROLE_KEY_MAP)}개 중 | 성공: {len(synced_roles)} / 실패: {len(missing_roles) + len(error_roles)}")
@@ -719,6 +805,8 @@ class ServerSystem(commands.Cog):
             
             if stat_type == "remove":
                 await remove_stats_channel(channel.id)
+                if (stats_cog := self.bot.get_cog("StatsUpdater")) and hasattr(stats_cog, 'reload_configs'):
+                    stats_cog.reload_configs()
                 await interaction.followup.send(f"✅ `{channel.name}` 채널의 통계 설정을 삭제했습니다.", ephemeral=True)
             else:
                 current_template = template or f"정보: {{count}}"
@@ -730,12 +818,14 @@ class ServerSystem(commands.Cog):
                 await add_stats_channel(channel.id, interaction.guild_id, stat_type, current_template, role.id if role else None)
                 
                 if (stats_cog := self.bot.get_cog("StatsUpdater")) and hasattr(stats_cog, 'update_stats_loop') and stats_cog.update_stats_loop.is_running():
+                    stats_cog.reload_configs()
                     stats_cog.update_stats_loop.restart()
                 
                 await interaction.followup.send(f"✅ `{channel.name}` 채널에 통계 설정을 추가/수정했습니다. 곧 업데이트됩니다.", ephemeral=True)
 
         elif action == "stats_refresh":
             if (stats_cog := self.bot.get_cog("StatsUpdater")) and hasattr(stats_cog, 'update_stats_loop') and stats_cog.update_stats_loop.is_running():
+                stats_cog.reload_configs()
                 stats_cog.update_stats_loop.restart()
                 await interaction.followup.send("✅ 모든 통계 채널의 업데이트를 요청했습니다.", ephemeral=True)
             else:
@@ -743,6 +833,8 @@ class ServerSystem(commands.Cog):
 
         elif action == "stats_list":
             configs = await get_all_stats_channels()
+            if configs is None:
+                return await interaction.followup.send("❌ 통계 채널 설정을 불러오지 못했습니다. 잠시 후 다시 시도해주세요.", ephemeral=True)
             guild_configs = [c for c in configs if c.get('guild_id') == interaction.guild_id]
             if not guild_configs:
                 return await interaction.followup.send("ℹ️ 설정된 통계 채널이 없습니다.", ephemeral=True)
@@ -4,12 +4,22 @@ import discord
 from discord.ext import commands
 import os
 import asyncio
+import hashlib
+import json
 import logging
 import logging.handlers
+import time
 from datetime import datetime, timezone
 from typing import Optional
 from discord.ext import commands, tasks
-from utils.database import load_all_data_from_db, sync_defaults_to_db
+from utils.database import (
+    load_all_data_from_db, sync_defaults_to_db, write_behind, load_state_snapshot, save_state_snapshot, close_storage_backends,
+    get_config, save_config_to_db, get_cache_sizes
+)
+from utils.log_dispatcher import log_dispatcher
+from utils.metrics import metrics, MetricsSampler, MetricsServer, RateLimitLogHandler
+from utils.perf import perf, instrument_bot
+from utils.loop_monitor import loop_monitor
 
 # --- 중앙 로깅 설정 ---
 log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - [%(name)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
@@ -27,12 +37,27 @@ logging.getLogger('discord.http').setLevel(logging.WARNING)
 logging.getLogger('websockets').setLevel(logging.WARNING)
 logging.getLogger('supabase').setLevel(logging.WARNING)
 logging.getLogger('httpx').setLevel(logging.WARNING)
+logging.getLogger('werkzeug').setLevel(logging.WARNING)
+# REST 429 응답을 지표로 세기 위해 discord.http 로거의 경고를 함께 받습니다.
+logging.getLogger('discord.http').addHandler(RateLimitLogHandler())
 
 logger = logging.getLogger(__name__)
 
 # --- 환경 변수 및 인텐트 설정 ---
 BOT_TOKEN = os.environ.get('BOT_TOKEN')
 RAW_TEST_GUILD_ID = os.environ.get('TEST_GUILD_ID')
+# '0'으로 설정하면 DB 쓰기 지연 큐를 끄고 모든 쓰기를 즉시 반영합니다.
+DB_WRITE_BEHIND_ENABLED = os.environ.get('DB_WRITE_BEHIND', '1') != '0'
+# '0'으로 설정하면 로컬 상태 스냅샷을 쓰지 않고 매번 DB에서 모든 데이터를 불러온 뒤 시작합니다.
+STATE_SNAPSHOT_ENABLED = os.environ.get('STATE_SNAPSHOT', '1') != '0'
+# '1'로 설정하면 명령어 구성이 바뀌지 않았어도 시작할 때 슬래시 명령어를 강제로 동기화합니다.
+FORCE_COMMAND_SYNC = os.environ.get('FORCE_COMMAND_SYNC', '0') == '1'
+COMMAND_TREE_FINGERPRINT_PATH = os.environ.get('COMMAND_TREE_FINGERPRINT_PATH', 'data/command_tree_fingerprint.json')
+COMMAND_TREE_FINGERPRINT_KEY = "COMMAND_TREE_FINGERPRINT"
+# '0'으로 설정하면 지표/헬스 체크 HTTP 서버(/metrics, /health)를 띄우지 않습니다.
+METRICS_ENABLED = os.environ.get('METRICS', '1') != '0'
+# '0'으로 설정하면 이벤트 루프 정지 감시(스택 기록)를 끕니다. 임계값은 LOOP_STALL_THRESHOLD_MS (기본 500ms)
+LOOP_MONITOR_ENABLED = os.environ.get('LOOP_MONITOR', '1') != '0'
 TEST_GUILD_ID: Optional[int] = None
 if RAW_TEST_GUILD_ID:
     try:
@@ -51,10 +76,46 @@ class MyBot(commands.Bot):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.recently_moderated_users = set()
+        # on_ready는 게이트웨이 재연결 때마다 다시 호출되므로, 최초 1회만 시작 작업을 실행합니다.
+        self._startup_done = False
+        # 스냅샷으로 시작한 경우 백그라운드에서 도는 DB 동기화 작업 (예외/완료 여부 확인용으로 보관)
+        self.reconcile_task: Optional[asyncio.Task] = None
+        self.metrics_sampler = MetricsSampler(self, cache_sizes=get_cache_sizes)
+        self.metrics_server = MetricsServer(self)
+
+    async def _run_event(self, coro, event_name: str, *args, **kwargs):
+        # 모든 리스너 실행을 감싸 처리 시간과 예외 수를 리스너별로 기록합니다.
+        listener = getattr(coro, "__qualname__", event_name)
+        started_at = time.perf_counter()
+        try:
+            async with perf.track(f"listener:{listener}"):
+                await coro(*args, **kwargs)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            metrics.inc("bot_listener_errors_total", {"listener": listener})
+            try:
+                await self.on_error(event_name, *args, **kwargs)
+            except asyncio.CancelledError:
+                pass
+        finally:
+            metrics.observe("bot_listener_duration_seconds", time.perf_counter() - started_at, {"listener": listener, "event": event_name})
 
     async def setup_hook(self):
-        await sync_defaults_to_db()
-        await load_all_data_from_db()
+        if METRICS_ENABLED:
+            self.metrics_server.start()
+            self.metrics_sampler.start()
+        if LOOP_MONITOR_ENABLED:
+            loop_monitor.start()
+
+        # 로컬 스냅샷이 있으면 바로 그 상태로 시작하고, DB와의 동기화는 백그라운드에서 진행합니다.
+        if STATE_SNAPSHOT_ENABLED and await load_state_snapshot():
+            self.reconcile_task = self.loop.create_task(self.reconcile_state_with_db(reload_configs=True))
+        else:
+            await self.reconcile_state_with_db()
+
+        if DB_WRITE_BEHIND_ENABLED:
+            write_behind.start()
 
         await self.load_all_extensions()
         
@@ -78,10 +139,107 @@ class MyBot(commands.Bot):
         if registered_views_count > 0:
             logger.info(f"✅ 총 {registered_views_count}개의 Cog에서 영구 View를 성공적으로 등록했습니다.")
 
+    async def reconcile_state_with_db(self, reload_configs: bool = False):
+        try:
+            await sync_defaults_to_db()
+            await load_all_data_from_db()
+            if STATE_SNAPSHOT_ENABLED:
+                await save_state_snapshot()
+        except Exception as e:
+            logger.error(f"❌ DB 상태 동기화 중 오류 발생: {e}", exc_info=True)
+            return
+        # 스냅샷 데이터로 이미 설정을 불러간 Cog들이 최신 채널/역할 ID를 쓰도록 다시 불러옵니다.
+        if reload_configs and self._startup_done:
+            logger.info("🔄 DB 동기화가 끝나 모든 Cog 설정을 다시 불러옵니다.")
+            await self.load_cog_configs()
+
+    async def load_cog_configs(self):
+        logger.info("------ [ 모든 Cog 설정 로드 시작 ] ------")
+        for cog_name, cog in self.cogs.items():
+            if hasattr(cog, 'load_configs'):
+                try: 
+                    await cog.load_configs()
+                except Exception as e: 
+                    logger.error(f"❌ '{cog_name}' Cog 설정 로드 중 오류: {e}", exc_info=True)
+        logger.info("------ [ 모든 Cog 설정 로드 완료 ] ------")
+
+    async def close(self):
+        # 연결이 끊기기 전에 대기 중인 로그를 모두 전송합니다.
+        try:
+            await log_dispatcher.flush_all()
+        except Exception as e:
+            logger.error(f"❌ 종료 전 로그 전송 중 오류 발생: {e}", exc_info=True)
+        # 아직 DB에 반영되지 않은 쓰기를 모두 내보냅니다.
+        try:
+            await write_behind.stop()
+        except Exception as e:
+            logger.error(f"❌ 종료 전 DB 지연 쓰기 반영 중 오류 발생: {e}", exc_info=True)
+        if STATE_SNAPSHOT_ENABLED:
+            await save_state_snapshot()
+        await close_storage_backends()
+        self.metrics_sampler.stop()
+        loop_monitor.stop()
+        await asyncio.to_thread(self.metrics_server.stop)
+        await super().close()
+
+    # --- 슬래시 명령어 동기화 ---
+    async def _command_payload(self, command) -> dict:
+        translator = self.tree.translator
+        if translator:
+            try: return await command.get_translated_payload(self.tree, translator)
+            except TypeError: return await command.get_translated_payload(translator)
+        try: return command.to_dict(self.tree)
+        except TypeError: return command.to_dict()
+
+    async def compute_command_tree_fingerprint(self, guild: Optional[discord.abc.Snowflake] = None) -> str:
+        """명령어 트리(이름, 옵션, 현지화, 컨텍스트 메뉴 포함)를 정렬된 JSON으로 만들어 해시합니다."""
+        payload = [await self._command_payload(command) for command in self.tree.get_commands(guild=guild)]
+        payload.sort(key=lambda c: (c.get("type", 1), c.get("name", "")))
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _read_fingerprint_file() -> dict:
+        if not os.path.exists(COMMAND_TREE_FINGERPRINT_PATH): return {}
+        with open(COMMAND_TREE_FINGERPRINT_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_fingerprint_file(fingerprints: dict):
+        os.makedirs(os.path.dirname(COMMAND_TREE_FINGERPRINT_PATH) or ".", exist_ok=True)
+        with open(COMMAND_TREE_FINGERPRINT_PATH, "w", encoding="utf-8") as f:
+            json.dump(fingerprints, f)
+
+    async def sync_command_tree_if_changed(self):
+        """명령어 구성이 마지막 동기화 이후 바뀐 경우에만 tree.sync()를 호출합니다."""
+        guild = discord.Object(id=TEST_GUILD_ID) if TEST_GUILD_ID else None
+        scope = f"{self.user.id}:{f'guild:{TEST_GUILD_ID}' if TEST_GUILD_ID else 'global'}"
+        fingerprint = await self.compute_command_tree_fingerprint(guild)
+
+        try: local = await asyncio.to_thread(self._read_fingerprint_file)
+        except Exception: local = {}
+        stored = {**(get_config(COMMAND_TREE_FINGERPRINT_KEY) or {}), **local}
+        if not FORCE_COMMAND_SYNC and stored.get(scope) == fingerprint:
+            logger.info("✅ 슬래시 명령어 구성이 마지막 동기화와 같아 동기화를 건너뜁니다.")
+            return
+
+        if guild:
+            synced = await self.tree.sync(guild=guild)
+            logger.info(f"✅ 테스트 서버({TEST_GUILD_ID})에 슬래시 명령어 {len(synced)}개를 동기화했습니다.")
+        else:
+            synced = await self.tree.sync()
+            logger.info(f"✅ {len(synced)}개의 슬래시 명령어를 전체 서버에 동기화했습니다.")
+
+        stored[scope] = fingerprint
+        try: await asyncio.to_thread(self._write_fingerprint_file, stored)
+        except Exception as e: logger.warning(f"⚠️ 명령어 지문을 로컬 파일에 저장하지 못했습니다: {e}")
+        await save_config_to_db(COMMAND_TREE_FINGERPRINT_KEY, stored)
+
     @tasks.loop(minutes=5)
     async def refresh_cache_periodically(self):
         logger.info("🔄 주기적인 DB 캐시 새로고침을 시작합니다...")
         await load_all_data_from_db()
+        if STATE_SNAPSHOT_ENABLED:
+            await save_state_snapshot()
         logger.info("🔄 주기적인 DB 캐시 새로고침이 완료되었습니다.")
 
     async def load_all_extensions(self):
@@ -103,6 +261,8 @@ class MyBot(commands.Bot):
                         logger.error(f" M> Cog 로드 실패: {extension_path} | {e}", exc_info=True)
                         failed_count += 1
         logger.info(f"------ [ Cog 로드 완료 | 성공: {loaded_count} / 실패: {failed_count} ] ------")
+        # PERF_INSTRUMENTATION=1 이면 로드된 명령어/작업 루프/View 콜백에 계측을 씌웁니다.
+        instrument_bot(self)
 
 bot = MyBot(command_prefix="/", intents=intents)
 
@@ -113,31 +273,25 @@ async def on_ready():
     logger.info(f"✅ 봇 버전: {BOT_VERSION}")
     logger.info(f"✅ 현재 UTC 시간: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info("==================================================")
+
+    # 재연결로 다시 호출된 경우에는 설정 로드와 명령어 동기화를 반복하지 않습니다.
+    if bot._startup_done:
+        logger.info("🔁 게이트웨이에 다시 연결되었습니다. 시작 작업은 이미 완료되어 건너뜁니다.")
+        return
+    bot._startup_done = True
     
     # 캐시가 완전히 준비된 후에, 각 Cog가 필요한 설정을 불러오도록 합니다.
-    logger.info("------ [ 모든 Cog 설정 로드 시작 ] ------")
-    for cog_name, cog in bot.cogs.items():
-        if hasattr(cog, 'load_configs'):
-            try: 
-                await cog.load_configs()
-            except Exception as e: 
-                logger.error(f"❌ '{cog_name}' Cog 설정 로드 중 오류: {e}", exc_info=True)
-    logger.info("------ [ 모든 Cog 설정 로드 완료 ] ------")
+    # 스냅샷으로 시작해 DB 동기화가 아직 진행 중이면, 동기화가 끝날 때 한 번 더 불러옵니다.
+    await bot.load_cog_configs()
 
     # 주기적 캐시 새로고침 루프를 시작합니다.
     if not bot.refresh_cache_periodically.is_running():
         bot.refresh_cache_periodically.start()
         logger.info("✅ 주기적인 DB 캐시 새로고침 루프를 시작합니다.")
 
-    # 슬래시 명령어를 동기화합니다.
+    # 슬래시 명령어 구성이 바뀐 경우에만 동기화합니다.
     try:
-        if TEST_GUILD_ID:
-            guild = discord.Object(id=TEST_GUILD_ID)
-            await bot.tree.sync(guild=guild)
-            logger.info(f"✅ 테스트 서버({TEST_GUILD_ID})에 슬래시 명령어를 동기화했습니다.")
-        else:
-            synced = await bot.tree.sync()
-            logger.info(f"✅ {len(synced)}개의 슬래시 명령어를 전체 서버에 동기화했습니다.")
+        await bot.sync_command_tree_if_changed()
     except Exception as e: 
         logger.error(f"❌ 명령어 동기화 중 오류가 발생했습니다: {e}", exc_info=True)
 
@@ -1,13 +1,15 @@
 # bot-management/utils/database.py
 
 import os
+import json
+import hashlib
 import asyncio
 import logging
 import time
 from functools import wraps
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone, timedelta, date
 
-from typing import Dict, Callable, Any, List, Optional
+from typing import Dict, Callable, Any, Iterable, List, Optional, Set, Tuple
 import discord
 
 from supabase import create_client, AsyncClient
@@ -16,6 +18,9 @@ from postgrest.exceptions import APIError
 # --- ▼▼▼▼▼ 핵심 수정 시작 ▼▼▼▼▼ ---
 # ui_defaults.py에서 삭제된 AGE_ROLE_MAPPING, AGE_BRACKET_ROLES를 제거하고,
 # 새로 추가된 AGE_ROLE_MAPPING_BY_YEAR를 import 합니다.
+from .storage import StorageBackend, SupabaseBackend, create_local_backend
+from .metrics import metrics
+from .perf import perf
 from .ui_defaults import (
     UI_EMBEDS, UI_PANEL_COMPONENTS, UI_ROLE_KEY_MAP,
     SETUP_COMMAND_MAP, JOB_SYSTEM_CONFIG, GAME_CONFIG,
@@ -33,38 +38,123 @@ KST = timezone(timedelta(hours=9))
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
 # 1. 클라이언트 초기화 및 캐시
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# 저장소 선택: STORAGE_BACKEND=supabase(기본) | sqlite | memory
+# LOCAL_STORE_TABLES에 나열한 테이블(예: "cooldowns,sticky_messages,temp_voice_channels")은
+# LOCAL_STORE(sqlite | memory)로 지정한 로컬 저장소에 따로 저장합니다.
+# sqlite 저장소는 행을 JSON 키-값으로 보관하는 미러이며, Supabase와 같은 테이블 스키마를 만들지 않습니다.
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "supabase").lower()
+LOCAL_STORE = os.environ.get("LOCAL_STORE", "sqlite").lower()
+LOCAL_STORE_PATH = os.environ.get("LOCAL_STORE_PATH", "data/local_store.sqlite3")
+LOCAL_STORE_TABLES = [t.strip() for t in os.environ.get("LOCAL_STORE_TABLES", "").split(",") if t.strip()]
+
 supabase: AsyncClient = None
+if STORAGE_BACKEND == "supabase":
+    try:
+        url: str = os.environ.get("SUPABASE_URL")
+        key: str = os.environ.get("SUPABASE_KEY")
+        if not url or not key:
+            raise ValueError("SUPABASE_URL 또는 SUPABASE_KEY 환경 변수가 설정되지 않았습니다.")
+        supabase = AsyncClient(supabase_url=url, supabase_key=key)
+        logger.info("✅ Supabase 비동기 클라이언트가 성공적으로 생성되었습니다.")
+    except Exception as e:
+        logger.critical(f"❌ Supabase 클라이언트 생성 실패: {e}", exc_info=True)
+        supabase = None
+
+_default_backend: Optional[StorageBackend] = None
+_table_backends: Dict[str, StorageBackend] = {}
 try:
-    url: str = os.environ.get("SUPABASE_URL")
-    key: str = os.environ.get("SUPABASE_KEY")
-    if not url or not key:
-        raise ValueError("SUPABASE_URL 또는 SUPABASE_KEY 환경 변수가 설정되지 않았습니다.")
-    supabase = AsyncClient(supabase_url=url, supabase_key=key)
-    logger.info("✅ Supabase 비동기 클라이언트가 성공적으로 생성되었습니다.")
+    if STORAGE_BACKEND == "supabase":
+        _default_backend = SupabaseBackend(supabase) if supabase else None
+    else:
+        _default_backend = create_local_backend(STORAGE_BACKEND, LOCAL_STORE_PATH)
+    if LOCAL_STORE_TABLES:
+        _local_backend = _default_backend if STORAGE_BACKEND == LOCAL_STORE else create_local_backend(LOCAL_STORE, LOCAL_STORE_PATH)
+        _table_backends = {table: _local_backend for table in LOCAL_STORE_TABLES}
+        logger.info(f"✅ 다음 테이블은 로컬 저장소({_local_backend.name})를 사용합니다: {', '.join(LOCAL_STORE_TABLES)}")
 except Exception as e:
-    logger.critical(f"❌ Supabase 클라이언트 생성 실패: {e}", exc_info=True)
-    supabase = None
+    logger.critical(f"❌ 저장소 초기화 실패: {e}", exc_info=True)
+
+def _db(table: str) -> StorageBackend:
+    """테이블에 해당하는 저장소를 돌려줍니다."""
+    return _table_backends.get(table) or _default_backend
+
+def set_storage_backend(backend: StorageBackend, tables: Optional[List[str]] = None):
+    """저장소를 교체합니다. tables를 지정하면 해당 테이블만 교체합니다. (테스트/벤치마크 용)"""
+    global _default_backend
+    if tables:
+        _table_backends.update({table: backend for table in tables})
+    else:
+        _default_backend = backend
+
+async def close_storage_backends():
+    for backend in {id(b): b for b in [_default_backend, *_table_backends.values()] if b}.values():
+        try: await backend.close()
+        except Exception as e: logger.error(f"❌ 저장소({backend.name}) 종료 중 오류 발생: {e}", exc_info=True)
 
 _bot_configs_cache: Dict[str, Any] = {}
 _channel_id_cache: Dict[str, int] = {}
 _user_abilities_cache: Dict[int, tuple[List[str], float]] = {}
 _sticky_messages_cache: Dict[int, Dict[str, Any]] = {}
+_embeds_cache: Dict[str, dict] = {}
+_embed_cache_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+_temp_channels_cache: Dict[int, Dict[str, Any]] = {}
+_tickets_cache: Dict[int, Dict[str, Any]] = {}
+# { panel_key: [component, ...] } - row, order_in_row 순으로 미리 정렬해 둡니다.
+_panel_components_cache: Dict[str, List[Dict[str, Any]]] = {}
+_panel_components_loaded: bool = False
+# 설정/ID 캐시가 바뀔 때마다 늘어나는 세대 번호입니다. 설정에서 파생된 인덱스를 다시 만들지 판단할 때 씁니다.
+_cache_generation: int = 0
+
+def _bump_cache_generation():
+    global _cache_generation
+    _cache_generation += 1
+
+def get_cache_generation() -> int:
+    return _cache_generation
+
+def get_cache_sizes() -> Dict[str, int]:
+    """지표 수집용 캐시별 항목 수입니다."""
+    return {
+        "bot_configs": len(_bot_configs_cache),
+        "channel_ids": len(_channel_id_cache),
+        "user_abilities": len(_user_abilities_cache),
+        "sticky_messages": len(_sticky_messages_cache),
+        "embeds": len(_embeds_cache),
+        "temp_channels": len(_temp_channels_cache),
+        "tickets": len(_tickets_cache),
+        "panel_components": sum(len(comps) for comps in _panel_components_cache.values()),
+        "cooldowns": len(_cooldowns_cache),
+        "anonymous_posters_today": len(_anonymous_posters_today),
+    }
 
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
 # 2. DB 오류 처리 데코레이터
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
-def supabase_retry_handler(retries: int = 3, delay: int = 2):
+# 실패 시 반환값을 반환 타입 어노테이션으로 정한다는 표시 (기본 동작)
+_DEFAULT_FROM_ANNOTATION = object()
+
+def supabase_retry_handler(retries: int = 3, delay: int = 2, default: Any = _DEFAULT_FROM_ANNOTATION):
+    """
+    모든 재시도에 실패하면 default를 반환합니다.
+    default를 주지 않으면 반환 타입에 따라 빈 dict/list 또는 None을 반환합니다.
+    """
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
-            if not supabase:
-                logger.error(f"❌ Supabase 클라이언트가 초기화되지 않아 '{func.__name__}' 함수를 실행할 수 없습니다.")
+            if not _default_backend:
+                logger.error(f"❌ 저장소(Supabase 클라이언트)가 초기화되지 않아 '{func.__name__}' 함수를 실행할 수 없습니다.")
                 return None
             
             last_exception = None
+            started_at = time.perf_counter()
             for attempt in range(retries):
                 try:
-                    return await func(*args, **kwargs)
+                    result = await func(*args, **kwargs)
+                    elapsed = time.perf_counter() - started_at
+                    metrics.inc("bot_db_calls_total", {"function": func.__name__, "outcome": "ok"})
+                    metrics.observe("bot_db_call_duration_seconds", elapsed, {"function": func.__name__})
+                    perf.add_db_time(elapsed)
+                    return result
                 except APIError as e:
                     logger.warning(f"⚠️ '{func.__name__}' 함수 실행 중 Supabase API 오류 발생 (시도 {attempt + 1}/{retries}): {e.message}")
                     last_exception = e
@@ -73,10 +163,17 @@ def supabase_retry_handler(retries: int = 3, delay: int = 2):
                     last_exception = e
                 
                 if attempt < retries - 1:
+                    metrics.inc("bot_db_retries_total", {"function": func.__name__})
                     await asyncio.sleep(delay * (attempt + 1))
             
+            elapsed = time.perf_counter() - started_at
+            metrics.inc("bot_db_calls_total", {"function": func.__name__, "outcome": "error"})
+            metrics.observe("bot_db_call_duration_seconds", elapsed, {"function": func.__name__})
+            perf.add_db_time(elapsed)
             logger.error(f"❌ '{func.__name__}' 함수가 모든 재시도({retries}번)에 실패했습니다. 마지막 오류: {last_exception}", exc_info=True)
             
+            if default is not _DEFAULT_FROM_ANNOTATION:
+                return default
             return_type = func.__annotations__.get("return")
             if return_type:
                 type_str = str(return_type).lower()
@@ -86,53 +183,361 @@ def supabase_retry_handler(retries: int = 3, delay: int = 2):
         return wrapper
     return decorator
 
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# 2-1. 쓰기 지연(write-behind) 큐
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+WRITE_BEHIND_FLUSH_INTERVAL = 2.0
+# DB에 닿지 못해 다시 넣은 행을 포기하기까지의 최대 반영 시도 횟수
+WRITE_BEHIND_MAX_ATTEMPTS = 30
+
+# 반영 잠금을 쥔 채 재시도 대기(sleep)를 하지 않도록 한 번만 시도합니다. 실패한 행은 다음 주기에 다시 보냅니다.
+@supabase_retry_handler(retries=1)
+async def _bulk_upsert(table: str, rows: List[dict], on_conflict: Optional[str]) -> bool:
+    await _db(table).upsert(table, rows, on_conflict=on_conflict)
+    return True
+
+class WriteBehindQueue:
+    """
+    같은 기본 키에 대한 쓰기를 메모리에서 합쳐 두었다가, 주기적으로 테이블마다 한 번의 upsert로 보냅니다.
+    시작(start)하지 않은 상태에서는 각 함수가 기존처럼 즉시 DB에 씁니다.
+    삭제/수정 함수는 wait_for_keys로 같은 행이 반영 중인지 확인한 뒤에 DB를 건드려야, 반영이 삭제를 되살리지 않습니다.
+    """
+    def __init__(self, interval: float = WRITE_BEHIND_FLUSH_INTERVAL):
+        self.interval = interval
+        self.enabled = False
+        # (테이블, on_conflict) -> {기본 키 튜플: 레코드}
+        self._pending: Dict[Tuple[str, Optional[str]], Dict[tuple, dict]] = {}
+        # 지금 반영(upsert) 중인 행의 (테이블, 기본 키)
+        self._in_flight: Set[Tuple[str, tuple]] = set()
+        # DB에 닿지 못해 다시 넣은 행의 시도 횟수
+        self._attempts: Dict[Tuple[str, tuple], int] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {"queued": 0, "coalesced": 0, "flushed_rows": 0, "flush_requests": 0, "failed_rows": 0, "dropped_rows": 0}
+
+    def start(self):
+        if self._task and not self._task.done(): return
+        self.enabled = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✅ DB 쓰기 지연 큐를 시작합니다. (주기: {self.interval}초)")
+
+    async def stop(self):
+        """주기 작업을 멈추고 남은 쓰기를 모두 반영합니다. (봇 종료 시 호출)"""
+        self.enabled = False
+        if self._task:
+            self._task.cancel()
+            try: await self._task
+            except asyncio.CancelledError: pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"❌ DB 쓰기 지연 큐 반영 중 오류 발생: {e}", exc_info=True)
+
+    def add(self, table: str, record: dict, key_columns: Tuple[str, ...], on_conflict: Optional[str] = None):
+        pk = tuple(record[col] for col in key_columns)
+        bucket = self._pending.setdefault((table, on_conflict), {})
+        if pk in bucket:
+            self.stats["coalesced"] += 1
+            bucket[pk] = {**bucket[pk], **record}
+        else:
+            bucket[pk] = record
+        # 새 값이 들어왔으므로 실패 횟수를 처음부터 다시 셉니다.
+        self._attempts.pop((table, pk), None)
+        self.stats["queued"] += 1
+
+    def peek(self, table: str, pk: tuple) -> Optional[dict]:
+        """아직 DB에 반영되지 않은 레코드를 돌려줍니다. (read-your-writes 용)"""
+        for (pending_table, _), bucket in self._pending.items():
+            if pending_table == table and pk in bucket:
+                return bucket[pk]
+        return None
+
+    def discard(self, table: str, pk: tuple) -> Optional[dict]:
+        """대기 중인 레코드를 버립니다. 반영 중인 행은 먼저 wait_for_keys로 기다려야 합니다."""
+        self._attempts.pop((table, pk), None)
+        for (pending_table, _), bucket in self._pending.items():
+            if pending_table == table and pk in bucket:
+                return bucket.pop(pk)
+        return None
+
+    async def wait_for_keys(self, table: str, pks: Iterable[tuple]):
+        """주어진 행 중 하나라도 지금 반영 중이면, 그 반영이 끝날 때까지 기다립니다."""
+        if any((table, pk) in self._in_flight for pk in pks):
+            async with self._flush_lock:
+                pass
+
+    def pending_count(self) -> int:
+        return sum(len(bucket) for bucket in self._pending.values())
+
+    async def flush(self) -> Dict[str, List[tuple]]:
+        """대기 중인 쓰기를 즉시 반영하고, 실패한 (테이블: 기본 키 목록)을 반환합니다."""
+        failed: Dict[str, List[tuple]] = {}
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            self._in_flight = {(table, pk) for (table, _), bucket in pending.items() for pk in bucket}
+            try:
+                failed_buckets: Dict[Tuple[str, Optional[str]], Dict[tuple, dict]] = {}
+                reached_db = False
+                for (table, on_conflict), bucket in pending.items():
+                    if not bucket: continue
+                    self.stats["flush_requests"] += 1
+                    if await _bulk_upsert(table, list(bucket.values()), on_conflict):
+                        self.stats["flushed_rows"] += len(bucket)
+                        reached_db = True
+                        self._forget_attempts(table, bucket)
+                        continue
+                    # 한 행 때문에 전체가 실패했을 수 있으므로 하나씩 다시 보내 문제 있는 행만 골라냅니다.
+                    remaining: Dict[tuple, dict] = {}
+                    for pk, row in bucket.items():
+                        if await _bulk_upsert(table, [row], on_conflict):
+                            self.stats["flushed_rows"] += 1
+                            reached_db = True
+                            self._attempts.pop((table, pk), None)
+                        else:
+                            remaining[pk] = row
+                    if remaining:
+                        failed_buckets[(table, on_conflict)] = remaining
+                        failed.setdefault(table, []).extend(remaining.keys())
+
+                for (table, on_conflict), bucket in failed_buckets.items():
+                    self.stats["failed_rows"] += len(bucket)
+                    self._requeue_or_drop(table, on_conflict, bucket, db_reachable=reached_db)
+            finally:
+                self._in_flight = set()
+        return failed
+
+    def _forget_attempts(self, table: str, bucket: Dict[tuple, dict]):
+        if not self._attempts: return
+        for pk in bucket:
+            self._attempts.pop((table, pk), None)
+
+    def _requeue_or_drop(self, table: str, on_conflict: Optional[str], bucket: Dict[tuple, dict], db_reachable: bool):
+        """
+        다른 행은 반영됐는데 혼자 실패한 행(제약 조건 위반 등)은 버리고, DB에 닿지 못한 행은 다시 넣습니다.
+        다시 넣은 행도 WRITE_BEHIND_MAX_ATTEMPTS번 실패하면 버려서, 한 행이 테이블 전체를 막지 않게 합니다.
+        """
+        retry_bucket = self._pending.setdefault((table, on_conflict), {})
+        requeued, dropped = 0, []
+        for pk, row in bucket.items():
+            # 그 사이 들어온 최신 값이 있으면 그 값을 새로 시도합니다.
+            if pk in retry_bucket: continue
+            attempts = self._attempts.get((table, pk), 0) + 1
+            if db_reachable or attempts >= WRITE_BEHIND_MAX_ATTEMPTS:
+                self._attempts.pop((table, pk), None)
+                dropped.append(pk)
+                continue
+            self._attempts[(table, pk)] = attempts
+            retry_bucket[pk] = row
+            requeued += 1
+        if not retry_bucket:
+            del self._pending[(table, on_conflict)]
+        if requeued:
+            logger.error(f"❌ '{table}' 테이블에 {requeued}개의 지연 쓰기를 반영하지 못해 다음 주기에 다시 시도합니다.")
+        if dropped:
+            self.stats["dropped_rows"] += len(dropped)
+            logger.error(f"❌ '{table}' 테이블의 지연 쓰기 {len(dropped)}개를 반영할 수 없어 버립니다. (기본 키: {dropped[:10]})")
+
+write_behind = WriteBehindQueue()
+
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
 # 3. 데이터 로드 및 동기화
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
-# ▼▼▼▼▼ [수정] sync_defaults_to_db 함수 전체를 아래 코드로 교체합니다. ▼▼▼▼▼
+def _default_configs() -> Dict[str, Any]:
+    """코드(ui_defaults.py)에 정의되어 매 부팅 시 DB에 덮어쓰는 설정값들입니다."""
+    return {
+        "UI_ROLE_KEY_MAP": UI_ROLE_KEY_MAP,
+        "SETUP_COMMAND_MAP": SETUP_COMMAND_MAP,
+        "STATIC_AUTO_ROLE_PANELS": STATIC_AUTO_ROLE_PANELS,
+        "JOB_SYSTEM_CONFIG": JOB_SYSTEM_CONFIG,
+        "GAME_CONFIG": GAME_CONFIG,
+        "ONBOARDING_CHOICES": ONBOARDING_CHOICES,
+        "BOSS_REWARD_TIERS": BOSS_REWARD_TIERS,
+        "TICKET_APPLICATION_DEPARTMENTS": TICKET_APPLICATION_DEPARTMENTS,
+        "TICKET_DEPARTMENT_MANAGERS": TICKET_DEPARTMENT_MANAGERS,
+        # [수정] AGE_ROLE_MAPPING -> AGE_ROLE_MAPPING_BY_YEAR 로 변경
+        "AGE_ROLE_MAPPING_BY_YEAR": AGE_ROLE_MAPPING_BY_YEAR,
+    }
+
+DEFAULTS_MANIFEST_KEY = "DEFAULTS_MANIFEST"
+
+def _content_hash(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()[:16]
+
+def _build_defaults_manifest() -> Dict[str, Dict[str, str]]:
+    """코드 기본값 항목별 해시 목록입니다. { 테이블: { 키: 해시 } }"""
+    all_role_keys = list(UI_ROLE_KEY_MAP.keys())
+    all_channel_keys = [info['key'] for info in SETUP_COMMAND_MAP.values()]
+    return {
+        "embeds": {key: _content_hash(data) for key, data in UI_EMBEDS.items()},
+        "panel_components": {comp['component_key']: _content_hash(comp) for comp in UI_PANEL_COMPONENTS},
+        "bot_configs": {key: _content_hash(value) for key, value in _default_configs().items()},
+        "channel_configs": {"placeholders": _content_hash(sorted(set(all_role_keys + all_channel_keys)))},
+    }
+
+def _changed_default_keys(stored: Dict[str, Any]) -> Dict[str, List[str]]:
+    """저장된 매니페스트와 비교해 바뀐(또는 새로 생긴) 기본값 키를 테이블별로 돌려줍니다."""
+    return {
+        table: [key for key, digest in hashes.items() if (stored or {}).get(table, {}).get(key) != digest]
+        for table, hashes in _build_defaults_manifest().items()
+    }
+
+def _apply_default_changes_to_cache(changed: Dict[str, List[str]]):
+    default_configs = _default_configs()
+    for key in changed.get("embeds", []):
+        _embeds_cache[key] = UI_EMBEDS[key]
+    for key in changed.get("bot_configs", []):
+        _bot_configs_cache[key] = default_configs[key]
+    if changed.get("bot_configs"): _bump_cache_generation()
+    if changed.get("panel_components"):
+        components_by_key = {comp['component_key']: comp for comp in UI_PANEL_COMPONENTS}
+        for key in changed["panel_components"]:
+            _put_panel_component_in_cache(components_by_key[key])
+
+@supabase_retry_handler()
+async def _fetch_defaults_manifest() -> Dict[str, Any]:
+    rows = await _db('bot_configs').select('bot_configs', columns='config_value', filters=[('config_key', 'eq', DEFAULTS_MANIFEST_KEY)], limit=1)
+    return rows[0]['config_value'] if rows else {}
+
+@supabase_retry_handler()
+async def _insert_channel_placeholders(keys: List[str]) -> bool:
+    placeholder_records = [{"channel_key": key, "channel_id": "0"} for key in keys]
+    await _db('channel_configs').upsert('channel_configs', placeholder_records, on_conflict="channel_key", ignore_duplicates=True)
+    return True
+
 async def sync_defaults_to_db():
+    """ui_defaults.py의 기본값 중 마지막 동기화 이후 바뀐 항목만 테이블별로 한 번에 upsert합니다."""
     logger.info("------ [ 기본값 DB 동기화 시작 ] ------")
     try:
-        await save_config_to_db("UI_ROLE_KEY_MAP", UI_ROLE_KEY_MAP)
-        
-        await asyncio.gather(
-            *[save_embed_to_db(key, data) for key, data in UI_EMBEDS.items()],
-            *[save_panel_component_to_db(comp) for comp in UI_PANEL_COMPONENTS],
-            save_config_to_db("SETUP_COMMAND_MAP", SETUP_COMMAND_MAP),
-            save_config_to_db("STATIC_AUTO_ROLE_PANELS", STATIC_AUTO_ROLE_PANELS),
-            save_config_to_db("JOB_SYSTEM_CONFIG", JOB_SYSTEM_CONFIG),
-            save_config_to_db("GAME_CONFIG", GAME_CONFIG),
-            save_config_to_db("ONBOARDING_CHOICES", ONBOARDING_CHOICES),
-            save_config_to_db("BOSS_REWARD_TIERS", BOSS_REWARD_TIERS),
-            save_config_to_db("TICKET_APPLICATION_DEPARTMENTS", TICKET_APPLICATION_DEPARTMENTS),
-            save_config_to_db("TICKET_DEPARTMENT_MANAGERS", TICKET_DEPARTMENT_MANAGERS),
-            # [수정] AGE_ROLE_MAPPING -> AGE_ROLE_MAPPING_BY_YEAR 로 변경
-            save_config_to_db("AGE_ROLE_MAPPING_BY_YEAR", AGE_ROLE_MAPPING_BY_YEAR) 
-        )
-
-        all_role_keys = list(UI_ROLE_KEY_MAP.keys())
-        all_channel_keys = [info['key'] for info in SETUP_COMMAND_MAP.values()]
-        
-        placeholder_records = [{"channel_key": key, "channel_id": "0"} for key in set(all_role_keys + all_channel_keys)]
-        
-        if placeholder_records:
-            await supabase.table('channel_configs').upsert(placeholder_records, on_conflict="channel_key", ignore_duplicates=True).execute()
+        current = _build_defaults_manifest()
+        stored = await _fetch_defaults_manifest() or {}
+        changed = _changed_default_keys(stored)
+        # 바뀐 기본값은 DB 반영 여부와 관계없이 캐시에 먼저 적용합니다.
+        _apply_default_changes_to_cache(changed)
+        if not any(changed.values()):
+            logger.info("✅ 기본값이 마지막 동기화 이후 바뀌지 않아 DB 쓰기를 건너뜁니다.")
+            return
 
-        logger.info(f"✅ 설정, 임베드({len(UI_EMBEDS)}개), 컴포넌트({len(UI_PANEL_COMPONENTS)}개), 및 기타 UI 기본값 동기화 완료.")
+        components_by_key = {comp['component_key']: comp for comp in UI_PANEL_COMPONENTS}
+        default_configs = _default_configs()
+        jobs = {
+            "embeds": lambda keys: _bulk_upsert('embeds', [{'embed_key': key, 'embed_data': UI_EMBEDS[key]} for key in keys], 'embed_key'),
+            "panel_components": lambda keys: _bulk_upsert('panel_components', [components_by_key[key] for key in keys], 'component_key'),
+            "bot_configs": lambda keys: _bulk_upsert('bot_configs', [{"config_key": key, "config_value": default_configs[key]} for key in keys], 'config_key'),
+            "channel_configs": lambda _: _insert_channel_placeholders(sorted(set(list(UI_ROLE_KEY_MAP.keys()) + [info['key'] for info in SETUP_COMMAND_MAP.values()]))),
+        }
+
+        # 테이블마다 한 번씩 순서대로 보내고, 성공한 테이블의 해시만 매니페스트에 반영합니다.
+        new_manifest = {table: dict(stored.get(table, {})) for table in current}
+        for table, keys in changed.items():
+            if not keys: continue
+            if await jobs[table](keys):
+                new_manifest[table] = current[table]
+                logger.info(f"✅ '{table}' 기본값 {len(keys)}개를 DB에 반영했습니다.")
+            else:
+                logger.error(f"❌ '{table}' 기본값을 DB에 반영하지 못했습니다. 다음 시작 시 다시 시도합니다.")
+
+        if await _bulk_upsert('bot_configs', [{"config_key": DEFAULTS_MANIFEST_KEY, "config_value": new_manifest}], 'config_key'):
+            _bot_configs_cache[DEFAULTS_MANIFEST_KEY] = new_manifest
 
     except Exception as e:
         logger.error(f"❌ 기본값 DB 동기화 중 치명적 오류 발생: {e}", exc_info=True)
-    logger.info("------ [ 기본값 DB 동기화 완료 ] ------")
+    finally:
+        logger.info("------ [ 기본값 DB 동기화 완료 ] ------")
 
 async def load_all_data_from_db():
     logger.info("------ [ 모든 DB 데이터 캐시 로드 시작 ] ------")
     await asyncio.gather(
         load_bot_configs_from_db(), 
         load_channel_ids_from_db(),
-        load_sticky_messages_from_db()
+        load_sticky_messages_from_db(),
+        load_embeds_from_db(),
+        load_temp_channels_from_db(),
+        load_tickets_from_db(),
+        load_cooldowns_from_db(),
+        load_anonymous_posters_from_db(),
+        load_panel_components_from_db()
     )
     logger.info("------ [ 모든 DB 데이터 캐시 로드 완료 ] ------")
 
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# 3-1. 로컬 상태 스냅샷 (빠른 재시작 / DB 장애 대비)
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+STATE_SNAPSHOT_VERSION = 1
+STATE_SNAPSHOT_PATH = os.environ.get("STATE_SNAPSHOT_PATH", "data/state_snapshot.json")
+
+def _write_snapshot_file(path: str, snapshot: Dict[str, Any]):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False, default=str)
+    # 쓰는 도중 종료되어도 이전 스냅샷이 깨지지 않도록 교체 방식으로 저장합니다.
+    os.replace(tmp_path, path)
+
+def _read_snapshot_file(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path): return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+async def save_state_snapshot(path: str = STATE_SNAPSHOT_PATH) -> bool:
+    """현재 캐시 상태를 로컬 파일에 저장합니다."""
+    snapshot = {
+        "version": STATE_SNAPSHOT_VERSION,
+        "saved_at": datetime.now(timezone.utc).isoformat(),
+        "configs": dict(_bot_configs_cache),
+        "channel_ids": dict(_channel_id_cache),
+        "embeds": dict(_embeds_cache),
+        # JSON 객체 키는 문자열만 가능하므로, 정수 키를 쓰는 캐시는 레코드 목록으로 저장합니다.
+        "sticky_messages": list(_sticky_messages_cache.values()),
+        "temp_channels": list(_temp_channels_cache.values()),
+        "tickets": list(_tickets_cache.values()),
+        "panel_components": [comp for comps in _panel_components_cache.values() for comp in comps],
+        "cooldowns": [[subject_id, key, last_used, expires_at] for (subject_id, key), (last_used, expires_at) in _cooldowns_cache.items()],
+    }
+    try:
+        await asyncio.to_thread(_write_snapshot_file, path, snapshot)
+        return True
+    except Exception as e:
+        logger.error(f"❌ 로컬 상태 스냅샷 저장 중 오류 발생: {e}", exc_info=True)
+        return False
+
+async def load_state_snapshot(path: str = STATE_SNAPSHOT_PATH) -> bool:
+    """로컬 스냅샷으로 캐시를 채웁니다. 파일이 없거나 버전이 다르면 False를 반환합니다."""
+    global _bot_configs_cache, _embeds_cache, _sticky_messages_cache, _temp_channels_cache, _tickets_cache
+    try:
+        snapshot = await asyncio.to_thread(_read_snapshot_file, path)
+    except Exception as e:
+        logger.warning(f"⚠️ 로컬 상태 스냅샷을 읽지 못했습니다: {e}")
+        return False
+    if not snapshot: return False
+    if snapshot.get("version") != STATE_SNAPSHOT_VERSION:
+        logger.info(f"로컬 상태 스냅샷 버전({snapshot.get('version')})이 현재 버전({STATE_SNAPSHOT_VERSION})과 달라 무시합니다.")
+        return False
+
+    _bot_configs_cache = dict(snapshot.get("configs", {}))
+    _bump_cache_generation()
+    _replace_channel_id_cache({key: int(value) for key, value in snapshot.get("channel_ids", {}).items()})
+    _embeds_cache = dict(snapshot.get("embeds", {}))
+    if "panel_components" in snapshot:
+        _set_panel_components_cache(snapshot["panel_components"])
+    # 스냅샷 이후 코드 기본값이 바뀌었다면, 백그라운드 동기화가 DB에 쓸 값을 캐시에 미리 반영합니다.
+    _apply_default_changes_to_cache(_changed_default_keys(_bot_configs_cache.get(DEFAULTS_MANIFEST_KEY, {})))
+    _sticky_messages_cache = {item['channel_id']: item for item in snapshot.get("sticky_messages", [])}
+    _temp_channels_cache = {item['channel_id']: item for item in snapshot.get("temp_channels", [])}
+    _tickets_cache = {item['thread_id']: item for item in snapshot.get("tickets", [])}
+    _cooldowns_cache.update({(subject_id, key): (last_used, expires_at) for subject_id, key, last_used, expires_at in snapshot.get("cooldowns", [])})
+    logger.info(
+        f"⚡ 로컬 상태 스냅샷({snapshot.get('saved_at')})으로 캐시를 채웠습니다. "
+        f"(설정 {len(_bot_configs_cache)}, ID {len(_channel_id_cache)}, 임베드 {len(_embeds_cache)}, "
+        f"고정 {len(_sticky_messages_cache)}, 임시채널 {len(_temp_channels_cache)}, 티켓 {len(_tickets_cache)})"
+    )
+    return True
+
 
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
 # 4. 설정 (bot_configs) 관련 함수
@@ -140,28 +545,31 @@ async def load_all_data_from_db():
 @supabase_retry_handler()
 async def load_bot_configs_from_db():
     global _bot_configs_cache
-    response = await supabase.table('bot_configs').select('config_key', 'config_value').execute()
-    if response and response.data:
+    rows = await _db('bot_configs').select('bot_configs', columns='config_key, config_value')
+    if rows:
         # DB에서 가져온 값으로 기존 캐시를 업데이트(병합)합니다.
         # 이렇게 하면 sync_defaults_to_db가 미리 넣어둔 기본값이 보존됩니다.
-        db_configs = {item['config_key']: item['config_value'] for item in response.data}
+        db_configs = {item['config_key']: item['config_value'] for item in rows}
         _bot_configs_cache.update(db_configs)
+        _bump_cache_generation()
         logger.info(f"✅ {len(db_configs)}개의 봇 설정을 DB에서 캐시로 로드/업데이트했습니다.")
 # ▲▲▲ [수정 완료] ▲▲▲
 
 @supabase_retry_handler()
 async def save_config_to_db(key: str, value: Any):
     global _bot_configs_cache
-    await supabase.table('bot_configs').upsert({"config_key": key, "config_value": value}).execute()
+    await _db('bot_configs').upsert('bot_configs', [{"config_key": key, "config_value": value}])
     _bot_configs_cache[key] = value
+    _bump_cache_generation()
     
 @supabase_retry_handler()
 async def delete_config_from_db(key: str):
     """특정 설정 키를 DB와 로컬 캐시에서 삭제합니다."""
     global _bot_configs_cache
     try:
-        await supabase.table('bot_configs').delete().eq('config_key', key).execute()
+        await _db('bot_configs').delete('bot_configs', [('config_key', 'eq', key)])
         _bot_configs_cache.pop(key, None)
+        _bump_cache_generation()
         logger.info(f"설정 키 '{key}'가 DB와 로컬 캐시에서 성공적으로 삭제되었습니다.")
         return True
     except Exception as e:
@@ -176,34 +584,57 @@ def get_config(key: str, default: Any = None) -> Any:
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
 @supabase_retry_handler()
 async def load_channel_ids_from_db():
-    global _channel_id_cache
-    response = await supabase.table('channel_configs').select('channel_key, channel_id').execute()
-    if response and response.data:
-        _channel_id_cache = {item['channel_key']: int(item['channel_id']) for item in response.data if item.get('channel_id') and item['channel_id'] != '0'}
+    rows = await _db('channel_configs').select('channel_configs', columns='channel_key, channel_id')
+    if rows:
+        # 다른 모듈이 캐시 객체를 직접 import해 쓰므로, 새 dict로 바꾸지 않고 내용만 교체합니다.
+        _replace_channel_id_cache({item['channel_key']: int(item['channel_id']) for item in rows if item.get('channel_id') and item['channel_id'] != '0'})
         logger.info(f"✅ {len(_channel_id_cache)}개의 유효한 채널/역할 ID를 DB에서 캐시로 로드했습니다.")
 
+def _replace_channel_id_cache(ids: Dict[str, int]):
+    _channel_id_cache.clear()
+    _channel_id_cache.update(ids)
+    _bump_cache_generation()
+
 @supabase_retry_handler()
-async def save_id_to_db(key: str, object_id: int) -> bool:
-    global _channel_id_cache
-    try:
-        response = await supabase.table('channel_configs').upsert({"channel_key": key, "channel_id": str(object_id)}, on_conflict="channel_key").execute()
-        if response.data:
-            _channel_id_cache[key] = object_id
-            logger.info(f"✅ '{key}' ID({object_id})를 DB와 캐시에 저장했습니다.")
-            return True
-        else:
-            logger.error(f"❌ '{key}' ID({object_id})를 DB에 저장하려 했으나, DB가 성공 응답을 반환하지 않았습니다.")
-            return False
-    except Exception as e:
-        logger.error(f"❌ '{key}' ID 저장 중 예외 발생: {e}", exc_info=True)
-        return False
+async def _upsert_channel_ids(rows: List[dict]) -> List[dict]:
+    return await _db('channel_configs').upsert('channel_configs', rows, on_conflict="channel_key")
+
+async def save_ids_to_db(ids: Dict[str, int], deferred: bool = False) -> List[str]:
+    """
+    여러 채널/역할 ID를 한 번의 upsert로 저장하고, 저장하지 못한 키 목록을 반환합니다. (빈 목록이면 전부 성공)
+    캐시는 DB가 저장을 확인한 키만 한 번에 갱신합니다.
+    """
+    if not ids: return []
+    rows = [{"channel_key": key, "channel_id": str(object_id)} for key, object_id in ids.items()]
+    if deferred and write_behind.enabled:
+        for row in rows:
+            write_behind.add('channel_configs', row, ("channel_key",), on_conflict="channel_key")
+        _channel_id_cache.update(ids)
+        _bump_cache_generation()
+        return []
+
+    saved_keys = {row.get('channel_key') for row in (await _upsert_channel_ids(rows) or [])}
+    _channel_id_cache.update({key: object_id for key, object_id in ids.items() if key in saved_keys})
+    _bump_cache_generation()
+    failed_keys = [key for key in ids if key not in saved_keys]
+    if failed_keys:
+        logger.error(f"❌ ID {len(ids)}개 중 {len(failed_keys)}개를 DB에 저장하지 못했습니다: {', '.join(failed_keys)}")
+    elif len(ids) == 1:
+        key, object_id = next(iter(ids.items()))
+        logger.info(f"✅ '{key}' ID({object_id})를 DB와 캐시에 저장했습니다.")
+    else:
+        logger.info(f"✅ ID {len(ids)}개를 한 번에 DB와 캐시에 저장했습니다.")
+    return failed_keys
+
+async def save_id_to_db(key: str, object_id: int, deferred: bool = False) -> bool:
+    return not await save_ids_to_db({key: object_id}, deferred=deferred)
 
 def get_id(key: str) -> Optional[int]:
     return _channel_id_cache.get(key)
 
-async def save_panel_id(panel_name: str, message_id: int, channel_id: int):
-    await save_id_to_db(f"panel_{panel_name}_message_id", message_id)
-    await save_id_to_db(f"panel_{panel_name}_channel_id", channel_id)
+async def save_panel_id(panel_name: str, message_id: int, channel_id: int, deferred: bool = False) -> bool:
+    failed_keys = await save_ids_to_db({f"panel_{panel_name}_message_id": message_id, f"panel_{panel_name}_channel_id": channel_id}, deferred=deferred)
+    return not failed_keys
 
 def get_panel_id(panel_name: str) -> Optional[Dict[str, int]]:
     message_id = get_id(f"panel_{panel_name}_message_id")
@@ -213,163 +644,439 @@ def get_panel_id(panel_name: str) -> Optional[Dict[str, int]]:
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
 # 6. 임베드 및 UI 컴포넌트 관련 함수
 # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+@supabase_retry_handler()
+async def load_embeds_from_db():
+    """DB의 모든 임베드 템플릿을 불러와 캐시에 저장합니다."""
+    global _embeds_cache
+    rows = await _db('embeds').select('embeds', columns='embed_key, embed_data')
+    if rows:
+        _embeds_cache = {item['embed_key']: item['embed_data'] for item in rows if item.get('embed_data')}
+        logger.info(f"✅ {len(_embeds_cache)}개의 임베드 템플릿을 DB에서 캐시로 로드했습니다.")
+
 @supabase_retry_handler()
 async def save_embed_to_db(embed_key: str, embed_data: dict):
-    await supabase.table('embeds').upsert({'embed_key': embed_key, 'embed_data': embed_data}, on_conflict='embed_key').execute()
+    await _db('embeds').upsert('embeds', [{'embed_key': embed_key, 'embed_data': embed_data}], on_conflict='embed_key')
+    _embeds_cache[embed_key] = embed_data
+
+def get_embed(embed_key: str) -> Optional[dict]:
+    """캐시에서 임베드 템플릿을 찾습니다. (반환된 dict는 캐시 원본이므로 직접 수정하지 마세요)"""
+    embed_data = _embeds_cache.get(embed_key)
+    if embed_data is None:
+        _embed_cache_stats["misses"] += 1
+    else:
+        _embed_cache_stats["hits"] += 1
+    return embed_data
+
+def get_embed_cache_stats() -> Dict[str, int]:
+    return {**_embed_cache_stats, "size": len(_embeds_cache)}
+
 @supabase_retry_handler()
+async def _fetch_embed_from_db(embed_key: str) -> Optional[dict]:
+    rows = await _db('embeds').select('embeds', columns='embed_data', filters=[('embed_key', 'eq', embed_key)], limit=1)
+    return rows[0]['embed_data'] if rows else None
+
 async def get_embed_from_db(embed_key: str) -> Optional[dict]:
-    response = await supabase.table('embeds').select('embed_data').eq('embed_key', embed_key).limit(1).execute()
-    return response.data[0]['embed_data'] if response and response.data else None
+    """캐시를 먼저 확인하고, 없을 때만 DB에서 임베드를 가져와 캐시에 채웁니다."""
+    embed_data = get_embed(embed_key)
+    if embed_data is None:
+        embed_data = await _fetch_embed_from_db(embed_key)
+        if embed_data:
+            _embeds_cache[embed_key] = embed_data
+    return embed_data
+
 @supabase_retry_handler()
 async def get_all_embeds() -> List[Dict[str, Any]]:
-    response = await supabase.table('embeds').select('embed_key, embed_data').order('embed_key').execute()
-    return response.data if response and response.data else []
+    rows = await _db('embeds').select('embeds', columns='embed_key, embed_data', order=[('embed_key', False)])
+    # 관리자 화면에서 전체 목록을 읽은 김에 캐시도 최신으로 맞춰 둡니다.
+    _embeds_cache.update({item['embed_key']: item['embed_data'] for item in rows if item.get('embed_data')})
+    return rows
 @supabase_retry_handler()
 async def get_onboarding_steps() -> List[dict]:
-    response = await supabase.table('onboarding_steps').select('*, embed_data:embeds(embed_data)').order('step_number', desc=False).execute()
-    return response.data if response and response.data else []
+    rows = await _db('onboarding_steps').select('onboarding_steps', columns='*, embed_data:embeds(embed_data)', order=[('step_number', False)])
+    # 관계 조회를 지원하지 않는 로컬 저장소에서는 임베드 캐시로 같은 모양을 만들어 줍니다.
+    for row in rows:
+        if not isinstance(row.get('embed_data'), dict) and row.get('embed_key'):
+            row['embed_data'] = {'embed_data': get_embed(row['embed_key'])}
+    return rows
+def _component_sort_key(comp: Dict[str, Any]) -> tuple:
+    return (comp.get('row') or 0, comp.get('order_in_row') or 0)
+
+def _set_panel_components_cache(rows: List[Dict[str, Any]]):
+    global _panel_components_cache, _panel_components_loaded
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for comp in rows:
+        grouped.setdefault(comp.get('panel_key'), []).append(comp)
+    for comps in grouped.values():
+        comps.sort(key=_component_sort_key)
+    _panel_components_cache = grouped
+    _panel_components_loaded = True
+
+def _put_panel_component_in_cache(component_data: Dict[str, Any]):
+    """컴포넌트 하나를 캐시에 반영합니다. 패널이 바뀌었다면 이전 패널 목록에서는 빼냅니다."""
+    key = component_data.get('component_key')
+    for panel_key, comps in _panel_components_cache.items():
+        if panel_key != component_data.get('panel_key') and any(c.get('component_key') == key for c in comps):
+            _panel_components_cache[panel_key] = [c for c in comps if c.get('component_key') != key]
+    comps = [c for c in _panel_components_cache.get(component_data.get('panel_key'), []) if c.get('component_key') != key]
+    comps.append(component_data)
+    comps.sort(key=_component_sort_key)
+    _panel_components_cache[component_data.get('panel_key')] = comps
+
 @supabase_retry_handler()
-async def save_panel_component_to_db(component_data: dict):
-    await supabase.table('panel_components').upsert(component_data, on_conflict='component_key').execute()
+async def load_panel_components_from_db():
+    rows = await _db('panel_components').select('panel_components')
+    _set_panel_components_cache(rows or [])
+    logger.info(f"✅ {len(_panel_components_cache)}개 패널의 컴포넌트 {len(rows or [])}개를 DB에서 캐시로 로드했습니다.")
+
 @supabase_retry_handler()
+async def save_panel_component_to_db(component_data: dict):
+    await _db('panel_components').upsert('panel_components', [component_data], on_conflict='component_key')
+    _put_panel_component_in_cache(component_data)
+
 async def get_panel_components_from_db(panel_key: str) -> list:
-    response = await supabase.table('panel_components').select('*').eq('panel_key', panel_key).order('row', desc=False).order('order_in_row', desc=False).execute()
-    return response.data if response and response.data else []
+    """캐시가 채워져 있으면 DB 조회 없이 정렬된 컴포넌트 목록을 돌려줍니다."""
+    if _panel_components_loaded:
+        return list(_panel_components_cache.get(panel_key, []))
+    return await _fetch_panel_components_from_db(panel_key)
+
+@supabase_retry_handler()
+async def _fetch_panel_components_from_db(panel_key: str) -> list:
+    return await _db('panel_components').select('panel_components', filters=[('panel_key', 'eq', panel_key)], order=[('row', False), ('order_in_row', False)])
+
+def get_panel_components_version(panel_key: str) -> Optional[str]:
+    """패널 컴포넌트 구성의 해시입니다. 값이 같으면 이미 만든 View를 다시 쓸 수 있습니다. (캐시 전이면 None)"""
+    if not _panel_components_loaded: return None
+    return _content_hash(_panel_components_cache.get(panel_key, []))
+def _parse_cooldown_timestamp(timestamp_str: Optional[str]) -> float:
+    if timestamp_str is None: return 0.0
+    try:
+        if timestamp_str.endswith('Z'): timestamp_str = timestamp_str[:-1] + '+00:00'
+        return datetime.fromisoformat(timestamp_str).timestamp()
+    except (ValueError, TypeError): return 0.0
+
+# --- 쿨다운 캐시 ---
+# 쿨다운 길이는 호출하는 쪽이 정하므로, DB에서 읽어온 항목은 이 기간이 지나면 메모리에서 정리합니다.
+COOLDOWN_CACHE_RETENTION_SECONDS = 7 * 24 * 3600
+COOLDOWN_PRUNE_INTERVAL_SECONDS = 60
+
+# { (subject_id, cooldown_key): (마지막 사용 시각 UTC timestamp, 만료 시각) }
+_cooldowns_cache: Dict[Tuple[str, str], Tuple[float, float]] = {}
+_cooldowns_loaded = False
+_cooldowns_last_pruned = 0.0
+_cooldown_persist_tasks: set = set()
+
+@supabase_retry_handler()
+async def load_cooldowns_from_db():
+    """DB의 최근 쿨다운 기록을 메모리로 불러옵니다. (메모리에 더 최신 값이 있으면 유지)"""
+    global _cooldowns_loaded
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=COOLDOWN_CACHE_RETENTION_SECONDS)
+    rows = await _db('cooldowns').select('cooldowns', filters=[('last_cooldown_timestamp', 'gte', cutoff.isoformat())])
+    for row in rows:
+        cache_key = (str(row['subject_id']), row['cooldown_key'])
+        last_used = _parse_cooldown_timestamp(row.get('last_cooldown_timestamp'))
+        if cache_key not in _cooldowns_cache or _cooldowns_cache[cache_key][0] < last_used:
+            _cooldowns_cache[cache_key] = (last_used, last_used + COOLDOWN_CACHE_RETENTION_SECONDS)
+    _cooldowns_loaded = True
+    logger.info(f"✅ {len(rows)}개의 쿨다운 기록을 DB에서 캐시로 로드했습니다.")
+
+def _prune_cooldowns(now: float):
+    global _cooldowns_last_pruned
+    if now - _cooldowns_last_pruned < COOLDOWN_PRUNE_INTERVAL_SECONDS: return
+    _cooldowns_last_pruned = now
+    for cache_key in [k for k, (_, expires_at) in _cooldowns_cache.items() if expires_at <= now]:
+        del _cooldowns_cache[cache_key]
+
+def get_cooldown_remaining(subject_id: Any, cooldown_key: str, duration: float) -> float:
+    """남은 쿨다운(초)을 메모리에서 바로 계산합니다. 쿨다운이 없으면 0을 반환합니다."""
+    entry = _cooldowns_cache.get((str(subject_id), cooldown_key))
+    if not entry: return 0.0
+    return max(0.0, entry[0] + duration - datetime.now(timezone.utc).timestamp())
+
+def start_cooldown(subject_id: Any, cooldown_key: str, duration: Optional[float] = None, persist: bool = True):
+    """쿨다운을 메모리에 즉시 기록하고, persist=True면 DB에는 비동기로 반영합니다."""
+    now = datetime.now(timezone.utc).timestamp()
+    _prune_cooldowns(now)
+    subject_id = str(subject_id)
+    _cooldowns_cache[(subject_id, cooldown_key)] = (now, now + max(duration or 0, COOLDOWN_CACHE_RETENTION_SECONDS if persist else 0))
+    if not persist: return
+    record = {"subject_id": subject_id, "cooldown_key": cooldown_key, "last_cooldown_timestamp": datetime.fromtimestamp(now, timezone.utc).isoformat()}
+    if write_behind.enabled:
+        write_behind.add('cooldowns', record, ("subject_id", "cooldown_key"), on_conflict='subject_id, cooldown_key')
+        return
+    task = asyncio.create_task(_persist_cooldown(record))
+    _cooldown_persist_tasks.add(task)
+    task.add_done_callback(_cooldown_persist_tasks.discard)
+
 @supabase_retry_handler()
+async def _persist_cooldown(record: dict):
+    await _db('cooldowns').upsert('cooldowns', [record], on_conflict='subject_id, cooldown_key') # user_id -> subject_id
+
 async def get_cooldown(user_id: int, cooldown_key: str) -> float: # 함수 인자 이름을 user_id_str -> user_id로 변경
     user_id_str = str(user_id) # 숫자로 받은 ID를 문자열로 변환
-    response = await supabase.table('cooldowns').select('last_cooldown_timestamp').eq('subject_id', user_id_str).eq('cooldown_key', cooldown_key).limit(1).execute() # user_id -> subject_id
-    if response and response.data and (timestamp_str := response.data[0].get('last_cooldown_timestamp')) is not None:
-        try:
-            if timestamp_str.endswith('Z'): timestamp_str = timestamp_str[:-1] + '+00:00'
-            return datetime.fromisoformat(timestamp_str).timestamp()
-        except (ValueError, TypeError): return 0.0
-    return 0.0
+    if (entry := _cooldowns_cache.get((user_id_str, cooldown_key))):
+        return entry[0]
+    # 캐시를 한 번이라도 불러왔다면, 캐시에 없는 항목은 쿨다운이 없는 것입니다.
+    if _cooldowns_loaded:
+        return 0.0
+    return await _fetch_cooldown_from_db(user_id_str, cooldown_key) or 0.0
 
 @supabase_retry_handler()
+async def _fetch_cooldown_from_db(user_id_str: str, cooldown_key: str) -> float:
+    """쿨다운 캐시를 불러오지 못한 경우에만 사용하는 DB 조회입니다."""
+    rows = await _db('cooldowns').select('cooldowns', columns='last_cooldown_timestamp', filters=[('subject_id', 'eq', user_id_str), ('cooldown_key', 'eq', cooldown_key)], limit=1) # user_id -> subject_id
+    if rows:
+        return _parse_cooldown_timestamp(rows[0].get('last_cooldown_timestamp'))
+    return 0.0
+
 async def set_cooldown(user_id: int, cooldown_key: str): # 함수 인자 이름을 user_id_str -> user_id로 변경
-    user_id_str = str(user_id) # 숫자로 받은 ID를 문자열로 변환
-    await supabase.table('cooldowns').upsert({ "subject_id": user_id_str, "cooldown_key": cooldown_key, "last_cooldown_timestamp": datetime.now(timezone.utc).isoformat() }, on_conflict='subject_id, cooldown_key').execute() # user_id -> subject_id
-@supabase_retry_handler()
-async def get_all_stats_channels() -> List[Dict[str, Any]]:
-    response = await supabase.table('stats_channels').select('*').execute()
-    return response.data if response and response.data else []
+    start_cooldown(user_id, cooldown_key)
+
+@supabase_retry_handler(default=None)
+async def get_all_stats_channels() -> Optional[List[Dict[str, Any]]]:
+    """모든 통계 채널 설정을 가져옵니다. DB 조회에 실패하면 (빈 목록과 구분되도록) None을 반환합니다."""
+    return await _db('stats_channels').select('stats_channels')
 @supabase_retry_handler()
 async def add_stats_channel(channel_id: int, guild_id: int, stat_type: str, template: str, role_id: Optional[int] = None):
-    await supabase.table('stats_channels').upsert({"channel_id": channel_id, "guild_id": guild_id, "stat_type": stat_type, "channel_name_template": template, "role_id": role_id}, on_conflict="channel_id").execute()
+    await _db('stats_channels').upsert('stats_channels', [{"channel_id": channel_id, "guild_id": guild_id, "stat_type": stat_type, "channel_name_template": template, "role_id": role_id}], on_conflict="channel_id")
 @supabase_retry_handler()
 async def remove_stats_channel(channel_id: int):
-    await supabase.table('stats_channels').delete().eq('channel_id', channel_id).execute()
+    await _db('stats_channels').delete('stats_channels', [('channel_id', 'eq', channel_id)])
 @supabase_retry_handler()
 async def get_all_temp_channels() -> List[Dict[str, Any]]:
-    response = await supabase.table('temp_voice_channels').select('*').execute()
-    return response.data if response and response.data else []
+    return await _db('temp_voice_channels').select('temp_voice_channels')
+@supabase_retry_handler()
+async def load_temp_channels_from_db():
+    global _temp_channels_cache
+    rows = await _db('temp_voice_channels').select('temp_voice_channels')
+    _temp_channels_cache = {item['channel_id']: item for item in rows}
+    logger.info(f"✅ {len(_temp_channels_cache)}개의 임시 음성 채널 정보를 DB에서 캐시로 로드했습니다.")
+def get_cached_temp_channels() -> List[Dict[str, Any]]:
+    return list(_temp_channels_cache.values())
 @supabase_retry_handler()
 async def add_temp_channel(channel_id: int, owner_id: int, guild_id: int, message_id: Optional[int], channel_type: str):
     # ▼▼▼ [수정] message_id가 None일 경우 0을 대신 삽입합니다. ▼▼▼
-    await supabase.table('temp_voice_channels').insert({
+    record = {
         "channel_id": channel_id, 
         "owner_id": owner_id, 
         "guild_id": guild_id, 
         "message_id": message_id or 0, 
         "channel_type": channel_type
-    }).execute()
+    }
+    _temp_channels_cache[channel_id] = record
+    if write_behind.enabled:
+        write_behind.add('temp_voice_channels', record, ("channel_id",), on_conflict="channel_id")
+        return
+    await _db('temp_voice_channels').insert('temp_voice_channels', [record])
 @supabase_retry_handler()
 async def update_temp_channel_owner(channel_id: int, new_owner_id: int):
-    await supabase.table('temp_voice_channels').update({"owner_id": new_owner_id}).eq('channel_id', channel_id).execute()
+    if channel_id in _temp_channels_cache:
+        _temp_channels_cache[channel_id]["owner_id"] = new_owner_id
+    await write_behind.wait_for_keys('temp_voice_channels', [(channel_id,)])
+    if (pending := write_behind.peek('temp_voice_channels', (channel_id,))):
+        pending["owner_id"] = new_owner_id
+        return
+    await _db('temp_voice_channels').update('temp_voice_channels', {"owner_id": new_owner_id}, [('channel_id', 'eq', channel_id)])
 @supabase_retry_handler()
 async def remove_temp_channel(channel_id: int):
-    await supabase.table('temp_voice_channels').delete().eq('channel_id', channel_id).execute()
+    _temp_channels_cache.pop(channel_id, None)
+    await write_behind.wait_for_keys('temp_voice_channels', [(channel_id,)])
+    write_behind.discard('temp_voice_channels', (channel_id,))
+    await _db('temp_voice_channels').delete('temp_voice_channels', [('channel_id', 'eq', channel_id)])
 @supabase_retry_handler()
 async def remove_multiple_temp_channels(channel_ids: List[int]):
     if not channel_ids: return
-    await supabase.table('temp_voice_channels').delete().in_('channel_id', channel_ids).execute()
+    for channel_id in channel_ids:
+        _temp_channels_cache.pop(channel_id, None)
+    await write_behind.wait_for_keys('temp_voice_channels', [(channel_id,) for channel_id in channel_ids])
+    for channel_id in channel_ids:
+        write_behind.discard('temp_voice_channels', (channel_id,))
+    await _db('temp_voice_channels').delete('temp_voice_channels', [('channel_id', 'in', channel_ids)])
 @supabase_retry_handler()
 async def get_all_tickets() -> List[Dict[str, Any]]:
-    response = await supabase.table('tickets').select('*').execute()
-    return response.data if response and response.data else []
+    return await _db('tickets').select('tickets')
+@supabase_retry_handler()
+async def load_tickets_from_db():
+    global _tickets_cache
+    rows = await _db('tickets').select('tickets')
+    _tickets_cache = {item['thread_id']: item for item in rows}
+    logger.info(f"✅ {len(_tickets_cache)}개의 티켓 정보를 DB에서 캐시로 로드했습니다.")
+def get_cached_tickets() -> List[Dict[str, Any]]:
+    return list(_tickets_cache.values())
 @supabase_retry_handler()
 async def add_ticket(thread_id: int, owner_id: int, guild_id: int, ticket_type: str):
-    await supabase.table('tickets').insert({"thread_id": thread_id, "owner_id": owner_id, "guild_id": guild_id, "ticket_type": ticket_type}).execute()
+    record = {"thread_id": thread_id, "owner_id": owner_id, "guild_id": guild_id, "ticket_type": ticket_type}
+    _tickets_cache[thread_id] = {**record, "is_locked": False}
+    await _db('tickets').insert('tickets', [record])
 @supabase_retry_handler()
 async def remove_ticket(thread_id: int):
-    await supabase.table('tickets').delete().eq('thread_id', thread_id).execute()
+    _tickets_cache.pop(thread_id, None)
+    await _db('tickets').delete('tickets', [('thread_id', 'eq', thread_id)])
 @supabase_retry_handler()
 async def update_ticket_lock_status(thread_id: int, is_locked: bool):
-    await supabase.table('tickets').update({"is_locked": is_locked}).eq('thread_id', thread_id).execute()
+    if thread_id in _tickets_cache:
+        _tickets_cache[thread_id]["is_locked"] = is_locked
+    await _db('tickets').update('tickets', {"is_locked": is_locked}, [('thread_id', 'eq', thread_id)])
 @supabase_retry_handler()
 async def remove_multiple_tickets(thread_ids: List[int]):
     if not thread_ids: return
-    await supabase.table('tickets').delete().in_('thread_id', thread_ids).execute()
+    for thread_id in thread_ids:
+        _tickets_cache.pop(thread_id, None)
+    await _db('tickets').delete('tickets', [('thread_id', 'in', thread_ids)])
 @supabase_retry_handler()
 async def add_warning(guild_id: int, user_id: int, moderator_id: int, reason: str, amount: int) -> Optional[dict]:
-    response = await supabase.table('warnings').insert({
+    rows = await _db('warnings').insert('warnings', [{
         "guild_id": guild_id, 
         "user_id": user_id, 
         "moderator_id": moderator_id, 
         "reason": reason, 
         "amount": amount
-    }).execute()
-    return response.data[0] if response and response.data else None
+    }])
+    return rows[0] if rows else None
 @supabase_retry_handler()
 async def get_total_warning_count(user_id: int, guild_id: int) -> int:
-    response = await supabase.table('warnings').select('amount').eq('user_id', user_id).eq('guild_id', guild_id).execute()
-    return sum(item['amount'] for item in response.data) if response and response.data else 0
+    rows = await _db('warnings').select('warnings', columns='amount', filters=[('user_id', 'eq', user_id), ('guild_id', 'eq', guild_id)])
+    return sum(item['amount'] for item in rows)
+async def add_warning_and_get_total(guild_id: int, user_id: int, moderator_id: int, reason: str, amount: int) -> Optional[int]:
+    """
+    벌점을 기록하고 새 누적 벌점을 반환합니다. (차감 시 amount는 음수, 실패 시 None)
+    기록은 멱등이 아니므로 재시도하지 않습니다. 응답만 실패한 경우 재시도하면 같은 벌점이 두 번 쌓입니다.
+    """
+    backend = _db('warnings')
+    try:
+        if backend.supports_rpc:
+            return await backend.rpc('add_warning_and_get_total', {
+                'p_guild_id': guild_id,
+                'p_user_id': user_id,
+                'p_moderator_id': moderator_id,
+                'p_reason': reason,
+                'p_amount': amount
+            })
+        # RPC가 없는 로컬 저장소에서는 같은 동작을 두 단계로 수행합니다.
+        await backend.insert('warnings', [{"guild_id": guild_id, "user_id": user_id, "moderator_id": moderator_id, "reason": reason, "amount": amount}])
+    except Exception as e:
+        logger.error(f"❌ 벌점 기록 중 오류 (유저: {user_id}): {e}", exc_info=True)
+        return None
+    # 기록은 끝났으므로, 다시 읽는 조회만 재시도합니다.
+    return await get_total_warning_count(user_id, guild_id)
+# --- 익명 게시판 하루 작성 기록 (KST 날짜 기준) ---
+_anonymous_posters_day: Optional[date] = None
+_anonymous_posters_today: set = set()
+_anonymous_posters_loaded = False
+
+def _rotate_anonymous_posters():
+    """KST 날짜가 바뀌었으면 작성자 목록을 비웁니다. (새 날짜는 빈 상태로 시작하므로 DB를 다시 볼 필요가 없음)"""
+    global _anonymous_posters_day, _anonymous_posters_loaded
+    today = datetime.now(KST).date()
+    if _anonymous_posters_day != today:
+        if _anonymous_posters_day is not None:
+            _anonymous_posters_loaded = True
+        _anonymous_posters_day = today
+        _anonymous_posters_today.clear()
+
 @supabase_retry_handler()
-async def add_anonymous_message(guild_id: int, user_id: int, content: str):
-    await supabase.table('anonymous_messages').insert({"guild_id": guild_id, "user_id": user_id, "message_content": content}).execute()
+async def load_anonymous_posters_from_db():
+    """오늘(KST) 익명 글을 작성한 유저 ID를 불러옵니다."""
+    global _anonymous_posters_loaded
+    _rotate_anonymous_posters()
+    today_utc_start = datetime.combine(_anonymous_posters_day, datetime.min.time(), KST).astimezone(timezone.utc)
+    rows = await _db('anonymous_messages').select('anonymous_messages', columns='user_id', filters=[('created_at', 'gte', today_utc_start.isoformat())])
+    _anonymous_posters_today.update(int(row['user_id']) for row in rows)
+    _anonymous_posters_loaded = True
 @supabase_retry_handler()
+async def add_anonymous_message(guild_id: int, user_id: int, content: str):
+    _rotate_anonymous_posters()
+    _anonymous_posters_today.add(user_id)
+    await _db('anonymous_messages').insert('anonymous_messages', [{"guild_id": guild_id, "user_id": user_id, "message_content": content}])
 async def has_posted_anonymously_today(user_id: int) -> bool:
-    today_kst_start = datetime.now(KST).replace(hour=0, minute=0, second=0, microsecond=0)
-    today_utc_start = today_kst_start.astimezone(timezone.utc)
-    response = await supabase.table('anonymous_messages').select('id', count='exact').eq('user_id', user_id).gte('created_at', today_utc_start.isoformat()).limit(1).execute()
-    return response.count > 0 if response else False
+    _rotate_anonymous_posters()
+    if _anonymous_posters_loaded or user_id in _anonymous_posters_today:
+        return user_id in _anonymous_posters_today
+    # 시작 시 목록을 불러오지 못한 경우에만 DB에서 직접 셉니다.
+    return bool(await _count_anonymous_posts_today_from_db(user_id))
+
+@supabase_retry_handler()
+async def _count_anonymous_posts_today_from_db(user_id: int) -> int:
+    today_utc_start = datetime.combine(_anonymous_posters_day, datetime.min.time(), KST).astimezone(timezone.utc)
+    return await _db('anonymous_messages').count('anonymous_messages', [('user_id', 'eq', user_id), ('created_at', 'gte', today_utc_start.isoformat())])
 # ▼▼▼▼▼ [수정] schedule_reminder 함수 전체를 아래 코드로 교체 ▼▼▼▼▼
 @supabase_retry_handler()
-async def schedule_reminder(guild_id: int, reminder_type: str, remind_at: datetime, confirmation_message_id: Optional[int] = None):
+async def schedule_reminder(guild_id: int, reminder_type: str, remind_at: datetime, confirmation_message_id: Optional[int] = None) -> Optional[dict]:
     # 기존 활성 알림 비활성화
-    await supabase.table('reminders').update({"is_active": False}).eq('guild_id', guild_id).eq('reminder_type', reminder_type).eq('is_active', True).execute()
+    await _db('reminders').update('reminders', {"is_active": False}, [('guild_id', 'eq', guild_id), ('reminder_type', 'eq', reminder_type), ('is_active', 'eq', True)])
     
-    # 새 알림 예약 (확인 메시지 ID 포함)
-    await supabase.table('reminders').insert({
+    # 새 알림 예약 (확인 메시지 ID 포함) - 스케줄러에 등록할 수 있도록 저장된 레코드를 반환합니다.
+    rows = await _db('reminders').insert('reminders', [{
         "guild_id": guild_id, 
         "reminder_type": reminder_type, 
         "remind_at": remind_at.isoformat(), 
         "is_active": True,
         "confirmation_message_id": confirmation_message_id
-    }).execute()
+    }])
+    return rows[0] if rows else None
 # ▲▲▲▲▲ [수정] schedule_reminder 함수 교체 완료 ▲▲▲▲▲
 @supabase_retry_handler()
 async def get_due_reminders() -> List[Dict[str, Any]]:
     now = datetime.now(timezone.utc).isoformat()
-    response = await supabase.table('reminders').select('*').eq('is_active', True).lte('remind_at', now).execute()
-    return response.data if response and response.data else []
+    return await _db('reminders').select('reminders', filters=[('is_active', 'eq', True), ('remind_at', 'lte', now)])
+@supabase_retry_handler(default=None)
+async def get_active_reminders() -> Optional[List[Dict[str, Any]]]:
+    """아직 발송되지 않은 모든 활성 알림을 가져옵니다. (스케줄러 초기화/재동기화 용, 조회 실패 시 None)"""
+    return await _db('reminders').select('reminders', filters=[('is_active', 'eq', True)], order=[('remind_at', False)])
+@supabase_retry_handler()
+async def get_last_reminder_message_id(guild_id: int, reminder_type: str) -> Optional[int]:
+    """가장 최근에 발송된 알림 메시지의 ID를 가져옵니다."""
+    rows = await _db('reminders').select(
+        'reminders', columns='reminder_message_id',
+        filters=[('guild_id', 'eq', guild_id), ('reminder_type', 'eq', reminder_type), ('reminder_message_id', 'not_null', None)],
+        order=[('created_at', True)], limit=1
+    )
+    return rows[0].get('reminder_message_id') if rows else None
 @supabase_retry_handler()
 async def deactivate_reminder(reminder_id: int):
-    await supabase.table('reminders').update({"is_active": False}).eq('id', reminder_id).execute()
+    await _db('reminders').update('reminders', {"is_active": False}, [('id', 'eq', reminder_id)])
 
 # ▼▼▼ [핵심 추가] 이 함수를 추가하세요. ▼▼▼
 @supabase_retry_handler()
 async def set_reminder_message_id(reminder_id: int, message_id: int):
     """특정 알림에 대해 발송된 알림 메시지의 ID를 DB에 기록합니다."""
-    await supabase.table('reminders').update({"reminder_message_id": message_id}).eq('id', reminder_id).execute()
+    await _db('reminders').update('reminders', {"reminder_message_id": message_id}, [('id', 'eq', reminder_id)])
 # ▲▲▲ [추가 완료] ▲▲▲
 
 @supabase_retry_handler()
 async def update_wallet(user: discord.User, amount: int) -> Optional[dict]:
     params = {'p_user_id': str(user.id), 'p_amount': amount}
-    response = await supabase.rpc('update_wallet_balance', params).execute()
-    return response.data[0] if response and response.data else None
+    data = await _db('user_wallets').rpc('update_wallet_balance', params)
+    return data[0] if data else None
 @supabase_retry_handler()
 async def backup_member_data(user_id: int, guild_id: int, role_ids: List[int], nickname: Optional[str]):
-    await supabase.table('left_members').upsert({ 'user_id': user_id, 'guild_id': guild_id, 'roles': role_ids, 'nickname': nickname, 'left_at': datetime.now(timezone.utc).isoformat() }).execute()
+    record = { 'user_id': user_id, 'guild_id': guild_id, 'roles': role_ids, 'nickname': nickname, 'left_at': datetime.now(timezone.utc).isoformat() }
+    if write_behind.enabled:
+        write_behind.add('left_members', record, ("user_id", "guild_id"))
+        return
+    await _db('left_members').upsert('left_members', [record])
 @supabase_retry_handler()
 async def get_member_backup(user_id: int, guild_id: int) -> Optional[Dict[str, Any]]:
-    response = await supabase.table('left_members').select('*').eq('user_id', user_id).eq('guild_id', guild_id).maybe_single().execute()
-    return response.data if response else None
+    if (pending := write_behind.peek('left_members', (user_id, guild_id))):
+        return pending
+    rows = await _db('left_members').select('left_members', filters=[('user_id', 'eq', user_id), ('guild_id', 'eq', guild_id)], limit=1)
+    return rows[0] if rows else None
 @supabase_retry_handler()
 async def delete_member_backup(user_id: int, guild_id: int):
-    await supabase.table('left_members').delete().eq('user_id', user_id).eq('guild_id', guild_id).execute()
+    await write_behind.wait_for_keys('left_members', [(user_id, guild_id)])
+    write_behind.discard('left_members', (user_id, guild_id))
+    await _db('left_members').delete('left_members', [('user_id', 'eq', user_id), ('guild_id', 'eq', guild_id)])
+@supabase_retry_handler()
+async def create_initial_user_level(user_id: int):
+    """신규 유저의 레벨 데이터를 1레벨로 생성합니다."""
+    await _db('user_levels').upsert('user_levels', [{'user_id': user_id, 'level': 1, 'xp': 0}], on_conflict='user_id')
+@supabase_retry_handler()
+async def get_pet(user_id: int) -> Optional[Dict[str, Any]]:
+    rows = await _db('pets').select('pets', columns='id, current_stage', filters=[('user_id', 'eq', user_id)], limit=1)
+    return rows[0] if rows else None
+@supabase_retry_handler()
+async def set_pet_hatch_time(pet_id: int, hatches_at: datetime) -> bool:
+    await _db('pets').update('pets', {'hatches_at': hatches_at.isoformat()}, [('id', 'eq', pet_id)])
+    return True
 @supabase_retry_handler()
 async def get_user_abilities(user_id: int) -> List[str]:
     CACHE_TTL = 300
@@ -378,9 +1085,9 @@ async def get_user_abilities(user_id: int) -> List[str]:
         cached_data, timestamp = _user_abilities_cache[user_id]
         if now - timestamp < CACHE_TTL:
             return cached_data
-    response = await supabase.rpc('get_user_ability_keys', {'p_user_id': user_id}).execute()
-    if response and hasattr(response, 'data'):
-        abilities = response.data if response.data else []
+    data = await _db('user_abilities').rpc('get_user_ability_keys', {'p_user_id': user_id})
+    if data is not None:
+        abilities = data if data else []
         _user_abilities_cache[user_id] = (abilities, now)
         return abilities
     _user_abilities_cache[user_id] = ([], now)
@@ -389,9 +1096,9 @@ async def get_user_abilities(user_id: int) -> List[str]:
 async def load_sticky_messages_from_db():
     """DB에서 모든 고정 임베드 메시지 설정을 불러와 캐시에 저장합니다."""
     global _sticky_messages_cache
-    response = await supabase.table('sticky_messages').select('*').execute()
-    if response and response.data:
-        _sticky_messages_cache = {item['channel_id']: item for item in response.data}
+    rows = await _db('sticky_messages').select('sticky_messages')
+    if rows:
+        _sticky_messages_cache = {item['channel_id']: item for item in rows}
         logger.info(f"✅ {len(_sticky_messages_cache)}개의 고정 임베드 메시지 설정을 DB에서 캐시로 로드했습니다.")
     else:
         _sticky_messages_cache = {}
@@ -406,15 +1113,20 @@ async def set_sticky_message(channel_id: int, message_id: int, guild_id: int, em
         "guild_id": guild_id,
         "embed_data": embed_data
     }
-    await supabase.table('sticky_messages').upsert(record).execute()
     _sticky_messages_cache[channel_id] = record
+    if write_behind.enabled:
+        write_behind.add('sticky_messages', record, ("channel_id",), on_conflict="channel_id")
+        return
+    await _db('sticky_messages').upsert('sticky_messages', [record], on_conflict="channel_id")
     logger.info(f"📌 채널(ID: {channel_id})에 고정 임베드 메시지(ID: {message_id})를 설정했습니다.")
 
 @supabase_retry_handler()
 async def remove_sticky_message(channel_id: int):
     """채널의 고정 임베드 메시지 설정을 삭제합니다."""
     global _sticky_messages_cache
-    await supabase.table('sticky_messages').delete().eq('channel_id', channel_id).execute()
+    await write_behind.wait_for_keys('sticky_messages', [(channel_id,)])
+    write_behind.discard('sticky_messages', (channel_id,))
+    await _db('sticky_messages').delete('sticky_messages', [('channel_id', 'eq', channel_id)])
     _sticky_messages_cache.pop(channel_id, None)
     logger.info(f"📌 채널(ID: {channel_id})의 고정 임베드 메시지 설정을 삭제했습니다.")
 
@@ -428,7 +1140,7 @@ async def remove_sticky_message(channel_id: int):
 async def join_event_participant(user_id: int) -> bool:
     """이벤트 참가 신청 (성공 시 True, 이미 참가 중이면 False)"""
     try:
-        await supabase.table('event_participants').insert({"user_id": user_id}).execute()
+        await _db('event_participants').insert('event_participants', [{"user_id": user_id}])
         return True
     except Exception:
         return False
@@ -436,10 +1148,10 @@ async def join_event_participant(user_id: int) -> bool:
 @supabase_retry_handler()
 async def get_event_participants() -> List[int]:
     """이벤트 참가자 ID 목록 반환"""
-    response = await supabase.table('event_participants').select('user_id').execute()
-    return [int(row['user_id']) for row in response.data] if response.data else []
+    rows = await _db('event_participants').select('event_participants', columns='user_id')
+    return [int(row['user_id']) for row in rows]
 
 @supabase_retry_handler()
 async def clear_event_participants():
     """(이벤트 종료 후) 참가자 데이터 초기화"""
-    await supabase.table('event_participants').delete().neq('user_id', 0).execute()
+    await _db('event_participants').delete('event_participants', [('user_id', 'neq', 0)])
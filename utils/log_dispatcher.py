@@ -0,0 +1,198 @@
+# utils/log_dispatcher.py
+"""
+로그 채널 전송을 한곳에서 처리하는 공용 디스패처입니다.
+각 로거는 임베드를 큐에 넣기만 하고, 디스패처가 채널별로 모아 한 메시지에 최대 10개씩 묶어 전송합니다.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import discord
+
+from .database import get_config
+
+logger = logging.getLogger(__name__)
+
+# 디스코드 메시지 한 개에 담을 수 있는 임베드 수와 전체 글자 수 제한
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+# 채널당 메시지 전송 한도 (5초에 5개)
+RATE_LIMIT_MESSAGES = 5
+RATE_LIMIT_PER_SECONDS = 5.0
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_SUMMARIZE = "summarize"
+
+# bot_configs의 'LOG_DISPATCHER_SETTINGS' 값으로 덮어쓸 수 있습니다.
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "flush_interval": 1.0,
+    "max_queue_size": 200,
+    "overflow_policy": OVERFLOW_SUMMARIZE,
+}
+
+
+class _ChannelQueue:
+    def __init__(self, channel: discord.abc.Messageable):
+        self.channel = channel
+        self.items: Deque[Tuple[float, discord.Embed]] = deque()
+        self.dropped = 0
+        self.tokens = float(RATE_LIMIT_MESSAGES)
+        self.last_refill = time.monotonic()
+        self.flush_task: Optional[asyncio.Task] = None
+
+
+class LogDispatcher:
+    def __init__(self):
+        self.queues: Dict[int, _ChannelQueue] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self.metrics: Dict[str, float] = {
+            "enqueued": 0, "sent_messages": 0, "sent_embeds": 0,
+            "dropped": 0, "send_errors": 0, "flushes": 0,
+            "last_flush_latency": 0.0, "max_flush_latency": 0.0, "total_flush_latency": 0.0,
+        }
+
+    def _settings(self) -> Dict[str, Any]:
+        return {**DEFAULT_SETTINGS, **(get_config("LOG_DISPATCHER_SETTINGS", {}) or {})}
+
+    def enqueue(self, channel: discord.abc.Messageable, embed: discord.Embed):
+        """임베드를 채널별 큐에 넣고, 필요하면 전송 작업을 시작합니다."""
+        settings = self._settings()
+        queue = self.queues.get(channel.id)
+        if queue is None:
+            queue = self.queues[channel.id] = _ChannelQueue(channel)
+        queue.channel = channel
+
+        if len(queue.items) >= max(1, int(settings["max_queue_size"])):
+            queue.items.popleft()
+            queue.dropped += 1
+            self.metrics["dropped"] += 1
+        queue.items.append((time.monotonic(), embed))
+        self.metrics["enqueued"] += 1
+
+        if queue.flush_task is None or queue.flush_task.done():
+            queue.flush_task = asyncio.create_task(self._flush_loop(queue))
+
+    async def _wait_interval(self, seconds: float):
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        if self._wake.is_set(): return
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _acquire_token(self, queue: _ChannelQueue):
+        rate = RATE_LIMIT_MESSAGES / RATE_LIMIT_PER_SECONDS
+        while True:
+            now = time.monotonic()
+            queue.tokens = min(float(RATE_LIMIT_MESSAGES), queue.tokens + (now - queue.last_refill) * rate)
+            queue.last_refill = now
+            if queue.tokens >= 1:
+                queue.tokens -= 1
+                return
+            await asyncio.sleep((1 - queue.tokens) / rate)
+
+    def _take_batch(self, queue: _ChannelQueue, overflow_policy: str) -> List[Tuple[float, discord.Embed]]:
+        batch: List[Tuple[float, discord.Embed]] = []
+        total_chars = 0
+        if queue.dropped:
+            if overflow_policy == OVERFLOW_SUMMARIZE:
+                summary = discord.Embed(
+                    title="⚠️ 로그 일부 생략됨",
+                    description=f"짧은 시간에 로그가 너무 많이 발생하여 이전 로그 **{queue.dropped}건**이 생략되었습니다.",
+                    color=discord.Color.orange()
+                )
+                batch.append((time.monotonic(), summary))
+                total_chars += len(summary)
+            else:
+                logger.warning(f"⚠️ 로그 채널(ID: {queue.channel.id})의 큐가 가득 차 오래된 로그 {queue.dropped}건을 버렸습니다.")
+            queue.dropped = 0
+
+        while queue.items and len(batch) < MAX_EMBEDS_PER_MESSAGE:
+            embed_chars = len(queue.items[0][1])
+            if batch and total_chars + embed_chars > MAX_EMBED_CHARS_PER_MESSAGE:
+                break
+            batch.append(queue.items.popleft())
+            total_chars += embed_chars
+        return batch
+
+    async def _flush_loop(self, queue: _ChannelQueue):
+        settings = self._settings()
+        await self._wait_interval(float(settings["flush_interval"]))
+        while queue.items or queue.dropped:
+            await self._acquire_token(queue)
+            batch = self._take_batch(queue, settings["overflow_policy"])
+            if not batch: break
+            try:
+                await queue.channel.send(embeds=[embed for _, embed in batch])
+            except (discord.NotFound, discord.Forbidden) as e:
+                logger.error(f"❌ 로그 채널(ID: {queue.channel.id})에 전송할 수 없어 대기 중인 로그를 비웁니다: {e}")
+                self.metrics["send_errors"] += 1
+                self.metrics["dropped"] += len(queue.items)
+                queue.items.clear()
+                break
+            except discord.HTTPException as e:
+                self.metrics["send_errors"] += 1
+                if e.status == 429:
+                    # 묶음은 이미 큐에서 꺼냈으므로 순서를 지켜 앞에 되돌려 놓고 다시 시도합니다.
+                    logger.warning(f"⚠️ 로그 채널(ID: {queue.channel.id}) 전송이 속도 제한에 걸려 다시 시도합니다.")
+                    queue.items.extendleft(reversed(batch))
+                    queue.tokens = 0.0
+                    continue
+                logger.error(f"❌ 로그 채널(ID: {queue.channel.id}) 전송 중 오류 발생: {e}", exc_info=True)
+                # 잘못된 임베드 하나 때문에 묶음 전체를 잃지 않도록 하나씩 다시 보냅니다.
+                if len(batch) > 1:
+                    await self._send_individually(queue, batch)
+                else:
+                    logger.error(f"❌ 로그 채널(ID: {queue.channel.id})에 임베드 '{batch[0][1].title}'을(를) 보내지 못해 버립니다.")
+                    self.metrics["dropped"] += 1
+                continue
+
+            latency = time.monotonic() - batch[0][0]
+            self.metrics["sent_messages"] += 1
+            self.metrics["sent_embeds"] += len(batch)
+            self.metrics["flushes"] += 1
+            self.metrics["last_flush_latency"] = latency
+            self.metrics["total_flush_latency"] += latency
+            self.metrics["max_flush_latency"] = max(self.metrics["max_flush_latency"], latency)
+
+    async def _send_individually(self, queue: _ChannelQueue, batch: List[Tuple[float, discord.Embed]]):
+        """묶음 전송이 실패했을 때 임베드를 하나씩 보내고, 실패한 임베드만 버립니다."""
+        for _, embed in batch:
+            await self._acquire_token(queue)
+            try:
+                await queue.channel.send(embed=embed)
+            except discord.HTTPException as e:
+                logger.error(f"❌ 로그 채널(ID: {queue.channel.id})에 임베드 '{embed.title}'을(를) 보내지 못해 버립니다: {e}")
+                self.metrics["dropped"] += 1
+                if isinstance(e, (discord.NotFound, discord.Forbidden)):
+                    return
+                continue
+            self.metrics["sent_messages"] += 1
+            self.metrics["sent_embeds"] += 1
+
+    async def flush_all(self):
+        """대기 중인 모든 로그를 즉시 전송합니다. (봇 종료 시 호출)"""
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        self._wake.set()
+        try:
+            pending = [queue.flush_task for queue in self.queues.values() if queue.flush_task and not queue.flush_task.done()]
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            self._wake.clear()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        flushes = self.metrics["flushes"]
+        return {
+            **self.metrics,
+            "avg_flush_latency": (self.metrics["total_flush_latency"] / flushes) if flushes else 0.0,
+            "queue_depth": {channel_id: len(queue.items) for channel_id, queue in self.queues.items()},
+            "total_queue_depth": sum(len(queue.items) for queue in self.queues.values()),
+        }
+
+
+log_dispatcher = LogDispatcher()
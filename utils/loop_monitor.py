@@ -0,0 +1,117 @@
+# utils/loop_monitor.py
+"""
+이벤트 루프 지연 감시기입니다.
+- 루프 위의 하트비트 작업이 짧은 간격으로 깨어나며 예약 지연(lag)을 측정합니다.
+- 별도 감시 스레드는 하트비트가 임계값 이상 멈추면, 그 순간 루프 스레드의 스택을 캡처해
+  어떤 Cog/핸들러가 루프를 막고 있는지 로그로 남깁니다. (상호작용 3초 응답 제한을 놓치기 전에 발견하기 위함)
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from types import FrameType
+from typing import Optional, Tuple
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 루프가 이 시간(초) 이상 응답하지 않으면 멈춘 것으로 보고 스택을 기록합니다.
+STALL_THRESHOLD_SECONDS = float(os.environ.get("LOOP_STALL_THRESHOLD_MS", "500")) / 1000
+HEARTBEAT_INTERVAL_SECONDS = 0.1
+# 로그에 남길 스택 프레임 수 (가장 안쪽 기준)
+MAX_STACK_FRAMES = 25
+_COGS_DIR = os.sep + "cogs" + os.sep
+
+metrics.describe("bot_event_loop_scheduling_lag_seconds", "histogram", "하트비트로 측정한 이벤트 루프 예약 지연",
+                 buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+metrics.describe("bot_event_loop_stalls_total", "counter", "임계값을 넘긴 이벤트 루프 정지 횟수 (핸들러별)")
+metrics.describe("bot_event_loop_stall_seconds", "histogram", "이벤트 루프 정지 시간")
+
+
+def _find_handler(frame: Optional[FrameType]) -> Tuple[str, str]:
+    """스택에서 가장 안쪽의 cogs/ 프레임을 찾아 (cog 모듈, 함수 이름)을 돌려줍니다."""
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if _COGS_DIR in filename:
+            module = filename.split(_COGS_DIR, 1)[1].rsplit(".", 1)[0].replace(os.sep, ".")
+            return module, frame.f_code.co_name
+        frame = frame.f_back
+    return "unknown", "unknown"
+
+
+class LoopMonitor:
+    def __init__(self, threshold: float = STALL_THRESHOLD_SECONDS, interval: float = HEARTBEAT_INTERVAL_SECONDS):
+        self.threshold = threshold
+        self.interval = interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # 현재 진행 중인 정지에 대해 이미 스택을 기록했는지, 기록한 핸들러 이름
+        self._reported_stall: Optional[str] = None
+        self.max_lag = 0.0
+        self.stalls = 0
+
+    def start(self):
+        if self._heartbeat_task and not self._heartbeat_task.done(): return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat_task = self._loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"🩺 이벤트 루프 감시를 시작했습니다. (정지 임계값: {self.threshold * 1000:.0f}ms)")
+
+    def stop(self):
+        self._stop.set()
+        if self._heartbeat_task: self._heartbeat_task.cancel()
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._last_beat = now
+            self.max_lag = max(self.max_lag, lag)
+            metrics.observe("bot_event_loop_scheduling_lag_seconds", lag)
+            if self._reported_stall is not None:
+                metrics.observe("bot_event_loop_stall_seconds", lag)
+                logger.warning(f"🩺 이벤트 루프가 {lag * 1000:.0f}ms 동안 멈췄다가 재개되었습니다. (원인 추정: {self._reported_stall})")
+                self._reported_stall = None
+
+    def _watch(self):
+        while not self._stop.wait(self.interval / 2):
+            stalled_for = time.monotonic() - self._last_beat - self.interval
+            if stalled_for < self.threshold or self._reported_stall is not None:
+                continue
+            try:
+                self._report_stall(stalled_for)
+            except Exception as e:
+                logger.error(f"이벤트 루프 정지 기록 중 오류: {e}", exc_info=True)
+                self._reported_stall = "unknown"
+
+    def _report_stall(self, stalled_for: float):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        cog, handler = _find_handler(frame)
+        task = asyncio.current_task(self._loop) if self._loop else None
+        task_desc = f"{task.get_name()} ({getattr(task.get_coro(), '__qualname__', '?')})" if task else "-"
+        stack = "".join(traceback.format_stack(frame, limit=MAX_STACK_FRAMES)) if frame else "(스택 없음)"
+
+        self.stalls += 1
+        self._reported_stall = f"{cog}.{handler}"
+        metrics.inc("bot_event_loop_stalls_total", {"cog": cog, "handler": handler})
+        logger.warning(
+            f"🩺 이벤트 루프가 {stalled_for * 1000:.0f}ms 이상 멈춰 있습니다. "
+            f"Cog: {cog}, 핸들러: {handler}, 작업: {task_desc}\n{stack}"
+        )
+
+
+loop_monitor = LoopMonitor()
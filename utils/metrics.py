@@ -0,0 +1,268 @@
+# utils/metrics.py
+"""
+봇 내부 지표를 모아 Prometheus 텍스트 형식으로 내보내는 모듈입니다.
+- 지표 기록(inc/observe/set_gauge)은 이벤트 루프에서, HTTP 응답(/metrics, /health)은 별도 스레드의 Flask 서버에서 처리합니다.
+- 다른 utils 모듈에 의존하지 않으므로 database.py에서도 안전하게 import할 수 있습니다.
+"""
+import os
+import time
+import math
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from flask import Flask, Response, jsonify
+    from werkzeug.serving import make_server
+except ImportError:
+    Flask = None
+
+logger = logging.getLogger(__name__)
+
+METRICS_HOST = os.environ.get("METRICS_HOST", "0.0.0.0")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", os.environ.get("PORT", "8080")))
+# 게이트웨이 지연, 루프 지연, 캐시 크기 등을 갱신하는 간격 (초)
+SAMPLE_INTERVAL_SECONDS = 5.0
+# 마지막 샘플이 이 시간보다 오래되면 /health가 실패를 반환합니다. (루프가 멈췄다는 뜻)
+HEALTH_STALE_SECONDS = 30.0
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, Any]]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items: return ""
+    escaped = (f'{k}="{v.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), " ")}"' for k, v in items)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value): return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value): return "NaN"
+    return repr(float(value))
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.total += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # { 이름: (타입, 설명) }
+        self._meta: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self.last_sample_at: float = 0.0
+
+    def describe(self, name: str, kind: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self._meta[name] = (kind, help_text)
+        if kind == "histogram": self._buckets[name] = buckets
+
+    def inc(self, name: str, labels: Optional[Dict[str, Any]] = None, value: float = 1.0):
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def replace_gauges(self, name: str, values: Dict[LabelKey, float]):
+        """라벨 조합이 사라질 수 있는 게이지(예: 캐시, 작업 루프)를 한 번에 교체합니다."""
+        with self._lock:
+            self._gauges[name] = dict(values)
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            key = _label_key(labels)
+            if (histogram := series.get(key)) is None:
+                histogram = series[key] = _Histogram(self._buckets.get(name, DEFAULT_BUCKETS))
+            histogram.observe(value)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for kind, store in (("counter", self._counters), ("gauge", self._gauges)):
+                for name, series in sorted(store.items()):
+                    lines.append(f"# HELP {name} {self._meta.get(name, (kind, name))[1]}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in series.items():
+                        lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {self._meta.get(name, ('histogram', name))[1]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(histogram.total)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+metrics.describe("bot_gateway_latency_seconds", "gauge", "Discord 게이트웨이 하트비트 지연")
+metrics.describe("bot_event_loop_lag_seconds", "gauge", "이벤트 루프 예약 지연 (마지막 샘플)")
+metrics.describe("bot_event_loop_lag_max_seconds", "gauge", "마지막 샘플 구간의 최대 이벤트 루프 지연")
+metrics.describe("bot_listener_duration_seconds", "histogram", "이벤트 리스너 처리 시간")
+metrics.describe("bot_listener_errors_total", "counter", "이벤트 리스너 예외 수")
+metrics.describe("bot_db_call_duration_seconds", "histogram", "데이터 계층 함수 호출 시간 (재시도 포함)")
+metrics.describe("bot_db_calls_total", "counter", "데이터 계층 함수 호출 수")
+metrics.describe("bot_db_retries_total", "counter", "데이터 계층 함수 재시도 수")
+metrics.describe("bot_cache_entries", "gauge", "메모리 캐시 항목 수")
+metrics.describe("bot_task_loop_running", "gauge", "tasks.loop 실행 여부 (1/0)")
+metrics.describe("bot_task_loop_failed", "gauge", "tasks.loop가 예외로 멈췄는지 여부 (1/0)")
+metrics.describe("bot_task_loop_iterations", "gauge", "tasks.loop 현재 반복 횟수")
+metrics.describe("discord_rest_ratelimited_total", "counter", "Discord REST 429(속도 제한) 응답 수")
+metrics.describe("bot_guilds", "gauge", "참여 중인 서버 수")
+
+
+class RateLimitLogHandler(logging.Handler):
+    """discord.http 로거의 속도 제한 경고를 세어 429 카운터로 기록합니다."""
+    def emit(self, record: logging.LogRecord):
+        try:
+            message = record.getMessage()
+        except Exception:
+            return
+        if "429" in message or "rate limit" in message.lower():
+            scope = "global" if "global" in message.lower() else "route"
+            metrics.inc("discord_rest_ratelimited_total", {"scope": scope})
+
+
+def _collect_task_loops(bot) -> List[Tuple[str, str, Any]]:
+    from discord.ext import tasks
+    owners = [("MyBot", bot)] + list(bot.cogs.items())
+    found = []
+    for owner_name, owner in owners:
+        for attr_name in dir(type(owner)):
+            if isinstance(getattr(type(owner), attr_name, None), tasks.Loop):
+                found.append((owner_name, attr_name, getattr(owner, attr_name)))
+    return found
+
+
+class MetricsSampler:
+    """이벤트 루프 위에서 돌며 게이트웨이 지연, 루프 지연, 캐시 크기, 작업 루프 상태를 주기적으로 갱신합니다."""
+    def __init__(self, bot, cache_sizes: Optional[Callable[[], Dict[str, int]]] = None, interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.bot = bot
+        self.cache_sizes = cache_sizes
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task: self._task.cancel()
+
+    async def _run(self):
+        max_lag = 0.0
+        next_sample = time.monotonic()
+        while True:
+            expected = time.monotonic() + 1.0
+            await asyncio.sleep(1.0)
+            lag = max(0.0, time.monotonic() - expected)
+            max_lag = max(max_lag, lag)
+            metrics.set_gauge("bot_event_loop_lag_seconds", lag)
+            if time.monotonic() < next_sample: continue
+            next_sample = time.monotonic() + self.interval
+            try:
+                self.sample(max_lag)
+            except Exception as e:
+                logger.error(f"지표 샘플링 중 오류 발생: {e}", exc_info=True)
+            max_lag = 0.0
+
+    def sample(self, max_lag: float = 0.0):
+        latency = self.bot.latency
+        metrics.set_gauge("bot_gateway_latency_seconds", latency if latency == latency and not math.isinf(latency) else -1.0)
+        metrics.set_gauge("bot_event_loop_lag_max_seconds", max_lag)
+        metrics.set_gauge("bot_guilds", len(self.bot.guilds))
+        if self.cache_sizes:
+            metrics.replace_gauges("bot_cache_entries", {_label_key({"cache": name}): size for name, size in self.cache_sizes().items()})
+        running, failed, iterations = {}, {}, {}
+        for owner_name, loop_name, loop in _collect_task_loops(self.bot):
+            key = _label_key({"owner": owner_name, "loop": loop_name})
+            running[key] = 1.0 if loop.is_running() else 0.0
+            failed[key] = 1.0 if loop.failed() else 0.0
+            iterations[key] = float(loop.current_loop)
+        metrics.replace_gauges("bot_task_loop_running", running)
+        metrics.replace_gauges("bot_task_loop_failed", failed)
+        metrics.replace_gauges("bot_task_loop_iterations", iterations)
+        metrics.last_sample_at = time.monotonic()
+
+
+class MetricsServer:
+    """Flask 앱을 데몬 스레드에서 실행합니다. 봇의 이벤트 루프를 막지 않습니다."""
+    def __init__(self, bot, host: str = METRICS_HOST, port: int = METRICS_PORT):
+        self.bot = bot
+        self.host, self.port = host, port
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _build_app(self):
+        app = Flask("bot-metrics")
+
+        @app.route("/")
+        def index():
+            return "OK"
+
+        @app.route("/metrics")
+        def prometheus_metrics():
+            return Response(metrics.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+        @app.route("/health")
+        def health():
+            sample_age = time.monotonic() - metrics.last_sample_at if metrics.last_sample_at else None
+            ready = self.bot.is_ready() and not self.bot.is_closed()
+            healthy = ready and sample_age is not None and sample_age < HEALTH_STALE_SECONDS
+            body = {"status": "ok" if healthy else "unhealthy", "ready": ready, "latency": self.bot.latency if ready else None, "last_sample_age": sample_age}
+            return jsonify(body), 200 if healthy else 503
+
+        return app
+
+    def start(self) -> bool:
+        if Flask is None:
+            logger.warning("⚠️ flask가 설치되어 있지 않아 지표 서버를 시작하지 않습니다.")
+            return False
+        try:
+            self._server = make_server(self.host, self.port, self._build_app(), threaded=True)
+        except OSError as e:
+            logger.error(f"❌ 지표 서버를 {self.host}:{self.port}에 열 수 없습니다: {e}")
+            return False
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        logger.info(f"📈 지표 서버를 시작했습니다: http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server = None
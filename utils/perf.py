@@ -0,0 +1,207 @@
+# utils/perf.py
+"""
+핸들러별 처리 시간 계측 도구입니다. (PERF_INSTRUMENTATION=1 일 때만 켜짐)
+Cog 리스너, 슬래시/컨텍스트 메뉴 명령어, View/Modal 콜백, tasks.loop 본문을 감싸서
+전체 시간, Discord REST 대기 시간, DB(Supabase) 대기 시간, 감사 로그 대기 시간, 예외 수를 핸들러별로 모읍니다.
+REST/DB/대기 시간은 contextvars로 현재 실행 중인 핸들러에 더해집니다.
+감사 로그 대기는 일을 하지 않고 게이트웨이 이벤트를 기다린 시간이므로, 처리 시간(busy) 백분위에서는 뺍니다.
+"""
+import os
+import time
+import logging
+import contextvars
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import wraps
+from typing import Deque, Dict, List, Optional
+
+import discord
+from discord import app_commands, ui
+from discord.ext import commands, tasks
+
+logger = logging.getLogger(__name__)
+
+PERF_INSTRUMENTATION_ENABLED = os.environ.get("PERF_INSTRUMENTATION", "0") == "1"
+# 백분위 계산을 위해 핸들러마다 보관하는 최근 측정값 수
+MAX_SAMPLES_PER_HANDLER = 1000
+
+
+class _Sample:
+    __slots__ = ("rest_time", "db_time", "wait_time")
+
+    def __init__(self):
+        self.rest_time = 0.0
+        self.db_time = 0.0
+        self.wait_time = 0.0
+
+
+_current_sample: contextvars.ContextVar[Optional[_Sample]] = contextvars.ContextVar("perf_current_sample", default=None)
+
+
+class HandlerStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.rest_time = 0.0
+        self.db_time = 0.0
+        self.wait_time = 0.0
+        self.samples: Deque[float] = deque(maxlen=MAX_SAMPLES_PER_HANDLER)
+        # 감사 로그 대기 시간을 뺀 처리 시간
+        self.busy_samples: Deque[float] = deque(maxlen=MAX_SAMPLES_PER_HANDLER)
+
+    def summary(self) -> Dict[str, float]:
+        ordered, busy = sorted(self.samples), sorted(self.busy_samples)
+        pick = lambda values, q: values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+        return {
+            "calls": self.calls, "errors": self.errors,
+            "avg": self.total_time / self.calls if self.calls else 0.0,
+            "p50": pick(ordered, 0.50), "p95": pick(ordered, 0.95), "p99": pick(ordered, 0.99),
+            "busy_p99": pick(busy, 0.99),
+            "rest_avg": self.rest_time / self.calls if self.calls else 0.0,
+            "db_avg": self.db_time / self.calls if self.calls else 0.0,
+            "wait_avg": self.wait_time / self.calls if self.calls else 0.0,
+        }
+
+
+class PerfRecorder:
+    def __init__(self):
+        self.enabled = False
+        self.handlers: Dict[str, HandlerStats] = {}
+        self.started_at = time.monotonic()
+
+    @asynccontextmanager
+    async def track(self, name: str):
+        """name 핸들러의 실행 한 번을 측정합니다. 안쪽에서 발생한 REST/DB 대기 시간도 함께 모읍니다."""
+        if not self.enabled:
+            yield
+            return
+        sample = _Sample()
+        token = _current_sample.set(sample)
+        started_at = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            _current_sample.reset(token)
+            elapsed = time.perf_counter() - started_at
+            stats = self.handlers.get(name)
+            if stats is None:
+                stats = self.handlers[name] = HandlerStats()
+            stats.calls += 1
+            stats.errors += failed
+            stats.total_time += elapsed
+            stats.rest_time += sample.rest_time
+            stats.db_time += sample.db_time
+            stats.wait_time += sample.wait_time
+            stats.samples.append(elapsed)
+            stats.busy_samples.append(max(0.0, elapsed - sample.wait_time))
+
+    def add_rest_time(self, seconds: float):
+        if (sample := _current_sample.get()) is not None:
+            sample.rest_time += seconds
+
+    def add_db_time(self, seconds: float):
+        if (sample := _current_sample.get()) is not None:
+            sample.db_time += seconds
+
+    def add_wait_time(self, seconds: float):
+        """감사 로그 항목처럼 게이트웨이 이벤트를 기다린 시간을 현재 핸들러에 더합니다."""
+        if (sample := _current_sample.get()) is not None:
+            sample.wait_time += seconds
+
+    def top(self, limit: int = 10, sort_by: str = "p95") -> List[tuple]:
+        rows = [(name, stats.summary()) for name, stats in self.handlers.items()]
+        rows.sort(key=lambda row: row[1][sort_by], reverse=True)
+        return rows[:limit]
+
+    def reset(self):
+        self.handlers.clear()
+        self.started_at = time.monotonic()
+
+
+perf = PerfRecorder()
+
+
+# --- 계측 대상 감싸기 ---
+def _wrap_coroutine_function(func, name: str):
+    if getattr(func, "__perf_wrapped__", False): return func
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        async with perf.track(name):
+            return await func(*args, **kwargs)
+    wrapper.__perf_wrapped__ = True
+    return wrapper
+
+
+def _patch_http_client():
+    original = discord.http.HTTPClient.request
+    if getattr(original, "__perf_wrapped__", False): return
+
+    @wraps(original)
+    async def request(self, *args, **kwargs):
+        started_at = time.perf_counter()
+        try:
+            return await original(self, *args, **kwargs)
+        finally:
+            perf.add_rest_time(time.perf_counter() - started_at)
+    request.__perf_wrapped__ = True
+    discord.http.HTTPClient.request = request
+
+
+def _patch_views():
+    original_view_task = ui.View._scheduled_task
+    if not getattr(original_view_task, "__perf_wrapped__", False):
+        @wraps(original_view_task)
+        async def view_task(self, item, interaction):
+            callback = getattr(item, "callback", None)
+            name = f"view:{type(self).__name__}.{getattr(callback, '__name__', type(item).__name__)}"
+            async with perf.track(name):
+                return await original_view_task(self, item, interaction)
+        view_task.__perf_wrapped__ = True
+        ui.View._scheduled_task = view_task
+
+    original_modal_task = ui.Modal._scheduled_task
+    if not getattr(original_modal_task, "__perf_wrapped__", False):
+        @wraps(original_modal_task)
+        async def modal_task(self, *args, **kwargs):
+            async with perf.track(f"modal:{type(self).__name__}"):
+                return await original_modal_task(self, *args, **kwargs)
+        modal_task.__perf_wrapped__ = True
+        ui.Modal._scheduled_task = modal_task
+
+
+def _instrument_app_commands(bot: commands.Bot) -> int:
+    count = 0
+    for command in list(bot.tree.walk_commands()) + list(bot.tree.get_commands(type=discord.AppCommandType.message)) + list(bot.tree.get_commands(type=discord.AppCommandType.user)):
+        if isinstance(command, (app_commands.Command, app_commands.ContextMenu)):
+            command._callback = _wrap_coroutine_function(command._callback, f"command:{command.qualified_name}")
+            count += 1
+    return count
+
+
+def _instrument_task_loops(bot: commands.Bot) -> int:
+    count = 0
+    for owner in [bot, *bot.cogs.values()]:
+        for attr_name in dir(type(owner)):
+            if isinstance(getattr(type(owner), attr_name, None), tasks.Loop):
+                loop = getattr(owner, attr_name)
+                loop.coro = _wrap_coroutine_function(loop.coro, f"loop:{type(owner).__name__}.{attr_name}")
+                count += 1
+    return count
+
+
+def instrument_bot(bot: commands.Bot) -> bool:
+    """load_all_extensions 이후 호출합니다. 리스너는 MyBot._run_event에서 perf.track으로 감쌉니다."""
+    if not PERF_INSTRUMENTATION_ENABLED: return False
+    perf.enabled = True
+    _patch_http_client()
+    _patch_views()
+    commands_count = _instrument_app_commands(bot)
+    loops_count = _instrument_task_loops(bot)
+    logger.info(f"⏱️ 성능 계측을 켰습니다. (명령어 {commands_count}개, 작업 루프 {loops_count}개, 모든 리스너/View 콜백)")
+    return True
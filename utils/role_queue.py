@@ -0,0 +1,176 @@
+# utils/role_queue.py
+"""
+멤버 역할 변경을 멤버별로 직렬화하는 공용 큐입니다.
+여러 Cog(역할 패널, 온보딩, 벌점 역할, 부스트 보상)가 짧은 시간 안에 요청한 추가/제거를 모아,
+멤버당 한 번의 PATCH(member.edit(roles=...))로 적용합니다. 실제로 바뀌는 역할이 없으면 API를 호출하지 않습니다.
+바뀌는 역할이 하나뿐이면 역할 단위 엔드포인트(add_roles/remove_roles)를 써서, 기준 역할 목록이 낡아도 다른 역할을 덮어쓰지 않습니다.
+여러 역할을 한 번에 바꾸는 PATCH는 전체 목록을 보내므로, 직전 PATCH 결과를 기준으로 삼아도
+그 사이 다른 봇이나 관리자가 바꾼 역할을 되돌릴 수 있습니다. 요청 수를 줄이는 대신 감수하는 부분입니다.
+"""
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+# 같은 멤버에 대한 요청을 모으는 대기 시간 (초)
+BATCH_WINDOW_SECONDS = 0.3
+# 마지막으로 적용한 역할 목록을 기준으로 삼는 시간 (초). 그 뒤에는 게이트웨이 캐시가 따라잡았다고 봅니다.
+LAST_APPLIED_TTL_SECONDS = 10.0
+
+MemberKey = Tuple[int, int]
+SelfEditHook = Callable[..., None]
+
+
+class _PendingRoles:
+    def __init__(self, member: discord.Member):
+        self.member = member
+        # 같은 역할에 대한 추가/제거가 겹치면 나중 요청이 이깁니다.
+        self.add: Dict[int, discord.abc.Snowflake] = {}
+        self.remove: Dict[int, discord.abc.Snowflake] = {}
+        self.reasons: List[str] = []
+        self.futures: List[asyncio.Future] = []
+
+
+class _AppliedRoles:
+    """이 큐가 마지막으로 적용한 멤버의 역할 목록과, 그때 바꾼 역할입니다."""
+    __slots__ = ("expires_at", "role_ids", "added", "removed")
+
+    def __init__(self, role_ids: Iterable[int], added: Iterable[int], removed: Iterable[int]):
+        self.expires_at = time.monotonic() + LAST_APPLIED_TTL_SECONDS
+        self.role_ids: FrozenSet[int] = frozenset(role_ids)
+        self.added: FrozenSet[int] = frozenset(added)
+        self.removed: FrozenSet[int] = frozenset(removed)
+
+
+class RoleMutationQueue:
+    def __init__(self, window: float = BATCH_WINDOW_SECONDS):
+        self.window = window
+        self._pending: Dict[MemberKey, _PendingRoles] = {}
+        self._locks: Dict[MemberKey, asyncio.Lock] = {}
+        # 게이트웨이 업데이트가 오기 전에 다음 묶음을 적용할 때 쓸 기준 역할 목록
+        self._last_applied: Dict[MemberKey, _AppliedRoles] = {}
+        self._self_edit_hook: Optional[SelfEditHook] = None
+        self.stats: Dict[str, int] = {"requests": 0, "skipped": 0, "patches": 0, "single_role_calls": 0}
+
+    def set_self_edit_hook(self, hook: Optional[SelfEditHook]):
+        """역할을 수정하기 직전에 호출할 함수를 등록합니다. (MemberUpdateDispatcher.expect_self_edit)"""
+        self._self_edit_hook = hook
+
+    @staticmethod
+    def compute_delta(member: discord.Member, add: Iterable[discord.abc.Snowflake] = (), remove: Iterable[discord.abc.Snowflake] = ()) -> Tuple[List[discord.abc.Snowflake], List[discord.abc.Snowflake]]:
+        """멤버의 현재 역할과 비교해 실제로 추가/제거해야 하는 역할만 돌려줍니다."""
+        return RoleMutationQueue._delta(member.roles, add, remove)
+
+    @staticmethod
+    def _delta(base_roles: Iterable[discord.abc.Snowflake], add: Iterable[discord.abc.Snowflake], remove: Iterable[discord.abc.Snowflake]) -> Tuple[List[discord.abc.Snowflake], List[discord.abc.Snowflake]]:
+        current_ids = {role.id for role in base_roles}
+        remove_ids = {role.id for role in remove}
+        to_add = list({role.id: role for role in add if role.id not in current_ids and role.id not in remove_ids}.values())
+        to_remove = list({role.id: role for role in remove if role.id in current_ids}.values())
+        return to_add, to_remove
+
+    async def apply(self, member: discord.Member, add: Iterable[discord.abc.Snowflake] = (), remove: Iterable[discord.abc.Snowflake] = (), reason: Optional[str] = None) -> bool:
+        """
+        역할 추가/제거를 요청하고 적용이 끝날 때까지 기다립니다.
+        바뀔 역할이 없으면 True를 바로 반환하고, API 오류(discord.Forbidden 등)는 그대로 다시 발생시킵니다.
+        """
+        self.stats["requests"] += 1
+        add, remove = list(add), list(remove)
+        key = (member.guild.id, member.id)
+        to_add, to_remove = self._delta(self._base_roles(key, member), add, remove)
+        # 같은 멤버의 PATCH가 진행 중이면(잠금이 남아 있으면) 기준이 곧 바뀌므로 건너뛰지 않습니다.
+        if not to_add and not to_remove and key not in self._pending and key not in self._locks:
+            self.stats["skipped"] += 1
+            return True
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _PendingRoles(member)
+            asyncio.create_task(self._flush_after_window(key))
+        pending.member = member
+        for role in add:
+            pending.remove.pop(role.id, None)
+            pending.add[role.id] = role
+        for role in remove:
+            pending.add.pop(role.id, None)
+            pending.remove[role.id] = role
+        if reason and reason not in pending.reasons:
+            pending.reasons.append(reason)
+        future = asyncio.get_running_loop().create_future()
+        pending.futures.append(future)
+        return await future
+
+    async def _flush_after_window(self, key: MemberKey):
+        await asyncio.sleep(self.window)
+        # 이전 PATCH가 끝나기 전에는 같은 멤버의 다음 묶음을 보내지 않습니다.
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            pending = self._pending.pop(key, None)
+            if pending is None: return
+            try:
+                await self._apply_pending(key, pending)
+            except Exception as e:
+                for future in pending.futures:
+                    if not future.done(): future.set_exception(e)
+            else:
+                for future in pending.futures:
+                    if not future.done(): future.set_result(True)
+        if key not in self._pending:
+            self._locks.pop(key, None)
+        self._sweep_last_applied()
+
+    def _sweep_last_applied(self):
+        now = time.monotonic()
+        for key in [key for key, applied in self._last_applied.items() if applied.expires_at <= now]:
+            del self._last_applied[key]
+
+    def _base_roles(self, key: MemberKey, member: discord.Member) -> List[discord.Role]:
+        """
+        델타를 계산할 기준 역할 목록을 돌려줍니다.
+        직전 PATCH의 게이트웨이 업데이트가 아직 캐시에 반영되지 않았다면, 마지막으로 적용한 역할 목록을 씁니다.
+        실제 적용은 멤버별 잠금 안에서만 이 결과를 기준으로 삼습니다.
+        """
+        applied = self._last_applied.get(key)
+        if applied is None or applied.expires_at <= time.monotonic():
+            return member.roles
+        cached_ids = {role.id for role in member.roles}
+        if applied.added <= cached_ids and not (applied.removed & cached_ids):
+            # 캐시가 이미 직전 변경을 반영했으므로, 그 뒤의 외부 변경까지 담긴 캐시가 더 최신입니다.
+            del self._last_applied[key]
+            return member.roles
+        return [role for role_id in applied.role_ids if (role := member.guild.get_role(role_id)) is not None]
+
+    async def _apply_pending(self, key: MemberKey, pending: _PendingRoles):
+        member = pending.member.guild.get_member(pending.member.id) or pending.member
+        base_roles = self._base_roles(key, member)
+        to_add, to_remove = self._delta(base_roles, pending.add.values(), pending.remove.values())
+        if not to_add and not to_remove:
+            self.stats["skipped"] += 1
+            return
+
+        base_ids = {role.id for role in base_roles}
+        remove_ids: Set[int] = {role.id for role in to_remove}
+        add_ids = [role.id for role in to_add]
+        if self._self_edit_hook:
+            self._self_edit_hook(member, roles_added=add_ids, roles_removed=list(remove_ids))
+        reason = " / ".join(pending.reasons) or None
+        final_ids = (base_ids - remove_ids) | set(add_ids)
+
+        if len(to_add) + len(to_remove) == 1:
+            # 역할 하나만 바뀌면 PUT/DELETE 역할 엔드포인트가 원자적이라 기준 목록이 필요 없습니다.
+            self.stats["single_role_calls"] += 1
+            if to_add: await member.add_roles(*to_add, reason=reason)
+            else: await member.remove_roles(*to_remove, reason=reason)
+        else:
+            final_roles = [role for role in base_roles if not role.is_default() and role.id not in remove_ids] + to_add
+            self.stats["patches"] += 1
+            updated = await member.edit(roles=final_roles, reason=reason)
+            if updated is not None:
+                final_ids = {role.id for role in updated.roles}
+        self._last_applied[key] = _AppliedRoles(final_ids, add_ids, remove_ids)
+
+
+role_queue = RoleMutationQueue()
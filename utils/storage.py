@@ -0,0 +1,354 @@
+# utils/storage.py
+"""
+데이터 계층(utils/database.py)이 사용하는 저장소 인터페이스와 구현체입니다.
+- SupabaseBackend: 운영용 원격 DB
+- SQLiteBackend: 테이블 행을 기본 키별 JSON으로 로컬 파일에 저장하는 키-값 미러 (aiosqlite 필요, Supabase 스키마와 호환되지 않음)
+- MemoryBackend: 테스트/벤치마크용 메모리 저장소
+필터는 (컬럼, 연산자, 값) 튜플 목록이며, 연산자는 eq / neq / in / gte / lte / not_null 입니다.
+"""
+import os
+import json
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import aiosqlite
+except ImportError:
+    aiosqlite = None
+
+logger = logging.getLogger(__name__)
+
+Filter = Tuple[str, str, Any]
+Order = Tuple[str, bool]  # (컬럼, 내림차순 여부)
+
+# Supabase 테이블별 기본 키. 로컬 저장소도 같은 키로 upsert/중복 검사를 합니다.
+TABLE_PRIMARY_KEYS: Dict[str, Tuple[str, ...]] = {
+    "bot_configs": ("config_key",),
+    "channel_configs": ("channel_key",),
+    "embeds": ("embed_key",),
+    "panel_components": ("component_key",),
+    "onboarding_steps": ("step_number",),
+    "cooldowns": ("subject_id", "cooldown_key"),
+    "stats_channels": ("channel_id",),
+    "temp_voice_channels": ("channel_id",),
+    "tickets": ("thread_id",),
+    "warnings": ("id",),
+    "anonymous_messages": ("id",),
+    "reminders": ("id",),
+    "left_members": ("user_id", "guild_id"),
+    "sticky_messages": ("channel_id",),
+    "event_participants": ("user_id",),
+    "user_levels": ("user_id",),
+    "pets": ("id",),
+}
+# 기본 키가 'id'인 테이블은 DB처럼 자동 증가 ID를 부여합니다.
+AUTO_ID_COLUMN = "id"
+
+
+class StorageBackend(ABC):
+    """모든 저장소 구현체가 따라야 하는 인터페이스입니다. (rpc/close 외의 메서드를 빠뜨리면 생성 시점에 TypeError)"""
+    name = "base"
+    supports_rpc = False
+
+    @abstractmethod
+    async def select(self, table: str, *, columns: str = "*", filters: Sequence[Filter] = (), order: Sequence[Order] = (), limit: Optional[int] = None) -> List[dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def insert(self, table: str, rows: List[dict]) -> List[dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def upsert(self, table: str, rows: List[dict], on_conflict: Optional[str] = None, ignore_duplicates: bool = False) -> List[dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update(self, table: str, values: dict, filters: Sequence[Filter]) -> List[dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, table: str, filters: Sequence[Filter]):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def count(self, table: str, filters: Sequence[Filter] = ()) -> int:
+        raise NotImplementedError
+
+    async def rpc(self, name: str, params: dict) -> Any:
+        raise NotImplementedError(f"'{self.name}' 저장소는 RPC '{name}'을(를) 지원하지 않습니다.")
+
+    async def close(self):
+        pass
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# Supabase
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+class SupabaseBackend(StorageBackend):
+    name = "supabase"
+    supports_rpc = True
+
+    def __init__(self, client):
+        self.client = client
+
+    @staticmethod
+    def _apply_filters(query, filters: Sequence[Filter]):
+        for column, op, value in filters:
+            if op == "eq": query = query.eq(column, value)
+            elif op == "neq": query = query.neq(column, value)
+            elif op == "in": query = query.in_(column, list(value))
+            elif op == "gte": query = query.gte(column, value)
+            elif op == "lte": query = query.lte(column, value)
+            elif op == "not_null": query = query.not_.is_(column, 'null')
+            else: raise ValueError(f"지원하지 않는 필터 연산자입니다: {op}")
+        return query
+
+    async def select(self, table, *, columns="*", filters=(), order=(), limit=None):
+        query = self._apply_filters(self.client.table(table).select(columns), filters)
+        for column, desc in order:
+            query = query.order(column, desc=desc)
+        if limit is not None:
+            query = query.limit(limit)
+        response = await query.execute()
+        return response.data if response and response.data else []
+
+    async def insert(self, table, rows):
+        response = await self.client.table(table).insert(rows).execute()
+        return response.data if response and response.data else []
+
+    async def upsert(self, table, rows, on_conflict=None, ignore_duplicates=False):
+        kwargs: Dict[str, Any] = {"ignore_duplicates": ignore_duplicates} if ignore_duplicates else {}
+        if on_conflict: kwargs["on_conflict"] = on_conflict
+        response = await self.client.table(table).upsert(rows, **kwargs).execute()
+        return response.data if response and response.data else []
+
+    async def update(self, table, values, filters):
+        response = await self._apply_filters(self.client.table(table).update(values), filters).execute()
+        return response.data if response and response.data else []
+
+    async def delete(self, table, filters):
+        await self._apply_filters(self.client.table(table).delete(), filters).execute()
+
+    async def count(self, table, filters=()):
+        response = await self._apply_filters(self.client.table(table).select('*', count='exact'), filters).limit(1).execute()
+        return response.count or 0 if response else 0
+
+    async def rpc(self, name, params):
+        response = await self.client.rpc(name, params).execute()
+        return response.data if response else None
+
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+# 로컬 저장소 (메모리 / SQLite)
+# =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+def _comparable(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+        except ValueError:
+            return value
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return value
+
+def _matches(row: dict, filters: Sequence[Filter]) -> bool:
+    for column, op, value in filters:
+        current = row.get(column)
+        if op == "eq":
+            if current != value and str(current) != str(value): return False
+        elif op == "neq":
+            if current == value or str(current) == str(value): return False
+        elif op == "in":
+            if current not in value and str(current) not in {str(v) for v in value}: return False
+        elif op in ("gte", "lte"):
+            if current is None: return False
+            left, right = _comparable(current), _comparable(value)
+            try:
+                if (op == "gte" and left < right) or (op == "lte" and left > right): return False
+            except TypeError:
+                return False
+        elif op == "not_null":
+            if current is None: return False
+        else:
+            raise ValueError(f"지원하지 않는 필터 연산자입니다: {op}")
+    return True
+
+def _project(row: dict, columns: str) -> dict:
+    # 'a, b' 형태의 단순 컬럼 목록만 잘라내고, '*'나 관계 조회 구문은 전체 행을 돌려줍니다.
+    if columns.strip() == "*" or "(" in columns or "*" in columns:
+        return dict(row)
+    wanted = [c.strip() for c in columns.split(",") if c.strip()]
+    return {c: row.get(c) for c in wanted}
+
+
+class _LocalBackend(StorageBackend):
+    """메모리 딕셔너리에서 쿼리를 처리하고, 하위 클래스가 필요하면 변경 내용을 영속화합니다."""
+    def __init__(self):
+        # { 테이블: { 기본 키 문자열: 행 } }
+        self._tables: Dict[str, Dict[str, dict]] = {}
+        self._next_ids: Dict[str, int] = {}
+        self._lock = asyncio.Lock()
+
+    def _pk_columns(self, table: str) -> Tuple[str, ...]:
+        return TABLE_PRIMARY_KEYS.get(table, (AUTO_ID_COLUMN,))
+
+    @staticmethod
+    def _key(row: dict, columns: Iterable[str]) -> str:
+        return json.dumps([str(row.get(c)) for c in columns])
+
+    async def _load_table(self, table: str) -> Dict[str, dict]:
+        return {}
+
+    async def _persist(self, table: str, changed: List[Tuple[str, dict]], deleted: List[str]):
+        pass
+
+    async def _rows(self, table: str) -> Dict[str, dict]:
+        if table not in self._tables:
+            self._tables[table] = await self._load_table(table)
+            ids = [row.get(AUTO_ID_COLUMN) for row in self._tables[table].values() if isinstance(row.get(AUTO_ID_COLUMN), int)]
+            self._next_ids[table] = max(ids, default=0) + 1
+        return self._tables[table]
+
+    def _prepare_new_row(self, table: str, row: dict) -> dict:
+        row = dict(row)
+        if self._pk_columns(table) == (AUTO_ID_COLUMN,) and row.get(AUTO_ID_COLUMN) is None:
+            row[AUTO_ID_COLUMN] = self._next_ids[table]
+            self._next_ids[table] += 1
+        row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        return row
+
+    async def select(self, table, *, columns="*", filters=(), order=(), limit=None):
+        async with self._lock:
+            rows = [row for row in (await self._rows(table)).values() if _matches(row, filters)]
+        for column, desc in reversed(list(order)):
+            rows.sort(key=lambda r: (r.get(column) is None, _comparable(r.get(column)) if r.get(column) is not None else 0), reverse=desc)
+        if limit is not None:
+            rows = rows[:limit]
+        return [_project(row, columns) for row in rows]
+
+    async def insert(self, table, rows):
+        async with self._lock:
+            stored = await self._rows(table)
+            pk_columns = self._pk_columns(table)
+            new_rows = [self._prepare_new_row(table, row) for row in rows]
+            keys = [self._key(row, pk_columns) for row in new_rows]
+            if any(key in stored for key in keys) or len(set(keys)) != len(keys):
+                raise ValueError(f"'{table}' 테이블에 이미 존재하는 기본 키입니다.")
+            for key, row in zip(keys, new_rows):
+                stored[key] = row
+            await self._persist(table, list(zip(keys, new_rows)), [])
+        return [dict(row) for row in new_rows]
+
+    async def upsert(self, table, rows, on_conflict=None, ignore_duplicates=False):
+        conflict_columns = tuple(c.strip() for c in on_conflict.split(",")) if on_conflict else self._pk_columns(table)
+        pk_columns = self._pk_columns(table)
+        result, changed = [], []
+        async with self._lock:
+            stored = await self._rows(table)
+            for row in rows:
+                existing_key = next((k for k, r in stored.items() if self._key(r, conflict_columns) == self._key(row, conflict_columns)), None) \
+                    if conflict_columns != pk_columns else (self._key(row, pk_columns) if self._key(row, pk_columns) in stored else None)
+                if existing_key is not None:
+                    if ignore_duplicates: continue
+                    merged = {**stored[existing_key], **row}
+                    stored[existing_key] = merged
+                    changed.append((existing_key, merged))
+                else:
+                    new_row = self._prepare_new_row(table, row)
+                    key = self._key(new_row, pk_columns)
+                    stored[key] = new_row
+                    changed.append((key, new_row))
+            await self._persist(table, changed, [])
+            result = [dict(row) for _, row in changed]
+        return result
+
+    async def update(self, table, values, filters):
+        async with self._lock:
+            stored = await self._rows(table)
+            changed = []
+            for key, row in stored.items():
+                if _matches(row, filters):
+                    row.update(values)
+                    changed.append((key, row))
+            await self._persist(table, changed, [])
+        return [dict(row) for _, row in changed]
+
+    async def delete(self, table, filters):
+        async with self._lock:
+            stored = await self._rows(table)
+            deleted = [key for key, row in stored.items() if _matches(row, filters)]
+            for key in deleted:
+                stored.pop(key, None)
+            await self._persist(table, [], deleted)
+
+    async def count(self, table, filters=()):
+        async with self._lock:
+            return sum(1 for row in (await self._rows(table)).values() if _matches(row, filters))
+
+
+class MemoryBackend(_LocalBackend):
+    """프로세스 메모리에만 저장합니다. (오프라인 테스트/벤치마크 용)"""
+    name = "memory"
+
+
+class SQLiteBackend(_LocalBackend):
+    """
+    로컬 SQLite 파일에 테이블 행을 JSON 키-값으로 저장하는 미러입니다.
+    Supabase의 테이블 스키마(컬럼 타입, 제약 조건, 인덱스)를 만들지 않습니다. 모든 행은 storage_rows 테이블 하나에
+    (테이블 이름, 기본 키, JSON 데이터)로 들어가며, TABLE_PRIMARY_KEYS는 upsert와 중복 검사에만 쓰입니다.
+    테이블을 처음 쓸 때 전체를 메모리로 읽어들여 조회와 필터링은 Python에서 하고, 변경은 파일에 즉시 반영합니다.
+    따라서 작고 자주 쓰는 테이블(쿨다운, 고정 메시지, 임시 음성 채널 등)을 LOCAL_STORE_TABLES로 옮길 때만 적합하며,
+    이 파일을 Supabase 스키마로 그대로 옮기거나 SQL로 직접 조회할 수는 없습니다.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        super().__init__()
+        if aiosqlite is None:
+            raise RuntimeError("SQLite 저장소를 사용하려면 aiosqlite 패키지가 필요합니다.")
+        self.path = path
+        self._conn: Optional["aiosqlite.Connection"] = None
+
+    async def _connection(self) -> "aiosqlite.Connection":
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = await aiosqlite.connect(self.path)
+            await self._conn.execute("PRAGMA journal_mode=WAL")
+            await self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS storage_rows (tbl TEXT NOT NULL, pk TEXT NOT NULL, data TEXT NOT NULL, PRIMARY KEY (tbl, pk))"
+            )
+            await self._conn.commit()
+            logger.info(f"✅ 로컬 SQLite 저장소를 열었습니다: {self.path}")
+        return self._conn
+
+    async def _load_table(self, table):
+        conn = await self._connection()
+        async with conn.execute("SELECT pk, data FROM storage_rows WHERE tbl = ?", (table,)) as cursor:
+            return {pk: json.loads(data) async for pk, data in cursor}
+
+    async def _persist(self, table, changed, deleted):
+        if not changed and not deleted: return
+        conn = await self._connection()
+        if changed:
+            await conn.executemany(
+                "INSERT OR REPLACE INTO storage_rows (tbl, pk, data) VALUES (?, ?, ?)",
+                [(table, key, json.dumps(row, ensure_ascii=False, default=str)) for key, row in changed]
+            )
+        if deleted:
+            await conn.executemany("DELETE FROM storage_rows WHERE tbl = ? AND pk = ?", [(table, key) for key in deleted])
+        await conn.commit()
+
+    async def close(self):
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+def create_local_backend(kind: str, path: Optional[str] = None) -> StorageBackend:
+    if kind == "sqlite":
+        return SQLiteBackend(path or "data/local_store.sqlite3")
+    if kind == "memory":
+        return MemoryBackend()
+    raise ValueError(f"알 수 없는 로컬 저장소 종류입니다: {kind}")
@@ -0,0 +1,42 @@
+# utils/view_registry.py
+"""
+패널 영구 View를 한 번 만들어 두고, 패널 컴포넌트 구성이 바뀌었을 때만 버튼을 다시 만드는 레지스트리입니다.
+패널을 재생성할 때마다 setup_buttons를 다시 돌리지 않아도 됩니다.
+"""
+import logging
+from typing import Dict, Optional, Tuple
+
+from discord import ui
+
+from .database import get_panel_components_version
+
+logger = logging.getLogger(__name__)
+
+
+class PanelViewRegistry:
+    def __init__(self):
+        # { panel_key: (view, 버튼을 만들 때의 컴포넌트 버전) }
+        self._built: Dict[str, Tuple[ui.View, str]] = {}
+
+    async def ensure_built(self, panel_key: str, view: ui.View) -> ui.View:
+        """view의 버튼이 현재 컴포넌트 구성과 같으면 그대로, 다르면 setup_buttons로 다시 만들어 돌려줍니다."""
+        version = get_panel_components_version(panel_key)
+        built = self._built.get(panel_key)
+        if version is not None and built and built[0] is view and built[1] == version:
+            return view
+        await view.setup_buttons()
+        if version is not None:
+            self._built[panel_key] = (view, version)
+        return view
+
+    def get(self, panel_key: str) -> Optional[ui.View]:
+        built = self._built.get(panel_key)
+        return built[0] if built else None
+
+    def invalidate(self, panel_key: Optional[str] = None):
+        """다음 ensure_built 때 버튼을 다시 만들도록 기록을 지웁니다. (None이면 전체)"""
+        if panel_key is None: self._built.clear()
+        else: self._built.pop(panel_key, None)
+
+
+panel_views = PanelViewRegistry()